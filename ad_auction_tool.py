@@ -1,17 +1,28 @@
 
 import streamlit as st
-import pandas as pd
 from io import StringIO
 from datetime import datetime, timedelta
 
+from auction_core import RESULT_COLUMNS, BidOrderBook, build_delivery, settle
+from auction_core.perf import performance_panel, session_tracer, span
+from auction_core.records import bid_store, placement_store
+from auction_core.rendering import RenderCache
+from auction_core.table_io import FORMAT_LABELS, download_table
+from auction_core.table_view import paged_table
+
 st.set_page_config(page_title="Ad Auction Tool", layout="wide")
 st.title("📢 Ad Auction Tracker (MVP)")
+tracer = session_tracer(st.session_state)
 
-# Initialize session state
+# Initialize session state: placements and bids live in columnar record stores
 if "placements" not in st.session_state:
-    st.session_state["placements"] = []
+    st.session_state["placements"] = placement_store()
 if "bids" not in st.session_state:
-    st.session_state["bids"] = []
+    st.session_state["bids"] = bid_store()
+if "order_book" not in st.session_state:
+    st.session_state["order_book"] = BidOrderBook.from_bids(st.session_state["bids"])
+if "downloads" not in st.session_state:
+    st.session_state["downloads"] = RenderCache()
 
 # ---- PLACEMENT FORM ----
 st.header("📌 Add Ad Placement")
@@ -34,15 +45,15 @@ with st.form("placement_form"):
 # Show placements
 if st.session_state.placements:
     st.subheader("📋 Placements")
-    placements_df = pd.DataFrame(st.session_state.placements)
-    st.dataframe(placements_df)
+    placements_df = st.session_state.placements.frame()
+    paged_table(placements_df, "placements")
 
 # ---- BID FORM ----
 st.header("💰 Submit Vendor Bid")
 with st.form("bid_form"):
     vendor_name = st.text_input("Vendor Name")
     if st.session_state.placements:
-        placement_options = [p["Placement ID"] for p in st.session_state.placements]
+        placement_options = st.session_state.placements.frame()["Placement ID"].tolist()
     else:
         placement_options = []
     selected_pid = st.selectbox("Placement ID", placement_options)
@@ -60,80 +71,52 @@ with st.form("bid_form"):
             "End Date": bid_end,
             "Notes": note
         })
+        st.session_state.order_book.add(st.session_state.bids[-1])
 
 # Show bids
 if st.session_state.bids:
     st.subheader("🗃 Vendor Bids")
-    bids_df = pd.DataFrame(st.session_state.bids)
-    st.dataframe(bids_df)
+    paged_table(st.session_state.bids.frame(), "bids")
 
 # ---- RUN AUCTION ----
 st.header("🏁 Run Auction")
 
 if st.button("Run Auction") and st.session_state.placements and st.session_state.bids:
-    results = []
-    delivery = []
-
-    for placement in st.session_state.placements:
-        pid = placement["Placement ID"]
-        base_cpm = placement["Base CPM"]
-        p_start = placement["Start Date"]
-        p_end = placement["End Date"]
-
-        # Filter bids for this placement
-        relevant_bids = [b for b in st.session_state.bids if b["Placement ID"] == pid]
-
-        if not relevant_bids:
-            continue
-
-        # Sort bids by CPM
-        sorted_bids = sorted(relevant_bids, key=lambda x: x["Bid CPM"], reverse=True)
-        winner = sorted_bids[0]
-        winning_vendor = winner["Vendor Name"]
-
-        if len(sorted_bids) > 1:
-            winning_cpm = sorted_bids[1]["Bid CPM"] + 0.01
-        else:
-            winning_cpm = max(base_cpm, winner["Bid CPM"])
-
-        results.append({
-            "Placement ID": pid,
-            "Winning Vendor": winning_vendor,
-            "Winning CPM": round(winning_cpm, 2)
-        })
-
-        # Daily delivery entries
-        delivery_range = pd.date_range(start=max(p_start, winner["Start Date"]),
-                                       end=min(p_end, winner["End Date"]))
-        for date in delivery_range:
-            delivery.append({
-                "Date": date,
-                "Placement ID": pid,
-                "Vendor": winning_vendor,
-                "CPM": round(winning_cpm, 2),
-                "Impressions": 10000,  # static for MVP
-                "Spend": round((10000 / 1000) * winning_cpm, 2)
-            })
+    # Winners and runner-up prices come straight from the order book
+    cleared = settle(st.session_state.placements, st.session_state.order_book.top_two())
+    delivery_df = build_delivery(cleared)
+    with span("reports.summary"):
+        summary_df = delivery_df.groupby("Vendor", observed=True).agg(
+            Total_Impressions=("Impressions", "sum"),
+            Total_Spend=("Spend", "sum"),
+            Days_Booked=("Date", "nunique")
+        ).reset_index()
+    # Kept across reruns so the download buttons below still have the tables
+    st.session_state["auction_run"] = {
+        "id": st.session_state.get("auction_run", {}).get("id", 0) + 1,
+        "results": cleared[RESULT_COLUMNS],
+        "delivery": delivery_df,
+        "summary": summary_df,
+    }
+
+if "auction_run" in st.session_state:
+    run = st.session_state["auction_run"]
 
     # Show results
     st.subheader("🏆 Auction Results")
-    results_df = pd.DataFrame(results)
-    st.dataframe(results_df)
+    st.dataframe(run["results"])
 
     # Show daily delivery
     st.subheader("📅 Daily Delivery Plan")
-    delivery_df = pd.DataFrame(delivery)
-    st.dataframe(delivery_df)
+    paged_table(run["delivery"], "delivery")
 
     # Show summary
     st.subheader("📊 Vendor Summary")
-    summary_df = delivery_df.groupby("Vendor").agg(
-        Total_Impressions=("Impressions", "sum"),
-        Total_Spend=("Spend", "sum"),
-        Days_Booked=("Date", "nunique")
-    ).reset_index()
-    st.dataframe(summary_df)
-
-    # Download buttons
-    st.download_button("Download Daily Delivery CSV", data=delivery_df.to_csv(index=False), file_name="daily_delivery.csv")
-    st.download_button("Download Summary CSV", data=summary_df.to_csv(index=False), file_name="summary.csv")
+    st.dataframe(run["summary"])
+
+    # Download buttons: files are only serialised when asked for, once per run and format
+    fmt = st.radio("Download format", list(FORMAT_LABELS), format_func=FORMAT_LABELS.get, horizontal=True)
+    download_table(run["delivery"], "daily_delivery", "Daily Delivery", fmt, st.session_state.downloads, run["id"])
+    download_table(run["summary"], "summary", "Summary", fmt, st.session_state.downloads, run["id"])
+
+performance_panel(tracer)
@@ -1,52 +1,70 @@
 
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from io import BytesIO
 from datetime import datetime, timedelta
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from fpdf import FPDF
 import string
 
+from auction_core.ids import id_allocator
+from auction_core.perf import performance_panel, session_tracer
+from auction_core.rendering import RenderCache, render_bar_chart
+from auction_core.shared_state import ConflictError, session_snapshot, shared_table
+from auction_core.sheets import get_store
+from auction_core.storage import backend, get_sheet_store
+from auction_core.table_view import paged_table
+from auction_core.write_queue import write_queue, write_status
+
 # Caption for the version
 st.caption("🆕 Version: Final Build with Google Sheets + Persistent Bids + UI Enhancements")
 
 # Set Streamlit page configuration
 st.set_page_config(page_title="Ad Auction Tool", layout="wide")
 st.title("📢 Ad Auction Tracker")
-
-# Define Google Sheets scope and connection
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-credentials = ServiceAccountCredentials.from_json_keyfile_dict(st.secrets["gcp_service_account"], scope)
-gc = gspread.authorize(credentials)
-
-# Load spreadsheet and worksheets
-sheet = gc.open("Ad Auction Database")
-placements_ws = sheet.worksheet("Placements")
-bids_ws = sheet.worksheet("Vendor Bids")
-delivery_ws = sheet.worksheet("Daily Delivery")
-summary_ws = sheet.worksheet("Summary")
-
-# Fetch existing data
-placements_df = pd.DataFrame(placements_ws.get_all_records())
-bids_df = pd.DataFrame(bids_ws.get_all_records())
+tracer = session_tracer(st.session_state)
+
+# AD_AUCTION_BACKEND=sqlite keeps the worksheets in the local database file
+# (AD_AUCTION_DB) instead, for offline use; local writes need no background queue
+if backend("sheets") == "sqlite":
+    store = get_sheet_store()
+    writer = None
+else:
+    # Google Sheets connection: client and worksheet handles are cached per process
+    store = get_store(st.secrets["gcp_service_account"])
+    # One in-memory copy per process, shared by every session; writes go out in the background
+    writer = write_queue(store)
+
+# Fetch existing data in one batch read, served from cache until a write or TTL expiry
+store.prefetch("Placements", "Vendor Bids")
+placements = shared_table(store, "Placements", writer)
+bids = shared_table(store, "Vendor Bids", writer)
+# Each session keeps a snapshot and only pulls in rows changed since it was taken.
+# The bids snapshot is held on the Save rerun, so the save is checked against
+# the rows the editor showed rather than rows other sessions changed since
+placements_snapshot = session_snapshot(placements, st.session_state, "placements_snapshot")
+bids_snapshot = session_snapshot(bids, st.session_state, "bids_snapshot",
+                                 hold=st.session_state.get("save_bids", False))
+placements_df = placements_snapshot.frame
+bids_df = bids_snapshot.frame
+
+# Placement IDs come from a persistent counter shared by every session and
+# process; existing IDs are scanned once per process, not on every rerun
+placement_ids = id_allocator()
+if not placement_ids.seeded:
+    placement_ids.seed(placements_df.get("Placement ID", []))
 
 # Utility functions
 def generate_placement_id():
-    existing_ids = placements_df["Placement ID"].tolist()
-    existing_numbers = [int(pid[1:]) for pid in existing_ids if pid.startswith("P")]
-    next_number = max(existing_numbers, default=0) + 1
-    return f"P{next_number:03d}"
+    return placement_ids.next_id()
 
 def save_placement(data):
-    placements_ws.append_row(data)
+    placements.append(data)
 
-def update_bids_df(df):
-    bids_ws.clear()
-    bids_ws.update([df.columns.values.tolist()] + df.values.tolist())
+def update_bids(changes):
+    # Only the rows edited on the page are sent; raises ConflictError if
+    # another session changed one of them since this session's snapshot
+    bids.apply_changes(bids_snapshot, changes)
 
 # Session state initialization
+if "render_cache" not in st.session_state:
+    st.session_state["render_cache"] = RenderCache()
 if "vendor_colors" not in st.session_state:
     base_colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
     vendors = bids_df["Vendor"].unique()
@@ -59,21 +77,29 @@ tab1, tab2 = st.tabs(["📋 Auction Builder", "📊 Vendor Reports"])
 with tab1:
     st.header("📌 Add Ad Placement")
     with st.form("placement_form"):
-        placement_id = generate_placement_id()
         name = st.text_input("Placement Name")
         url = st.text_input("Targeted URL")
         tags = st.text_input("Targeting Tags (comma-separated)")
         submit = st.form_submit_button("Add Placement")
         if submit and name:
+            # Allocated only on submit, so reruns don't use up IDs
+            placement_id = generate_placement_id()
             save_placement([placement_id, name, url, tags])
-            st.success(f"Placement {placement_id} added.")
+            saving = "; saving to Google Sheets in the background" if writer is not None else ""
+            st.success(f"Placement {placement_id} added{saving}.")
 
     st.divider()
     st.header("💰 Vendor Bids")
-    edited_df = st.data_editor(bids_df, num_rows="dynamic", use_container_width=True)
-    if st.button("💾 Save Bids"):
-        update_bids_df(edited_df)
-        st.success("Vendor bids saved and updated!")
+    # Only the visible page goes to the browser; edits come back keyed by row.
+    # Keyed on the snapshot version, so a refresh also drops edits made against older rows
+    bid_changes = paged_table(bids_df, "bids", editable=True, version=bids_snapshot.version)
+    if st.button("💾 Save Bids", key="save_bids"):
+        try:
+            update_bids(bid_changes)
+            st.success("Vendor bids saved and updated!")
+        except ConflictError as err:
+            bids.refresh(bids_snapshot)
+            st.error(f"Nothing was saved: {err}. The table now shows their changes; please redo your edits.")
 
 # Reporting Tab
 with tab2:
@@ -99,9 +125,18 @@ with tab2:
             color = st.session_state["vendor_colors"].get(vendor, "#1f77b4")
             vendor_data = bids_df[bids_df["Vendor"] == vendor]
             st.dataframe(vendor_data)
-            fig, ax = plt.subplots()
-            vendor_data["Spend"] = vendor_data["Spend"].astype(float)
-            vendor_data.groupby("Placement")["Spend"].sum().plot(kind="bar", ax=ax, color=color)
-            ax.set_title(f"{vendor} Spend by Placement")
-            st.pyplot(fig)
-
+            spend = vendor_data["Spend"].astype(float).groupby(vendor_data["Placement"]).sum()
+            # matplotlib loads on the first chart; unchanged charts come from the cache
+            png = st.session_state["render_cache"].get_or_render(
+                ("spend", vendor, color, tuple(spend.items())),
+                lambda: render_bar_chart(spend, f"{vendor} Spend by Placement", color))
+            st.image(png)
+
+# Sheets write status, refreshed on its own while writes are pending
+if writer is not None:
+    if hasattr(st, "fragment"):
+        write_status = st.fragment(run_every=2)(write_status)
+    with st.sidebar:
+        write_status(writer)
+
+performance_panel(tracer)
@@ -2,21 +2,49 @@
 st.caption("🆕 Version: Enhanced UI with Vendor Colors + Date Presets")
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from io import BytesIO
 from datetime import datetime, timedelta
-from fpdf import FPDF
+
+from auction_core import IncrementalAuction
+from auction_core.allocation import compare_to_baseline
+from auction_core.bulk_export import ExportJob
+from auction_core.date_index import DeliveryIndex
+from auction_core.perf import performance_panel, session_tracer
+from auction_core.records import bid_store, placement_store
+from auction_core.rendering import RenderCache, render_spend_chart, render_vendor_pdf
+from auction_core.report_cube import ReportCube
+from auction_core.simulator import simulate_delivery
+from auction_core.storage import backend, get_storage
+from auction_core.table_io import FORMAT_LABELS, download_table, read_table
+from auction_core.table_view import paged_table
 
 st.set_page_config(page_title="Ad Auction Tool", layout="wide")
 st.title("📢 Ad Auction Tracker (Enhanced UI)")
+tracer = session_tracer(st.session_state)
+
+# Placements and bids last for the session unless AD_AUCTION_BACKEND=sqlite,
+# which also writes them through to the local database file (AD_AUCTION_DB)
+# and loads them from it when a session starts
+storage = get_storage() if backend("session") == "sqlite" else None
 
-# Initialize session state
+# Initialize session state: placements and bids live in columnar record stores,
+# keyed by bid id when they come from the database
 if "placements" not in st.session_state:
-    st.session_state["placements"] = []
+    st.session_state["placements"] = placement_store(storage.placements() if storage else ())
 if "bids" not in st.session_state:
-    st.session_state["bids"] = []
+    stored_bids = storage.bids() if storage else None
+    st.session_state["bids"] = bid_store() if storage is None else bid_store(stored_bids, stored_bids.index)
 if "daily_delivery" not in st.session_state:
     st.session_state["daily_delivery"] = pd.DataFrame()
+if "auction" not in st.session_state:
+    st.session_state["auction"] = IncrementalAuction()
+    if st.session_state.placements or st.session_state.bids:
+        st.session_state["auction"].rebuild(st.session_state.placements, st.session_state.bids)
+auction = st.session_state["auction"]
+if "render_cache" not in st.session_state:
+    st.session_state["render_cache"] = RenderCache()
+render_cache = st.session_state["render_cache"]
+# Bumped whenever placements or bids change, so prepared exports are rebuilt
+st.session_state.setdefault("inputs_version", 0)
 
 # Assign consistent vendor colors
 vendor_colors = [
@@ -38,23 +66,27 @@ with tab1:
         base_cpm = st.number_input("Base CPM ($)", min_value=0.0, step=0.01)
         submitted = st.form_submit_button("Add Placement")
         if submitted:
-            st.session_state.placements.append({
+            placement = {
                 "Placement ID": placement_id,
                 "Name": name,
                 "Start Date": start_date,
                 "End Date": end_date,
                 "Base CPM": base_cpm
-            })
+            }
+            if storage is not None:
+                storage.add_placement(placement)
+            st.session_state.placements.append(placement)
+            auction.add_placement(st.session_state.placements[-1])
+            st.session_state["inputs_version"] += 1
 
     if st.session_state.placements:
         st.subheader("📋 Placements")
-        placements_df = pd.DataFrame(st.session_state.placements)
-        st.dataframe(placements_df)
+        paged_table(st.session_state.placements.frame(), "placements")
 
     st.header("💰 Submit Vendor Bid")
     with st.form("bid_form"):
         vendor_name = st.text_input("Vendor Name")
-        placement_options = [p["Placement ID"] for p in st.session_state.placements]
+        placement_options = st.session_state.placements.frame()["Placement ID"].tolist()
         selected_pid = st.selectbox("Placement ID", placement_options)
         bid_cpm = st.number_input("Max CPM Bid ($)", min_value=0.0, step=0.01)
         bid_start = st.date_input("Desired Start Date")
@@ -62,68 +94,114 @@ with tab1:
         note = st.text_input("Notes (optional)")
         bid_submitted = st.form_submit_button("Submit Bid")
         if bid_submitted:
-            st.session_state.bids.append({
+            bid = {
                 "Vendor Name": vendor_name,
                 "Placement ID": selected_pid,
                 "Bid CPM": bid_cpm,
                 "Start Date": bid_start,
                 "End Date": bid_end,
                 "Notes": note
-            })
+            }
+            key = st.session_state.bids.append(bid, storage.add_bid(bid) if storage is not None else None)
+            auction.add_bid(st.session_state.bids[-1], key)
+            st.session_state["inputs_version"] += 1
 
     if st.session_state.bids:
         st.subheader("🗃 Vendor Bids")
-        bids_df = pd.DataFrame(st.session_state.bids)
-        st.dataframe(bids_df)
+        # Only the visible page goes to the browser; edits come back keyed by row
+        bid_changes = paged_table(st.session_state.bids.frame(), "bids", editable=True,
+                                  version=st.session_state.bids.version)
+        if st.button("💾 Save Bids"):
+            # Saved to the database first, so the added rows take their bid ids as keys
+            added_keys = storage.apply_bid_changes(bid_changes) if storage is not None else None
+            changed = st.session_state.bids.apply_changes(bid_changes, added_keys)
+            # The edited rows go straight into the order book; only their placements get re-cleared
+            auction.sync_changes(st.session_state["bids"], changed)
+            st.session_state["inputs_version"] += 1
+            st.success("Vendor bids saved!")
+
+    with st.expander("📥 Import / 📤 Export Placements and Bids"):
+        uploaded_placements = st.file_uploader("Placements file", type=["csv", "parquet", "arrow", "feather"])
+        uploaded_bids = st.file_uploader("Bids file", type=["csv", "parquet", "arrow", "feather"])
+        if (uploaded_placements or uploaded_bids) and st.button("Load Files"):
+            if uploaded_placements:
+                st.session_state.placements.replace(read_table(uploaded_placements))
+                if storage is not None:
+                    storage.replace_placements(st.session_state.placements.frame(categorical=False))
+            if uploaded_bids:
+                imported_bids = read_table(uploaded_bids)
+                keys = storage.replace_bids(imported_bids) if storage is not None else None
+                st.session_state.bids.replace(imported_bids, keys)
+            auction.rebuild(st.session_state.placements, st.session_state.bids)
+            st.session_state["inputs_version"] += 1
+            st.rerun()
+
+        input_format = st.radio("Export format", list(FORMAT_LABELS), format_func=FORMAT_LABELS.get,
+                                horizontal=True, key="input_format")
+        if st.session_state.placements:
+            download_table(st.session_state.placements.frame(), "placements", "Placements",
+                           input_format, render_cache, st.session_state["inputs_version"])
+        if st.session_state.bids:
+            download_table(st.session_state.bids.frame(), "bids", "Bids",
+                           input_format, render_cache, st.session_state["inputs_version"])
 
     st.header("🏁 Run Auction")
+    auto_run = st.checkbox("Auto-run auction on bid changes")
+    # Only once per change to placements or bids, so other reruns keep the
+    # plan that is shown (e.g. a simulation) instead of resetting it
+    if auto_run and st.session_state.get("auto_run_version") != st.session_state["inputs_version"]:
+        st.session_state["auto_run_version"] = st.session_state["inputs_version"]
+        st.session_state["daily_delivery"] = auction.daily_delivery
+        st.session_state["shown_plan"] = "auction"
 
     if st.button("Run Auction") and st.session_state.placements and st.session_state.bids:
-        results = []
-        delivery = []
-
-        for placement in st.session_state.placements:
-            pid = placement["Placement ID"]
-            base_cpm = placement["Base CPM"]
-            p_start = placement["Start Date"]
-            p_end = placement["End Date"]
-
-            relevant_bids = [b for b in st.session_state.bids if b["Placement ID"] == pid]
-            if not relevant_bids:
-                continue
-
-            sorted_bids = sorted(relevant_bids, key=lambda x: x["Bid CPM"], reverse=True)
-            winner = sorted_bids[0]
-            winning_vendor = winner["Vendor Name"]
-
-            if len(sorted_bids) > 1:
-                winning_cpm = sorted_bids[1]["Bid CPM"] + 0.01
-            else:
-                winning_cpm = max(base_cpm, winner["Bid CPM"])
-
-            results.append({
-                "Placement ID": pid,
-                "Winning Vendor": winning_vendor,
-                "Winning CPM": round(winning_cpm, 2)
-            })
-
-            delivery_range = pd.date_range(start=max(p_start, winner["Start Date"]),
-                                           end=min(p_end, winner["End Date"]))
-            for date in delivery_range:
-                delivery.append({
-                    "Date": date,
-                    "Placement ID": pid,
-                    "Vendor": winning_vendor,
-                    "CPM": round(winning_cpm, 2),
-                    "Impressions": 10000,
-                    "Spend": round((10000 / 1000) * winning_cpm, 2)
-                })
-
-        delivery_df = pd.DataFrame(delivery)
-        st.session_state["daily_delivery"] = delivery_df
-
+        st.session_state["daily_delivery"] = auction.daily_delivery
+        st.session_state["shown_plan"] = "auction"
+    # Shown outside the button so paging and sorting reruns keep the table
+    if st.session_state.get("shown_plan") == "auction":
         st.subheader("📅 Daily Delivery Plan")
-        st.dataframe(delivery_df)
+        paged_table(st.session_state["daily_delivery"], "delivery")
+
+    with st.expander("🎲 Simulate Delivery"):
+        sim_col1, sim_col2, sim_col3 = st.columns(3)
+        scenarios = sim_col1.number_input("Scenarios", min_value=10, max_value=10000, value=1000, step=100)
+        daily_inventory = sim_col2.number_input("Daily inventory per placement", min_value=0, value=10000, step=1000)
+        volatility = sim_col3.slider("Daily volatility", 0.0, 1.0, 0.2)
+        weekday_factors = st.text_input("Day-of-week multipliers (Mon-Sun)", "1, 1, 1, 1, 1, 1, 1")
+        if st.button("Run Simulation") and st.session_state.placements and st.session_state.bids:
+            try:
+                seasonality = [float(x) for x in weekday_factors.split(",")]
+            except ValueError:
+                seasonality = []
+            if len(seasonality) != 7:
+                st.error("Enter seven comma-separated multipliers.")
+            else:
+                sim_df = simulate_delivery(auction.cleared, scenarios=int(scenarios), inventory=daily_inventory,
+                                           seasonality=seasonality, volatility=volatility)
+                st.session_state["daily_delivery"] = sim_df
+                st.session_state["shown_plan"] = "simulation"
+        if st.session_state.get("shown_plan") == "simulation":
+            st.subheader("📅 Simulated Delivery Plan (expected, P10-P90)")
+            paged_table(st.session_state["daily_delivery"], "simulation")
+
+    with st.expander("⚖️ Budget Allocation"):
+        st.caption("Auction each placement-day separately within bid dates, capped by vendor budgets.")
+        vendor_names = sorted(set(st.session_state.bids.frame()["Vendor Name"].dropna()) - {""})
+        budget_df = st.data_editor(
+            pd.DataFrame({"Vendor": vendor_names, "Budget ($)": [None] * len(vendor_names)}, dtype=object),
+            disabled=["Vendor"], use_container_width=True, key="vendor_budgets")
+        if st.button("Allocate") and st.session_state.placements and st.session_state.bids:
+            budgets = dict(zip(budget_df["Vendor"], pd.to_numeric(budget_df["Budget ($)"], errors="coerce")))
+            allocation_df, comparison = compare_to_baseline(st.session_state.placements, st.session_state.bids, budgets)
+            st.session_state["daily_delivery"] = allocation_df
+            st.session_state["allocation_comparison"] = comparison
+            st.session_state["shown_plan"] = "allocation"
+        if st.session_state.get("shown_plan") == "allocation":
+            st.dataframe(st.session_state["allocation_comparison"].style.format({
+                "Solve Time (s)": "{:.3f}", "Fill Rate": "{:.1%}",
+                "Revenue": "${:,.2f}", "Bidder Value": "${:,.2f}", "Over Budget": "${:,.2f}"}))
+            st.subheader("📅 Allocated Delivery Plan")
+            paged_table(st.session_state["daily_delivery"], "allocation")
 
 # ---------------------
 # Vendor Reports Tab
@@ -133,7 +211,14 @@ with tab2:
     dd_df = st.session_state["daily_delivery"]
 
     if not dd_df.empty:
-        all_vendors = sorted(dd_df["Vendor"].unique())
+        # Aggregate once per auction; date changes below are prefix-sum lookups
+        if "report_cube" not in st.session_state or st.session_state["report_cube"].source is not dd_df:
+            st.session_state["report_cube"] = ReportCube(dd_df)
+            st.session_state["delivery_index"] = DeliveryIndex(dd_df)
+            st.session_state["auction_version"] = st.session_state.get("auction_version", 0) + 1
+        cube = st.session_state["report_cube"]
+        delivery_index = st.session_state["delivery_index"]
+        all_vendors = list(cube.vendors)
         for i, v in enumerate(all_vendors):
             vendor_color_map[v] = vendor_colors[i % len(vendor_colors)]
 
@@ -162,55 +247,83 @@ with tab2:
         start_date = col2.date_input("Start Date", value=start_filter)
         end_date = col3.date_input("End Date", value=end_filter)
 
-        filtered_df = dd_df[(dd_df["Date"] >= pd.to_datetime(start_date)) & (dd_df["Date"] <= pd.to_datetime(end_date))]
+        totals = cube.vendor_totals(start_date, end_date)
+
+        with st.expander("📤 Export Delivery and Summary"):
+            report_format = st.radio("Export format", list(FORMAT_LABELS), format_func=FORMAT_LABELS.get,
+                                     horizontal=True, key="report_format")
+            download_table(dd_df, "daily_delivery", "Daily Delivery", report_format, render_cache,
+                           st.session_state["auction_version"])
+            range_version = (st.session_state["auction_version"], str(start_date), str(end_date))
+            download_table(totals.reset_index(), "vendor_summary", "Vendor Summary", report_format, render_cache,
+                           range_version)
+
+        # Bulk export runs on a background thread + process pool; the script only polls it
+        def discard_export():
+            job = st.session_state.pop("export_job", None)
+            if job is not None:
+                job.discard()
+
+        if st.button("📦 Export All Vendor Reports (ZIP)"):
+            discard_export()
+            st.session_state["export_job"] = ExportJob(cube, start_date, end_date, vendor_color_map).start()
+
+        def show_export_status():
+            job = st.session_state.get("export_job")
+            if job is None:
+                return
+            if job.error is not None:
+                st.error(f"Export failed: {job.error}")
+            elif job.running:
+                st.progress(job.fraction, text=f"Rendering vendor reports: {job.done}/{job.total or '?'}")
+            else:
+                # Served from the file on disk; the ZIP is deleted once downloaded
+                with open(job.path, "rb") as zip_file:
+                    st.download_button("⬇️ Download All Vendor Reports", data=zip_file,
+                                       file_name="vendor_reports.zip", mime="application/zip",
+                                       on_click=discard_export)
+
+        if hasattr(st, "fragment"):
+            show_export_status = st.fragment(run_every=1)(show_export_status)
+        show_export_status()
+
+        if st.checkbox("Show delivery rows for selected range"):
+            detail_vendor = st.selectbox("Vendor", ["All vendors"] + all_vendors)
+            if detail_vendor == "All vendors":
+                paged_table(delivery_index.between(start_date, end_date), "delivery_rows")
+            else:
+                paged_table(delivery_index.vendor(detail_vendor, start_date, end_date), "delivery_rows")
 
         for vendor in all_vendors:
             with st.expander(f"📈 {vendor}", expanded=False):
-                vendor_df = filtered_df[filtered_df["Vendor"] == vendor]
-                if vendor_df.empty:
+                summary = totals.loc[vendor]
+                if summary.Days_Booked == 0:
                     st.info("No data for this vendor in selected date range.")
                     continue
 
-                chart_df = vendor_df.groupby(["Date", "Placement ID"])["Spend"].sum().unstack().fillna(0)
-                fig, ax = plt.subplots()
-                chart_df.plot(kind="line", ax=ax, marker="o", color=[vendor_color_map[vendor]] * len(chart_df.columns))
-                ax.set_title(f"Spend Over Time by Placement - {vendor}")
-                ax.set_ylabel("Spend ($)")
-                ax.set_xlabel("Date")
-                ax.grid(True)
-                st.pyplot(fig)
-
-                summary = vendor_df.agg(
-                    Total_Impressions=("Impressions", "sum"),
-                    Total_Spend=("Spend", "sum"),
-                    Days_Booked=("Date", "nunique")
-                )
-
                 st.markdown(f"**Total Spend:** ${summary.Total_Spend:.2f}")
                 st.markdown(f"**Total Impressions:** {int(summary.Total_Impressions)}")
-                st.markdown(f"**Days Booked:** {summary.Days_Booked}")
-
-                # Generate PDF
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", size=12)
-                pdf.cell(200, 10, txt=f"Ad Auction Report for {vendor}", ln=True, align="C")
-                pdf.ln(10)
-                pdf.cell(200, 10, txt=f"Date Range: {start_date} to {end_date}", ln=True)
-                pdf.ln(5)
-                pdf.cell(200, 10, txt=f"Total Spend: ${summary.Total_Spend:.2f}", ln=True)
-                pdf.cell(200, 10, txt=f"Total Impressions: {int(summary.Total_Impressions)}", ln=True)
-                pdf.cell(200, 10, txt=f"Days Booked: {summary.Days_Booked}", ln=True)
-
-                pdf_output = BytesIO()
-                pdf.output(pdf_output)
-                pdf_output.seek(0)
-
-                st.download_button(
-                    label="📄 Download PDF Report",
-                    data=pdf_output,
-                    file_name=f"{vendor}_ad_report.pdf",
-                    mime="application/pdf"
-                )
+                st.markdown(f"**Days Booked:** {int(summary.Days_Booked)}")
+
+                # Charts and PDFs are rendered only on request and cached per vendor/range/auction
+                render_key = (vendor, str(start_date), str(end_date), st.session_state["auction_version"])
+                if st.toggle("Show chart", key=f"chart_{vendor}"):
+                    png = render_cache.get_or_render(("chart",) + render_key, lambda: render_spend_chart(
+                        cube.daily_spend(vendor, start_date, end_date), vendor, vendor_color_map[vendor]))
+                    st.image(png)
+
+                pdf_bytes = render_cache.get(("pdf",) + render_key)
+                if pdf_bytes is None and st.button("📄 Prepare PDF Report", key=f"pdf_{vendor}"):
+                    pdf_bytes = render_cache.put(("pdf",) + render_key, render_vendor_pdf(
+                        vendor, start_date, end_date, summary))
+                if pdf_bytes is not None:
+                    st.download_button(
+                        label="📄 Download PDF Report",
+                        data=pdf_bytes,
+                        file_name=f"{vendor}_ad_report.pdf",
+                        mime="application/pdf"
+                    )
     else:
         st.info("Run the auction first to generate delivery data.")
+
+performance_panel(tracer)
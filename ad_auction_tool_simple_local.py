@@ -1,25 +1,35 @@
 
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
-from io import BytesIO
-from fpdf import FPDF
+
+from auction_core.engine import RESULT_COLUMNS
+from auction_core.ids import id_allocator
+from auction_core.perf import performance_panel, session_tracer
+from auction_core.rendering import RenderCache, render_bar_chart
+from auction_core.storage import get_storage
+from auction_core.table_view import paged_query
 
 st.set_page_config(page_title="Ad Auction Tool", layout="wide")
-st.caption("🆕 Version: Final Build (Local State Only, No Google Sheets)")
+st.caption("🆕 Version: Final Build (Local SQLite Storage, No Google Sheets)")
 st.title("📢 Ad Auction Tracker")
+tracer = session_tracer(st.session_state)
+
+if "render_cache" not in st.session_state:
+    st.session_state["render_cache"] = RenderCache()
 
-# Initialize session state
-if "placements" not in st.session_state:
-    st.session_state["placements"] = []
+# Placements, bids and delivery persist in a local SQLite file across sessions
+storage = get_storage()
 
-if "bids" not in st.session_state:
-    st.session_state["bids"] = []
+# Placement IDs come from a counter kept in the same database file
+# (AD_AUCTION_DB), so deleted placements and concurrent sessions never lead
+# to a reused ID
+placement_ids = id_allocator()
+if not placement_ids.seeded:
+    placement_ids.seed(storage.placements()["Placement ID"])
 
 # Utility for placement ID
 def generate_placement_id():
-    return f"P{len(st.session_state['placements']) + 1:03d}"
+    return placement_ids.next_id()
 
 # Tabs
 tab1, tab2 = st.tabs(["📋 Auction Builder", "📊 Vendor Reports"])
@@ -30,25 +40,49 @@ with tab1:
         name = st.text_input("Placement Name")
         url = st.text_input("Targeted URL")
         tags = st.text_input("Targeting Tags (comma-separated)")
+        start_date = st.date_input("Start Date")
+        end_date = st.date_input("End Date")
+        base_cpm = st.number_input("Base CPM ($)", min_value=0.0, step=0.01)
         submit = st.form_submit_button("Add Placement")
         if submit and name:
             pid = generate_placement_id()
-            st.session_state["placements"].append({
+            storage.add_placement({
                 "Placement ID": pid,
                 "Name": name,
                 "URL": url,
-                "Tags": tags
+                "Tags": tags,
+                "Start Date": start_date,
+                "End Date": end_date,
+                "Base CPM": base_cpm
             })
             st.success(f"Placement {pid} added.")
 
     st.divider()
     st.header("💰 Vendor Bids")
-    bids_df = pd.DataFrame(st.session_state["bids"])
-    edited_df = st.data_editor(bids_df, num_rows="dynamic", use_container_width=True)
+    # Only the visible page is read from the database and sent to the browser;
+    # edits come back keyed by bid
+    st.session_state.setdefault("bids_version", 0)
+    pid_col, vendor_col = st.columns(2)
+    pid_filter = pid_col.text_input("Placement ID", key="bids_placement").strip() or None
+    vendor_filter = vendor_col.selectbox("Vendor", [None] + storage.vendors(), key="bids_vendor",
+                                         format_func=lambda vendor: "All vendors" if vendor is None else vendor)
+    bid_changes = paged_query(lambda: storage.count_bids(pid_filter, vendor_filter),
+                              lambda offset, limit: storage.bids_page(offset, limit, pid_filter, vendor_filter),
+                              f"bids_{pid_filter}_{vendor_filter}", editable=True,
+                              version=st.session_state["bids_version"])
     if st.button("💾 Save Bids"):
-        st.session_state["bids"] = edited_df.to_dict("records")
+        storage.apply_bid_changes(bid_changes)
+        st.session_state["bids_version"] += 1
         st.success("Vendor bids saved!")
 
+    st.divider()
+    st.header("🏁 Run Auction")
+    # Clears every placement in SQL and stores the delivery plan the reports read
+    if st.button("Run Auction"):
+        st.session_state["results"] = storage.run_auction()[RESULT_COLUMNS]
+    if "results" in st.session_state:
+        st.dataframe(st.session_state["results"])
+
 with tab2:
     st.header("📊 Vendor Reports")
     st.sidebar.header("📅 Date Range")
@@ -68,15 +102,25 @@ with tab2:
         start_date = st.sidebar.date_input("Start Date", today - timedelta(days=7))
         end_date = st.sidebar.date_input("End Date", today)
 
-    if st.session_state["bids"]:
-        bids_df = pd.DataFrame(st.session_state["bids"])
-        for vendor in bids_df["Vendor"].unique():
-            with st.expander(f"📦 {vendor}"):
-                vendor_data = bids_df[bids_df["Vendor"] == vendor]
-                st.dataframe(vendor_data)
-                if "Spend" in vendor_data.columns:
-                    vendor_data["Spend"] = pd.to_numeric(vendor_data["Spend"], errors="coerce").fillna(0)
-                    fig, ax = plt.subplots()
-                    vendor_data.groupby("Placement")["Spend"].sum().plot(kind="bar", ax=ax)
-                    ax.set_title(f"{vendor} Spend by Placement")
-                    st.pyplot(fig)
+    summary = storage.vendor_summary(start_date, end_date)
+    if summary.empty:
+        st.info("No delivery in this range yet; run the auction first.")
+    else:
+        st.dataframe(summary)
+
+    for vendor in storage.vendors():
+        with st.expander(f"📦 {vendor}"):
+            paged_query(lambda: storage.count_bids(vendor=vendor),
+                        lambda offset, limit: storage.bids_page(offset, limit, vendor=vendor),
+                        f"vendor_bids_{vendor}")
+            st.dataframe(storage.daily_delivery(start_date, end_date, vendor))
+            spend = storage.spend_by_placement(vendor, start_date, end_date)
+            if not spend.empty:
+                series = spend.set_index("Placement ID")["Spend"]
+                # matplotlib loads on the first chart; unchanged charts come from the cache
+                png = st.session_state["render_cache"].get_or_render(
+                    ("spend", vendor, tuple(series.items())),
+                    lambda: render_bar_chart(series, f"{vendor} Spend by Placement"))
+                st.image(png)
+
+performance_panel(tracer)
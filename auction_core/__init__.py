@@ -0,0 +1,33 @@
+"""Shared auction logic used by the Streamlit apps.
+
+Names below are imported from their submodules on first access, so an app
+that only needs e.g. ``auction_core.sheets`` or ``auction_core.perf`` does
+not pay for the rest of the package at startup.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "RESULT_COLUMNS": "engine",
+    "auction_results": "engine",
+    "clear_auction": "engine",
+    "settle": "engine",
+    "build_delivery": "delivery",
+    "IncrementalAuction": "incremental",
+    "BidOrderBook": "order_book",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"auction_core.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,259 @@
+"""Benchmarks for the auction, delivery and reporting paths.
+
+    python -m auction_core bench --rows 100000 --save-baseline bench_baseline.json
+    python -m auction_core bench --rows 100000 --baseline bench_baseline.json
+    python -m auction_core bench --rows 1000000 --scaling 1 2 4 8
+
+Seeded generators build placements, bids and delivery histories of any
+size, and each case times one path the apps run: order-book and columnar
+clearing, delivery-plan expansion, the vendor summary and report cube, and
+chart and PDF rendering. Wall time is the best of ``--repeat`` runs; peak
+memory is measured by ``tracemalloc`` on a separate run so tracing does not
+skew the timings. Results can be saved as a JSON baseline and later runs
+compared against it. ``--scaling`` instead times ``parallel_auction`` at
+each worker count and reports the speedup over one worker.
+
+Every run also checks that re-clearing after a one-bid edit stays faster
+than rerunning the whole auction and delivery plan, since that is the only
+reason ``IncrementalAuction`` exists.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from auction_core.delivery import DELIVERY_COLUMNS, build_delivery
+from auction_core.engine import clear_auction, settle
+from auction_core.incremental import IncrementalAuction
+from auction_core.order_book import BidOrderBook
+from auction_core.parallel import parallel_auction
+from auction_core.records import bid_store, placement_store
+from auction_core.report_cube import ReportCube
+
+EPOCH = np.datetime64("2025-01-01")
+HORIZON_DAYS = 90
+VENDORS = 50
+TOLERANCE = 1.25
+# (incremental case, full case): the first must beat the second
+INCREMENTAL_CHECK = ("incremental bid edit", "full rerun")
+
+
+# ---- generators ----
+def make_placements(n, seed=0):
+    """``n`` placements with flights of one to eight weeks inside the horizon."""
+    rng = np.random.default_rng(seed)
+    start = EPOCH + rng.integers(0, HORIZON_DAYS - 7, n).astype("timedelta64[D]")
+    end = np.minimum(start + rng.integers(6, 56, n).astype("timedelta64[D]"),
+                     EPOCH + np.timedelta64(HORIZON_DAYS - 1, "D"))
+    return pd.DataFrame({
+        "Placement ID": [f"P{i:07d}" for i in range(n)],
+        "Name": [f"Placement {i}" for i in range(n)],
+        "Start Date": pd.DatetimeIndex(start.astype("datetime64[ns]")),
+        "End Date": pd.DatetimeIndex(end.astype("datetime64[ns]")),
+        "Base CPM": np.round(rng.uniform(1.0, 5.0, n), 2),
+    })
+
+
+def make_bids(placements, n, vendors=VENDORS, seed=0):
+    """``n`` bids on random placements, each wanting a random slice of the flight."""
+    rng = np.random.default_rng(seed + 1)
+    pick = rng.integers(0, len(placements), n)
+    start = placements["Start Date"].to_numpy()[pick]
+    end = placements["End Date"].to_numpy()[pick]
+    span = ((end - start) // np.timedelta64(1, "D")).astype(np.int64)
+    lead = (rng.random(n) * (span + 1) // 2).astype(np.int64)
+    tail = (rng.random(n) * (span + 1) // 2).astype(np.int64)
+    return pd.DataFrame({
+        "Vendor Name": [f"Vendor {v:03d}" for v in rng.integers(0, vendors, n)],
+        "Placement ID": placements["Placement ID"].to_numpy()[pick],
+        "Bid CPM": np.round(rng.uniform(0.5, 12.0, n), 2),
+        "Start Date": start + lead.astype("timedelta64[D]"),
+        "End Date": end - tail.astype("timedelta64[D]"),
+        "Notes": "",
+    })
+
+
+def make_delivery(n_rows, vendors=VENDORS, seed=0):
+    """A ``daily_delivery`` history of ``n_rows`` rows over the horizon."""
+    rng = np.random.default_rng(seed + 2)
+    n_placements = max(1, n_rows // HORIZON_DAYS)
+    placement = rng.integers(0, n_placements, n_rows)
+    cpm = np.round(rng.uniform(1.0, 12.0, n_placements), 2)[placement]
+    return pd.DataFrame({
+        "Date": pd.DatetimeIndex((EPOCH + rng.integers(0, HORIZON_DAYS, n_rows).astype("timedelta64[D]"))
+                                 .astype("datetime64[ns]")),
+        "Placement ID": pd.Categorical([f"P{i:07d}" for i in placement]),
+        "Vendor": pd.Categorical([f"Vendor {v:03d}" for v in (placement % vendors)]),
+        "CPM": cpm.astype(np.float32),
+        "Impressions": np.full(n_rows, 10000, dtype=np.int32),
+        "Spend": np.round(cpm * 10, 2).astype(np.float32),
+    }, columns=DELIVERY_COLUMNS)
+
+
+# ---- cases ----
+def _vendor_summary(delivery):
+    return delivery.groupby("Vendor", observed=True).agg(
+        Total_Impressions=("Impressions", "sum"),
+        Total_Spend=("Spend", "sum"),
+        Days_Booked=("Date", "nunique"),
+    ).reset_index()
+
+
+def _edit_one_bid(auction, bids):
+    """Raise the first bid's CPM, save it the way the apps do and re-clear its placement.
+
+    The full plan is assembled only when read, so it is not part of the edit.
+    """
+    cpm = bids[0]["Bid CPM"]
+    changed = bids.apply_changes({"updated": {int(bids.keys()[0]): {"Bid CPM": round(cpm + 0.01, 2)}}})
+    auction.sync_changes(bids, changed)
+    return auction.refresh()
+
+
+def cases(rows, seed=0):
+    """Benchmark name -> zero-argument callable, with inputs built up front."""
+    from auction_core.rendering import render_spend_chart, render_vendor_pdf
+
+    placements = make_placements(max(1, rows // 4), seed)
+    bids = make_bids(placements, rows, seed=seed)
+    cleared = clear_auction(placements, bids)
+    delivery = make_delivery(rows, seed=seed)
+    cube = ReportCube(delivery)
+    start, end = EPOCH, EPOCH + np.timedelta64(HORIZON_DAYS - 1, "D")
+    vendor = cube.vendors[0]
+    chart_df = cube.daily_spend(vendor, start, end)
+    summary = cube.vendor_totals(start, end).loc[vendor]
+    chart_png = render_spend_chart(chart_df, vendor, "#1f77b4")
+    bid_table = bid_store(bids)
+    auction = IncrementalAuction(placement_store(placements), bid_table)
+
+    return {
+        "clear (order book)": lambda: settle(placements, BidOrderBook.from_bids(bids).top_two()),
+        "clear (columnar)": lambda: clear_auction(placements, bids),
+        "delivery plan": lambda: build_delivery(cleared),
+        "full rerun": lambda: build_delivery(clear_auction(placements, bids)),
+        "incremental bid edit": lambda: _edit_one_bid(auction, bid_table),
+        "vendor summary": lambda: _vendor_summary(delivery),
+        "report cube": lambda: ReportCube(delivery).vendor_totals(start, end),
+        "chart": lambda: render_spend_chart(chart_df, vendor, "#1f77b4"),
+        "pdf": lambda: render_vendor_pdf(vendor, start, end, summary, chart_png),
+    }
+
+
+def measure(fn, repeat=3):
+    """Best wall time over ``repeat`` runs and peak traced memory of one more."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2 ** 20}
+
+
+def run_benchmarks(rows, repeat=3, seed=0, only=None):
+    """Measure every case (or those named in ``only``) at ``rows`` rows."""
+    results = {}
+    for name, fn in cases(rows, seed).items():
+        if only and name not in only:
+            continue
+        results[name] = measure(fn, repeat)
+    return results
+
+
+def run_scaling(rows, workers, repeat=3, seed=0):
+    """Wall time of ``parallel_auction`` at each worker count, with speedup
+    over the first count (usually 1). Pool start-up is included, as a CLI
+    run pays it."""
+    placements = make_placements(max(1, rows // 4), seed)
+    bids = make_bids(placements, rows, seed=seed)
+    table = pd.DataFrame({"seconds": [
+        min(_timed(parallel_auction, placements, bids, workers=n) for _ in range(repeat)) for n in workers
+    ]}, index=pd.Index(workers, name="workers"))
+    table["speedup"] = table["seconds"].iloc[0] / table["seconds"]
+    return table
+
+
+def _timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Results next to the baseline; ``status`` flags time or memory over ``tolerance`` x baseline."""
+    table = pd.DataFrame(results).T
+    table.index.name = "case"
+    if baseline is None:
+        return table
+    base = pd.DataFrame(baseline).T.reindex(table.index)
+    table["baseline_s"] = base["seconds"]
+    table["time_ratio"] = table["seconds"] / base["seconds"]
+    table["baseline_mb"] = base["peak_mb"]
+    table["memory_ratio"] = table["peak_mb"] / base["peak_mb"]
+    slower = table["time_ratio"] > tolerance
+    bigger = table["memory_ratio"] > tolerance
+    table["status"] = np.select([slower & bigger, slower, bigger, base["seconds"].isna()],
+                                ["slower, more memory", "slower", "more memory", "new"], "ok")
+    return table
+
+
+def check_incremental(results, check=INCREMENTAL_CHECK):
+    """Message if the incremental case is no faster than the full one, else None."""
+    incremental, full = check
+    if incremental not in results or full not in results:
+        return None
+    ratio = results[incremental]["seconds"] / results[full]["seconds"]
+    if ratio < 1:
+        return None
+    return f"{incremental!r} took {ratio:.2f}x as long as {full!r}"
+
+
+def _load_baseline(path, rows):
+    with open(path) as f:
+        return json.load(f).get(str(rows))
+
+
+def _save_baseline(path, rows, results):
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        stored = {}
+    stored[str(rows)] = results
+    with open(path, "w") as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+
+
+def run(args):
+    if args.scaling:
+        table = run_scaling(args.rows, args.scaling, args.repeat, args.seed)
+        with pd.option_context("display.float_format", "{:.4f}".format):
+            print(f"parallel_auction, {args.rows} bids, best of {args.repeat}")
+            print(table.to_string())
+        return 0
+    results = run_benchmarks(args.rows, args.repeat, args.seed, args.case)
+    baseline = _load_baseline(args.baseline, args.rows) if args.baseline else None
+    table = compare(results, baseline, args.tolerance)
+    with pd.option_context("display.width", 200, "display.float_format", "{:.4f}".format):
+        print(f"{args.rows} rows, best of {args.repeat}")
+        print(table.to_string())
+    if args.save_baseline:
+        _save_baseline(args.save_baseline, args.rows, results)
+        print(f"baseline saved -> {args.save_baseline}", file=sys.stderr)
+    regression = check_incremental(results)
+    if regression:
+        print(f"incremental path regressed: {regression}", file=sys.stderr)
+        return 1
+    if baseline is not None and table["status"].str.contains("slower|memory").any():
+        return 1
+    return 0
@@ -0,0 +1,135 @@
+"""Bulk export of every vendor's PDF report into one ZIP.
+
+Reports (chart included) are rendered in a process pool. Only a small
+window of vendors is in flight at a time and each finished PDF is written
+straight into the ZIP on disk, so peak memory does not depend on the number
+of vendors. Workers are spawned rather than forked: the export runs beside
+Streamlit's threads, and a forked child can inherit a lock one of them held.
+``ExportJob`` runs the export on a background thread so the Streamlit script
+keeps responding and can poll its progress. The finished ZIP stays on disk
+until the job is discarded; it is never held in memory.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import weakref
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from auction_core.rendering import render_spend_chart, render_vendor_pdf
+
+DEFAULT_COLOR = "#1f77b4"
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _render_report(task):
+    vendor, start_date, end_date, chart_df, summary, color = task
+    png = render_spend_chart(chart_df, vendor, color) if not chart_df.empty else None
+    return vendor, render_vendor_pdf(vendor, start_date, end_date, summary, png)
+
+
+def _tasks(cube, start_date, end_date, colors):
+    totals = cube.vendor_totals(start_date, end_date)
+    for vendor in cube.vendors:
+        summary = totals.loc[vendor]
+        if summary.Days_Booked == 0:
+            continue
+        yield (vendor, start_date, end_date, cube.daily_spend(vendor, start_date, end_date),
+               summary, colors.get(vendor, DEFAULT_COLOR))
+
+
+def export_reports(cube, start_date, end_date, out, colors=None, workers=None, progress=None):
+    """Write ``<vendor>_ad_report.pdf`` for each vendor with delivery in range into ZIP ``out``.
+
+    ``progress(done, total)`` is called after each report. Returns the number
+    of reports written.
+    """
+    colors = colors or {}
+    total = int((cube.vendor_totals(start_date, end_date)["Days_Booked"] > 0).sum())
+    workers = workers or os.cpu_count() or 1
+    window = workers * 2
+    tasks = _tasks(cube, start_date, end_date, colors)
+    done_count = 0
+
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = set()
+        while True:
+            while len(pending) < window:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                pending.add(pool.submit(_render_report, task))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                vendor, pdf_bytes = future.result()
+                zf.writestr(f"{vendor}_ad_report.pdf", pdf_bytes)
+                done_count += 1
+                if progress is not None:
+                    progress(done_count, total)
+    return done_count
+
+
+class ExportJob:
+    """Runs ``export_reports`` on a background thread into a temporary ZIP.
+
+    Once finished, the ZIP is at ``path``; serve it from there and call
+    ``discard`` when it is no longer needed. The file is also removed if the
+    export fails or the job is garbage collected.
+    """
+
+    def __init__(self, cube, start_date, end_date, colors=None, workers=None):
+        self.key = (str(start_date), str(end_date))
+        self.done = 0
+        self.total = 0
+        self.error = None
+        fd, self.path = tempfile.mkstemp(prefix="vendor_reports_", suffix=".zip")
+        os.close(fd)
+        self._discarded = False
+        self._cleanup = weakref.finalize(self, _remove, self.path)
+        self._thread = threading.Thread(
+            target=self._run, args=(cube, start_date, end_date, colors, workers), daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def finished(self):
+        return not self.running and self.error is None and not self._discarded and self._thread.ident is not None
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else (1.0 if self.finished else 0.0)
+
+    def discard(self):
+        """Delete the ZIP now, or as soon as a running export stops writing it."""
+        self._discarded = True
+        if not self.running:
+            self._cleanup()
+
+    def _progress(self, done, total):
+        self.done, self.total = done, total
+
+    def _run(self, cube, start_date, end_date, colors, workers):
+        try:
+            export_reports(cube, start_date, end_date, self.path, colors, workers, self._progress)
+        except Exception as exc:
+            self.error = exc
+            self._cleanup()
+        if self._discarded:
+            self._cleanup()
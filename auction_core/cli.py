@@ -0,0 +1,142 @@
+"""Headless auction runs over CSV, Parquet or Arrow IPC files.
+
+    python -m auction_core run --placements p.parquet --bids b.parquet --out delivery.parquet
+    python -m auction_core bench --rows 100000
+
+Runs the same second-price auction and delivery-plan logic as the "Run
+Auction" button without importing Streamlit or matplotlib. The delivery plan
+is built and written a block of winners at a time, so output size does not
+bound memory, and stage timings are reported on stderr.
+"""
+
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from auction_core import bench
+from auction_core.delivery import build_delivery
+from auction_core.engine import RESULT_COLUMNS, clear_auction
+from auction_core.parallel import parallel_auction
+from auction_core.streaming import stream_auction
+from auction_core.table_io import TableWriter, read_table
+
+CHUNK_WINNERS = 2000
+
+
+class Timings:
+    def __init__(self, stream=sys.stderr):
+        self.stream = stream
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.stages.append((name, elapsed))
+        print(f"{name:<10} {elapsed:9.3f}s", file=self.stream)
+
+    def total(self):
+        print(f"{'total':<10} {sum(t for _, t in self.stages):9.3f}s", file=self.stream)
+
+
+def delivery_blocks(cleared, chunk=CHUNK_WINNERS):
+    """Delivery plan expanded a block of winners at a time."""
+    if cleared.empty:
+        yield build_delivery(cleared)
+    for start in range(0, len(cleared), chunk):
+        yield build_delivery(cleared.iloc[start:start + chunk])
+
+
+def write_delivery(blocks, writer):
+    """Write delivery blocks as they come; returns the vendor summary."""
+    totals = {}
+    for delivery in blocks:
+        writer.write(delivery)
+        for vendor, rows in delivery.groupby("Vendor", observed=True):
+            entry = totals.setdefault(vendor, [0, 0.0, set()])
+            entry[0] += int(rows["Impressions"].sum())
+            entry[1] += float(rows["Spend"].astype(float).sum())
+            entry[2].update(rows["Date"].unique())
+    return pd.DataFrame(
+        [(vendor, imps, round(spend, 2), len(days)) for vendor, (imps, spend, days) in sorted(totals.items())],
+        columns=["Vendor", "Total_Impressions", "Total_Spend", "Days_Booked"],
+    )
+
+
+def run(args):
+    timings = Timings()
+    if args.chunksize:
+        # Bids never fully loaded: fold them into a running top two per placement
+        with timings.stage("read"):
+            placements = read_table(args.placements)
+        with timings.stage("clear"):
+            cleared = stream_auction(placements, args.bids, args.chunksize)
+    else:
+        with timings.stage("read"):
+            placements = read_table(args.placements)
+            bids = read_table(args.bids)
+        print(f"{len(placements)} placements, {len(bids)} bids", file=sys.stderr)
+
+        with timings.stage("clear"):
+            if args.workers > 1:
+                # Each worker clears a contiguous range of placements; delivery is expanded below
+                cleared = parallel_auction(placements, bids, workers=args.workers)
+            else:
+                cleared = clear_auction(placements, bids)
+    print(f"{len(cleared)} placements cleared", file=sys.stderr)
+
+    if args.results:
+        with timings.stage("results"):
+            writer = TableWriter(args.results)
+            writer.write(cleared[RESULT_COLUMNS])
+            writer.close()
+
+    with timings.stage("delivery"):
+        writer = TableWriter(args.out)
+        summary = write_delivery(delivery_blocks(cleared, args.chunk), writer)
+        writer.close()
+    print(f"{writer.rows} delivery rows -> {args.out}", file=sys.stderr)
+
+    if args.summary:
+        with timings.stage("summary"):
+            writer = TableWriter(args.summary)
+            writer.write(summary)
+            writer.close()
+    timings.total()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ad-auction", description="Run ad auctions without the UI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="clear an auction and write the daily delivery plan")
+    run_p.add_argument("--placements", required=True, help="placements table (.csv, .parquet or .arrow)")
+    run_p.add_argument("--bids", required=True, help="bids table (.csv, .parquet or .arrow)")
+    run_p.add_argument("--out", required=True, help="daily delivery output (.csv, .parquet or .arrow)")
+    run_p.add_argument("--results", help="optional auction results output")
+    run_p.add_argument("--summary", help="optional vendor summary output")
+    run_p.add_argument("--chunk", type=int, default=CHUNK_WINNERS, help="winners per delivery block")
+    run_p.add_argument("--chunksize", type=int, help="stream bids in chunks of this many rows")
+    run_p.add_argument("--workers", type=int, default=1, help="processes to clear placements in parallel")
+    run_p.set_defaults(func=run)
+
+    bench_p = sub.add_parser("bench", help="time auction, delivery and report paths on generated data")
+    bench_p.add_argument("--rows", type=int, default=100_000, help="bids and delivery rows to generate")
+    bench_p.add_argument("--repeat", type=int, default=3, help="timed runs per case; the best is kept")
+    bench_p.add_argument("--seed", type=int, default=0, help="seed for the data generators")
+    bench_p.add_argument("--case", action="append", help="only run this case (repeatable)")
+    bench_p.add_argument("--baseline", help="JSON baseline to compare against")
+    bench_p.add_argument("--save-baseline", help="write results to this JSON baseline")
+    bench_p.add_argument("--scaling", type=int, nargs="+", metavar="WORKERS",
+                         help="time parallel clearing at these worker counts instead")
+    bench_p.add_argument("--tolerance", type=float, default=bench.TOLERANCE,
+                         help="flag cases slower or larger than this multiple of the baseline")
+    bench_p.set_defaults(func=bench.run)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,55 @@
+"""Date-sorted delivery store with binary-search range selection.
+
+``DeliveryIndex`` keeps the daily delivery plan sorted by Date once, so a
+date range is two ``searchsorted`` calls and a positional slice instead of
+two full boolean comparisons over the Date column. A secondary index orders
+rows by (Vendor, Date) with per-vendor offsets, so a vendor's rows in a range
+are found the same way within that vendor's segment.
+"""
+
+import numpy as np
+import pandas as pd
+
+from auction_core.perf import traced
+
+
+def _bounds(dates, start, end):
+    lo = 0 if start is None else np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), side="left")
+    hi = len(dates) if end is None else np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), side="right")
+    return lo, max(lo, hi)
+
+
+class DeliveryIndex:
+    @traced("reports.index")
+    def __init__(self, delivery):
+        self.source = delivery
+        dates = pd.to_datetime(delivery["Date"]).to_numpy(dtype="datetime64[ns]")
+        order = np.argsort(dates, kind="stable")
+        self.frame = delivery.iloc[order].reset_index(drop=True)
+        self.dates = dates[order]
+
+        # Secondary index: stable sort by vendor keeps dates ascending per vendor
+        vendors = pd.Categorical(self.frame["Vendor"])
+        self._vendor_order = np.argsort(vendors.codes, kind="stable")
+        sorted_codes = vendors.codes[self._vendor_order]
+        self._vendor_dates = self.dates[self._vendor_order]
+        self._offsets = {
+            vendor: (np.searchsorted(sorted_codes, code, side="left"),
+                     np.searchsorted(sorted_codes, code, side="right"))
+            for code, vendor in enumerate(vendors.categories)
+        }
+
+    @property
+    def vendors(self):
+        return list(self._offsets)
+
+    def between(self, start=None, end=None):
+        """Rows with ``start <= Date <= end``, as a positional slice of the sorted frame."""
+        lo, hi = _bounds(self.dates, start, end)
+        return self.frame.iloc[lo:hi]
+
+    def vendor(self, vendor, start=None, end=None):
+        """One vendor's rows in the date range, in date order."""
+        first, last = self._offsets.get(vendor, (0, 0))
+        lo, hi = _bounds(self._vendor_dates[first:last], start, end)
+        return self.frame.take(self._vendor_order[first + lo:first + hi])
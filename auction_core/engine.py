@@ -0,0 +1,105 @@
+"""Second-price auction clearing over columnar placement and bid tables.
+
+The Streamlit apps used to scan every bid once per placement and re-sort each
+subset to find the top two prices. Here the whole bid table is ranked once and
+every placement is cleared in a single grouped pass, producing the same rows
+the per-placement loop did.
+"""
+
+import numpy as np
+import pandas as pd
+
+from auction_core.perf import traced
+from auction_core.records import RecordStore
+
+BID_INCREMENT = 0.01
+RESULT_COLUMNS = ["Placement ID", "Winning Vendor", "Winning CPM"]
+CLEARED_COLUMNS = RESULT_COLUMNS + ["Clearing CPM", "Delivery Start", "Delivery End"]
+
+
+def as_frame(rows):
+    """Accept a DataFrame, a ``RecordStore`` or a list of dicts."""
+    if isinstance(rows, pd.DataFrame):
+        return rows
+    if isinstance(rows, RecordStore):
+        return rows.frame()
+    return pd.DataFrame(list(rows))
+
+
+def top_two(bids):
+    """Return each placement's winning bid plus the runner-up price.
+
+    Bids are ranked by ``Bid CPM`` descending with ties kept in submission
+    order, which is what ``sorted(..., reverse=True)`` did in the old loop.
+    The result is indexed by Placement ID; ``Second CPM`` is NaN when the
+    placement received a single bid.
+    """
+    bids = as_frame(bids)
+    bids = bids[bids["Placement ID"].notna()]
+    ranked = bids.sort_values("Bid CPM", ascending=False, kind="stable")
+    rank = ranked.groupby("Placement ID", sort=False).cumcount().to_numpy()
+    winners = ranked[rank == 0].set_index("Placement ID")
+    runner_up = ranked[rank == 1].set_index("Placement ID")["Bid CPM"]
+    winners = winners.assign(**{"Second CPM": runner_up.reindex(winners.index)})
+    return winners
+
+
+@traced("auction.clear")
+def clear_auction(placements, bids):
+    """Clear every placement's auction at once.
+
+    Returns one row per placement that received at least one bid, in
+    placement order. Alongside the ``RESULT_COLUMNS`` shown to users it
+    carries the unrounded ``Clearing CPM`` (spend is computed from it) and
+    the delivery window: the overlap of the placement flight with the winning
+    bid's desired dates.
+    """
+    bids = as_frame(bids)
+    if bids.empty:
+        return pd.DataFrame(columns=CLEARED_COLUMNS)
+    return settle(placements, top_two(bids))
+
+
+@traced("auction.settle")
+def settle(placements, top):
+    """Price placements from their precomputed top two bids.
+
+    ``top`` is shaped like the output of ``top_two`` (or
+    ``BidOrderBook.top_two``): indexed by Placement ID with the winning bid's
+    columns and ``Second CPM``.
+    """
+    placements = as_frame(placements)
+    if placements.empty or top.empty:
+        return pd.DataFrame(columns=CLEARED_COLUMNS)
+
+    top = top[["Vendor Name", "Bid CPM", "Second CPM", "Start Date", "End Date"]]
+    top = top.rename(columns={"Start Date": "Bid Start", "End Date": "Bid End"})
+    cleared = placements[["Placement ID", "Base CPM", "Start Date", "End Date"]].merge(
+        top, left_on="Placement ID", right_index=True, how="left"
+    )
+    cleared = cleared[cleared["Vendor Name"].notna()]
+
+    base = cleared["Base CPM"].to_numpy(dtype=float)
+    best = cleared["Bid CPM"].to_numpy(dtype=float)
+    second = cleared["Second CPM"].to_numpy(dtype=float)
+    clearing = np.where(np.isnan(second), np.maximum(base, best), second + BID_INCREMENT)
+
+    start = np.maximum(pd.to_datetime(cleared["Start Date"]).to_numpy(),
+                       pd.to_datetime(cleared["Bid Start"]).to_numpy())
+    end = np.minimum(pd.to_datetime(cleared["End Date"]).to_numpy(),
+                     pd.to_datetime(cleared["Bid End"]).to_numpy())
+
+    return pd.DataFrame({
+        "Placement ID": cleared["Placement ID"].to_numpy(),
+        "Winning Vendor": cleared["Vendor Name"].to_numpy(),
+        # Python's round() so the displayed CPM matches the old loop exactly
+        "Winning CPM": [round(cpm, 2) for cpm in clearing.tolist()],
+        "Clearing CPM": clearing,
+        "Delivery Start": start,
+        "Delivery End": end,
+    }, columns=CLEARED_COLUMNS)
+
+
+def auction_results(placements, bids):
+    """The ``results`` table the "Run Auction" button displays."""
+    return clear_auction(placements, bids)[RESULT_COLUMNS]
@@ -0,0 +1,153 @@
+"""Collision-free placement IDs from a persistent counter.
+
+Deriving the next ID from the current table (``len(placements) + 1``, or
+the largest ``P###`` seen) rescans every ID on each rerun, repeats IDs
+after deletions, and lets two sessions pick the same one. ``IdAllocator``
+keeps the next number in a SQLite table instead and advances it inside an
+immediate (write-locked) transaction, so sessions and processes sharing the
+file never get the same number. ``reserve(n)`` takes a block of numbers in
+one transaction for bulk imports.
+
+Every ID handed out, seeded or registered is also recorded in an indexed
+``placement_ids`` table, written in the same transaction as the counter.
+``next_id`` and ``reserve`` skip numbers already recorded there, and
+``exists`` answers membership with one primary-key lookup, so callers no
+longer scan the placements table to check an ID.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# The app database; storage keeps its tables here too. Defined here rather
+# than in storage so the allocator loads without pandas
+DEFAULT_PATH = os.environ.get("AD_AUCTION_DB", "ad_auction.db")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS id_counters (name TEXT PRIMARY KEY, next INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS placement_ids (
+    name TEXT NOT NULL, pid TEXT NOT NULL, PRIMARY KEY (name, pid)
+) WITHOUT ROWID;
+"""
+
+
+class IdAllocator:
+    """Persistent, atomic counter formatting IDs as ``prefix`` plus a zero-padded number."""
+
+    def __init__(self, name="placement", prefix="P", width=3, path=DEFAULT_PATH):
+        self.name = name
+        self.prefix = prefix
+        self.width = width
+        self.path = path
+        self.seeded = False
+        self._pattern = re.compile(re.escape(prefix) + r"(\d+)")
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit, so the counter update controls its own transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def format(self, number):
+        return f"{self.prefix}{number:0{self.width}d}"
+
+    def number(self, pid):
+        """The number in an ID of this allocator's form, else None."""
+        match = self._pattern.fullmatch(str(pid))
+        return int(match.group(1)) if match else None
+
+    def exists(self, pid):
+        """Whether ``pid`` was seeded, registered or handed out."""
+        return self._recorded(self._conn(), pid)
+
+    def seed(self, ids):
+        """Register existing IDs and move the counter past the highest one."""
+        ids = [pid for pid in ids if isinstance(pid, str) and pid]
+        top = max((n for n in map(self.number, ids) if n is not None), default=0)
+        with self._transaction() as conn:
+            self._record(conn, ids)
+            self._move_counter(conn, top + 1)
+        self.seeded = True
+
+    def register(self, pid):
+        """Record an ID created elsewhere, e.g. typed in or imported, and move
+        the counter past it."""
+        number = self.number(pid)
+        with self._transaction() as conn:
+            self._record(conn, [pid])
+            if number is not None:
+                self._move_counter(conn, number + 1)
+
+    def reserve(self, n):
+        """``n`` consecutive unused IDs, taken in one transaction."""
+        with self._transaction() as conn:
+            start = self._counter(conn)
+            while True:
+                ids = [self.format(number) for number in range(start, start + n)]
+                taken = [self.number(pid) for pid in ids if self._recorded(conn, pid)]
+                if not taken:
+                    break
+                start = max(taken) + 1
+            self._record(conn, ids)
+            self._move_counter(conn, start + n)
+        return ids
+
+    def next_id(self):
+        """The next unused ID."""
+        with self._transaction() as conn:
+            number = self._counter(conn)
+            while self._recorded(conn, self.format(number)):
+                number += 1
+            pid = self.format(number)
+            self._record(conn, [pid])
+            self._move_counter(conn, number + 1)
+        return pid
+
+    @contextmanager
+    def _transaction(self):
+        """An immediate (write-locked) transaction on this thread's connection."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _counter(self, conn):
+        row = conn.execute("SELECT next FROM id_counters WHERE name = ?", (self.name,)).fetchone()
+        return row[0] if row else 1
+
+    def _move_counter(self, conn, floor):
+        """Raise the stored counter to at least ``floor``."""
+        conn.execute("INSERT OR REPLACE INTO id_counters (name, next) VALUES (?, ?)",
+                     (self.name, max(self._counter(conn), floor)))
+
+    def _recorded(self, conn, pid):
+        return conn.execute("SELECT 1 FROM placement_ids WHERE name = ? AND pid = ?",
+                            (self.name, pid)).fetchone() is not None
+
+    def _record(self, conn, ids):
+        conn.executemany("INSERT OR IGNORE INTO placement_ids (name, pid) VALUES (?, ?)",
+                         [(self.name, pid) for pid in ids])
+
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def id_allocator(path=DEFAULT_PATH, name="placement", prefix="P", width=3):
+    """Process-wide ``IdAllocator`` for a counter in ``path`` (default: the
+    app database, ``AD_AUCTION_DB``)."""
+    with _allocators_lock:
+        key = (path, name)
+        if key not in _allocators:
+            _allocators[key] = IdAllocator(name, prefix, width, path)
+        return _allocators[key]
@@ -0,0 +1,244 @@
+"""Incremental re-auction that only re-clears placements whose bids changed.
+
+``IncrementalAuction`` keeps bids in a per-placement ``BidOrderBook`` and the
+cleared results in segments of ``SEGMENT`` placements, by placement rank:
+one array per result column, written in place. Keyed bid edits, as
+``RecordStore.apply_changes`` reports them, go straight into the book with
+``add``/``update``/``remove`` and mark just their placements dirty.
+``refresh`` re-clears the dirty placements and rewrites their slots, and
+drops the cached delivery rows of the segments it touched.
+
+The ``cleared`` and ``daily_delivery`` frames are assembled from the segments
+only when read, and cached until the next change. An edit therefore costs
+the same however many placements and bids there are; only a read of the
+whole frame scales with it.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from auction_core.delivery import DELIVERY_COLUMNS, build_delivery
+from auction_core.engine import CLEARED_COLUMNS, RESULT_COLUMNS, as_frame, clear_auction, settle
+from auction_core.order_book import BidOrderBook
+from auction_core.perf import traced
+from auction_core.records import RecordStore
+
+SEGMENT = 1024
+
+
+def _group_bids(bids):
+    grouped = {}
+    for bid in as_frame(bids).to_dict("records"):
+        grouped.setdefault(bid["Placement ID"], []).append(bid)
+    return grouped
+
+
+def _row_keys(bids):
+    """Row keys of a bid table in row order: store keys, a frame's index, else positions."""
+    if isinstance(bids, RecordStore):
+        return bids.keys().tolist()
+    if isinstance(bids, pd.DataFrame):
+        return bids.index.tolist()
+    return list(range(len(bids)))
+
+
+class _Segment:
+    """Cleared rows of ``SEGMENT`` consecutive placement ranks, one slot per rank."""
+
+    __slots__ = ("columns", "won", "delivery")
+
+    def __init__(self, dtypes):
+        self.columns = {col: np.empty(SEGMENT, dtype=dtype) for col, dtype in dtypes.items()}
+        self.won = np.zeros(SEGMENT, dtype=bool)
+        # This segment's daily delivery rows, expanded on first read
+        self.delivery = None
+
+    def write(self, slots, rows):
+        """Put ``rows`` (a frame of cleared columns) into ``slots``."""
+        for col, arr in self.columns.items():
+            arr[slots] = rows[col].to_numpy()
+        self.won[slots] = True
+        self.delivery = None
+
+    def clear(self, slots):
+        self.won[slots] = False
+        self.delivery = None
+
+    def cleared(self):
+        won = self.won
+        return {col: arr[won] for col, arr in self.columns.items()}
+
+
+class IncrementalAuction:
+    """Per-placement auction state that is patched as bids change."""
+
+    def __init__(self, placements=(), bids=()):
+        self._placements = {}
+        self._rank = {}
+        self.book = BidOrderBook()
+        self._bid_ids = {}
+        self._segments = []
+        self._dtypes = None
+        self._dirty = set()
+        self._cleared = None
+        self._delivery = None
+        self.rebuild(placements, bids)
+
+    # ---- inputs ----
+    @traced("auction.rebuild")
+    def rebuild(self, placements, bids):
+        """Replace all state, clearing every placement in one columnar pass."""
+        placements = as_frame(placements)
+        self._placements = {p["Placement ID"]: p for p in placements.to_dict("records")}
+        self._rank = {pid: rank for rank, pid in enumerate(self._placements)}
+        self.book = BidOrderBook.from_bids(bids)
+        # from_bids numbers bids 0, 1, ... in row order
+        self._bid_ids = {key: bid_id for bid_id, key in enumerate(_row_keys(bids))}
+        self._segments = []
+        self._dirty = set()
+        cleared = clear_auction(placements, bids) if len(self._placements) else pd.DataFrame(columns=CLEARED_COLUMNS)
+        self._write(cleared)
+        self._changed()
+
+    def add_placement(self, placement):
+        pid = placement["Placement ID"]
+        self._placements[pid] = placement
+        self._rank.setdefault(pid, len(self._rank))
+        self._dirty.add(pid)
+
+    def add_bid(self, bid, key=None):
+        """Add a bid; pass its row key so later keyed edits can find it."""
+        bid_id = self.book.add(bid)
+        if key is not None:
+            self._bid_ids[key] = bid_id
+        self._dirty.add(bid["Placement ID"])
+
+    def remove_bid(self, bid):
+        bid_id = self.book.find(bid)
+        if bid_id is None:
+            return False
+        self.book.remove(bid_id)
+        self._dirty.add(bid["Placement ID"])
+        return True
+
+    def sync_changes(self, bids, changed):
+        """Apply keyed edits to the book: ``changed`` is what
+        ``RecordStore.apply_changes`` returned for ``bids``.
+
+        Only the edited rows are read, and only their placements (before and
+        after the edit) are marked dirty. Returns those Placement IDs.
+        """
+        dirty = set()
+        for key in changed.get("deleted", []):
+            dirty.add(self.book.remove(self._bid_ids.pop(key))["Placement ID"])
+        updated, added = list(changed.get("updated", [])), list(changed.get("added", []))
+        positions = bids.positions(updated + added).tolist() if updated or added else []
+        for key, pos in zip(updated, positions):
+            bid = bids[pos]
+            dirty.add(self.book.update(self._bid_ids[key], bid)["Placement ID"])
+            dirty.add(bid["Placement ID"])
+        for key, pos in zip(added, positions[len(updated):]):
+            bid = bids[pos]
+            self._bid_ids[key] = self.book.add(bid)
+            dirty.add(bid["Placement ID"])
+        self._dirty |= dirty
+        return dirty
+
+    def sync_bids(self, bids):
+        """Bring the book in line with a bid table edited without keys.
+
+        Diffs every placement's bids against the book and rebuilds it if any
+        differ, marking only those placements dirty. Keyed edits should go
+        through ``sync_changes``, which does not read the whole table.
+        Returns the set of changed Placement IDs.
+        """
+        new = _group_bids(bids)
+        changed = {pid for pid in new.keys() | set(self.book.placements) if self.book.bids(pid) != new.get(pid, [])}
+        if changed:
+            self.book = BidOrderBook.from_bids(bids)
+            self._bid_ids = {key: bid_id for bid_id, key in enumerate(_row_keys(bids))}
+            self._dirty |= changed
+        return changed
+
+    # ---- outputs ----
+    @property
+    def cleared(self):
+        """Full ``settle`` frame (clearing price and delivery window) in placement order."""
+        self.refresh()
+        if self._cleared is None:
+            self._cleared = self._assemble_cleared()
+        return self._cleared
+
+    @property
+    def results(self):
+        return self.cleared[RESULT_COLUMNS]
+
+    @property
+    def daily_delivery(self):
+        self.refresh()
+        if self._delivery is None:
+            self._delivery = self._assemble_delivery()
+        return self._delivery
+
+    @traced("auction.refresh")
+    def refresh(self):
+        """Re-clear dirty placements into their segment slots; returns their IDs."""
+        if not self._dirty:
+            return set()
+        dirty, self._dirty = self._dirty, set()
+        ordered = sorted((pid for pid in dirty if pid in self._rank), key=self._rank.get)
+        for pid in ordered:
+            rank = self._rank[pid]
+            if rank // SEGMENT < len(self._segments):
+                self._segments[rank // SEGMENT].clear(rank % SEGMENT)
+        self._write(settle([self._placements[pid] for pid in ordered], self.book.top_two(ordered)))
+        self._changed()
+        return dirty
+
+    # ---- internals ----
+    def _write(self, cleared):
+        """Store cleared rows in their placements' segment slots."""
+        if cleared.empty:
+            return
+        if self._dtypes is None:
+            # Text columns are kept as object arrays
+            self._dtypes = {col: cleared[col].dtype if isinstance(cleared[col].dtype, np.dtype) else object
+                            for col in CLEARED_COLUMNS}
+        # A lookup per row: mapping through the rank dict as a Series would cost a pass over every placement
+        ranks = np.fromiter((self._rank[pid] for pid in cleared["Placement ID"].tolist()), np.int64, len(cleared))
+        segment = ranks // SEGMENT
+        while len(self._segments) <= segment.max():
+            self._segments.append(_Segment(self._dtypes))
+        bounds = np.flatnonzero(np.diff(segment)) + 1
+        # Rows come in rank order, so each segment's rows are one contiguous run
+        for rows in np.split(np.arange(len(ranks)), bounds):
+            self._segments[segment[rows[0]]].write(ranks[rows] % SEGMENT, cleared.iloc[rows])
+
+    def _changed(self):
+        self._cleared = None
+        self._delivery = None
+
+    def _assemble_cleared(self):
+        if not self._segments:
+            return pd.DataFrame(columns=CLEARED_COLUMNS)
+        parts = [segment.cleared() for segment in self._segments]
+        return pd.DataFrame({col: np.concatenate([part[col] for part in parts]) for col in CLEARED_COLUMNS},
+                            columns=CLEARED_COLUMNS)
+
+    def _assemble_delivery(self):
+        blocks = []
+        for segment in self._segments:
+            if segment.delivery is None:
+                segment.delivery = build_delivery(pd.DataFrame(segment.cleared(), columns=CLEARED_COLUMNS))
+            if len(segment.delivery):
+                blocks.append(segment.delivery)
+        if not blocks:
+            return build_delivery(pd.DataFrame(columns=CLEARED_COLUMNS))
+        data = {}
+        for col in DELIVERY_COLUMNS:
+            if isinstance(blocks[0][col].dtype, pd.CategoricalDtype):
+                data[col] = union_categoricals([block[col] for block in blocks], sort_categories=True)
+            else:
+                data[col] = np.concatenate([block[col].to_numpy() for block in blocks])
+        return pd.DataFrame(data, columns=DELIVERY_COLUMNS)
@@ -0,0 +1,201 @@
+"""Per-placement bid order book.
+
+Each placement keeps its bids in an indexed binary max-heap ordered by
+``Bid CPM`` (ties go to the earlier submission, as in the original sort).
+The winner sits at the root and the runner-up is one of its two children, so
+both are read in O(1); inserting, editing or removing a bid is O(log n).
+"""
+
+import heapq
+
+import pandas as pd
+
+from auction_core.engine import as_frame
+from auction_core.perf import traced
+
+
+class _PlacementBook:
+    """Indexed heap of ``(-cpm, bid_id)`` entries for one placement."""
+
+    __slots__ = ("heap", "pos")
+
+    def __init__(self, entries=()):
+        self.heap = list(entries)
+        heapq.heapify(self.heap)
+        self.pos = {entry[1]: i for i, entry in enumerate(self.heap)}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, entry):
+        self.heap.append(entry)
+        self.pos[entry[1]] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def remove(self, bid_id):
+        i = self.pos.pop(bid_id)
+        last = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.pos[last[1]] = i
+            self._sift_up(i)
+            self._sift_down(self.pos[last[1]])
+
+    def top_two(self):
+        heap = self.heap
+        first = heap[0] if heap else None
+        second = min(heap[1:3]) if len(heap) > 1 else None
+        return first, second
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.pos[heap[i][1]] = i
+        self.pos[heap[j][1]] = j
+
+    def _sift_up(self, i):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self.heap[i] >= self.heap[parent]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        heap = self.heap
+        n = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and heap[child] < heap[smallest]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+
+
+class BidOrderBook:
+    """Bids indexed by Placement ID for constant-time winner lookups.
+
+    ``add`` returns a bid id that ``update`` and ``remove`` take. Bid ids
+    increase with submission order and double as the tie-breaker.
+    """
+
+    def __init__(self):
+        self._books = {}
+        self._bids = {}
+        self._next_id = 0
+
+    @classmethod
+    def from_bids(cls, bids):
+        """Build the whole book in bulk from a bids table (O(n) heapify)."""
+        book = cls()
+        grouped = {}
+        for bid in as_frame(bids).to_dict("records"):
+            bid_id = book._next_id
+            book._next_id += 1
+            book._bids[bid_id] = bid
+            grouped.setdefault(bid["Placement ID"], []).append((-bid["Bid CPM"], bid_id))
+        book._books = {pid: _PlacementBook(entries) for pid, entries in grouped.items()}
+        return book
+
+    def __len__(self):
+        return len(self._bids)
+
+    def __contains__(self, pid):
+        return pid in self._books
+
+    @property
+    def placements(self):
+        return list(self._books)
+
+    def add(self, bid):
+        bid_id = self._next_id
+        self._next_id += 1
+        self._insert(bid_id, bid)
+        return bid_id
+
+    def remove(self, bid_id):
+        bid = self._bids.pop(bid_id)
+        pid = bid["Placement ID"]
+        book = self._books[pid]
+        book.remove(bid_id)
+        if not book:
+            del self._books[pid]
+        return bid
+
+    def update(self, bid_id, bid):
+        """Replace a bid in place, keeping its submission priority; returns the old bid."""
+        old = self.remove(bid_id)
+        self._insert(bid_id, bid)
+        return old
+
+    def find(self, bid):
+        """Id of the first stored bid equal to ``bid``, or None.
+
+        Scans only that placement's bids.
+        """
+        book = self._books.get(bid["Placement ID"])
+        if book is None:
+            return None
+        matches = [bid_id for bid_id in book.pos if self._bids[bid_id] == bid]
+        return min(matches) if matches else None
+
+    def bids(self, pid):
+        """A placement's bids in submission order."""
+        book = self._books.get(pid)
+        if book is None:
+            return []
+        return [self._bids[bid_id] for bid_id in sorted(book.pos)]
+
+    def replace_placement(self, pid, bids):
+        """Swap one placement's bids for ``bids`` with a bulk heapify."""
+        book = self._books.pop(pid, None)
+        if book is not None:
+            for bid_id in book.pos:
+                del self._bids[bid_id]
+        entries = []
+        for bid in bids:
+            bid_id = self._next_id
+            self._next_id += 1
+            self._bids[bid_id] = bid
+            entries.append((-bid["Bid CPM"], bid_id))
+        if entries:
+            self._books[pid] = _PlacementBook(entries)
+
+    def winner(self, pid):
+        """The winning bid for a placement, or None."""
+        book = self._books.get(pid)
+        if book is None:
+            return None
+        return self._bids[book.heap[0][1]]
+
+    @traced("order_book.top_two")
+    def top_two(self, pids=None):
+        """Winning bid and runner-up price per placement.
+
+        Same shape as ``engine.top_two`` so the result can go straight into
+        ``engine.settle``.
+        """
+        rows = {}
+        for pid in self._books if pids is None else pids:
+            book = self._books.get(pid)
+            if book is None:
+                continue
+            first, second = book.top_two()
+            row = dict(self._bids[first[1]])
+            row["Second CPM"] = -second[0] if second else float("nan")
+            rows[pid] = row
+        if not rows:
+            return pd.DataFrame(columns=["Vendor Name", "Bid CPM", "Second CPM", "Start Date", "End Date"])
+        top = pd.DataFrame.from_dict(rows, orient="index")
+        top.index.name = "Placement ID"
+        return top.drop(columns="Placement ID")
+
+    def _insert(self, bid_id, bid):
+        self._bids[bid_id] = bid
+        pid = bid["Placement ID"]
+        if pid not in self._books:
+            self._books[pid] = _PlacementBook()
+        self._books[pid].push((-bid["Bid CPM"], bid_id))
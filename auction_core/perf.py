@@ -0,0 +1,186 @@
+"""Lightweight spans for timing the stages of a Streamlit rerun.
+
+Core hot paths (Sheets reads and writes, clearing, delivery expansion, report
+building, chart and PDF rendering) are wrapped with ``traced``. They report
+to whichever ``Tracer`` is active on the current thread; Streamlit runs each
+session's script on its own thread, so sessions do not mix. With no active
+tracer, or a disabled one, a traced call costs one attribute lookup.
+
+Each rerun is bracketed by ``begin_run``/``end_run``. The finished run (span
+timings, totals, resident memory) is kept in a short history for the
+sidebar Performance panel and logged as one JSON line on the
+``auction_core.perf`` logger for monitoring.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+logger = logging.getLogger("auction_core.perf")
+
+ENV_FLAG = "AD_AUCTION_PERF"
+_NULL_SPAN = nullcontext()
+_local = threading.local()
+
+
+def _rss_mb():
+    """Current resident set size in MB, or None where it cannot be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS; KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if peak > 2 ** 32 else peak / 2 ** 10
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "record", "started", "rss")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        # Recorded on entry so spans list in start order, parents before children
+        self.record = {"name": self.name, "depth": len(self.tracer._stack), "seconds": None, "rss_delta_mb": None}
+        self.tracer.spans.append(self.record)
+        self.tracer._stack.append(self.name)
+        self.rss = _rss_mb()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record["seconds"] = time.perf_counter() - self.started
+        rss = _rss_mb()
+        if rss is not None and self.rss is not None:
+            self.record["rss_delta_mb"] = rss - self.rss
+        self.tracer._stack.pop()
+        return False
+
+
+class Tracer:
+    """Collects spans for the current rerun and a history of finished runs."""
+
+    def __init__(self, enabled=None, history=50):
+        if enabled is None:
+            enabled = os.environ.get(ENV_FLAG, "") not in ("", "0")
+        self.enabled = enabled
+        self.runs = deque(maxlen=history)
+        self.spans = []
+        self._stack = []
+        self._run_started = None
+        self._count = 0
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def begin_run(self):
+        """Start a rerun and make this the tracer for the current thread."""
+        activate(self)
+        self.spans = []
+        self._stack = []
+        self._run_started = time.perf_counter() if self.enabled else None
+
+    def end_run(self):
+        """Finish the rerun; returns its record, or None when disabled."""
+        if not self.enabled or self._run_started is None:
+            return None
+        self._count += 1
+        totals = {}
+        for span in self.spans:
+            totals[span["name"]] = totals.get(span["name"], 0.0) + (span["seconds"] or 0.0)
+        run = {
+            "run": self._count,
+            "timestamp": time.time(),
+            "total_s": time.perf_counter() - self._run_started,
+            "rss_mb": _rss_mb(),
+            "stages": totals,
+            "spans": list(self.spans),
+        }
+        self._run_started = None
+        self.runs.append(run)
+        logger.info(json.dumps({k: v for k, v in run.items() if k != "spans"}, default=str))
+        return run
+
+
+def activate(tracer):
+    _local.tracer = tracer
+
+
+def current():
+    return getattr(_local, "tracer", None)
+
+
+def span(name):
+    """Time a block under the current thread's tracer, if any is enabled."""
+    tracer = getattr(_local, "tracer", None)
+    if tracer is None or not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name)
+
+
+def traced(name):
+    """Decorator form of ``span``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = getattr(_local, "tracer", None)
+            if tracer is None or not tracer.enabled:
+                return fn(*args, **kwargs)
+            with _Span(tracer, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def session_tracer(state):
+    """The session's tracer, created on first use, with its rerun started."""
+    tracer = state.get("perf_tracer")
+    if tracer is None:
+        tracer = state["perf_tracer"] = Tracer()
+    if "perf_enabled" in state:
+        # The sidebar toggle is drawn last, so pick up a change before this rerun's spans
+        tracer.enabled = state["perf_enabled"]
+    tracer.begin_run()
+    return tracer
+
+
+def performance_panel(tracer):
+    """Sidebar toggle plus, when enabled, this rerun's stage timings and recent history.
+
+    Call at the end of the script so the rerun's spans are complete.
+    """
+    import pandas as pd
+    import streamlit as st
+
+    run = tracer.end_run()
+    with st.sidebar:
+        tracer.enabled = st.toggle("⏱ Performance", value=tracer.enabled, key="perf_enabled")
+        if not tracer.enabled or run is None:
+            return
+        col1, col2 = st.columns(2)
+        col1.metric("Rerun", f"{run['total_s'] * 1000:.0f} ms")
+        if run["rss_mb"] is not None:
+            col2.metric("Memory", f"{run['rss_mb']:.0f} MB")
+        if run["spans"]:
+            spans = pd.DataFrame(run["spans"])
+            spans["stage"] = ["  " * d + n for d, n in zip(spans["depth"], spans["name"])]
+            spans["ms"] = spans["seconds"] * 1000
+            st.dataframe(spans[["stage", "ms", "rss_delta_mb"]], hide_index=True, use_container_width=True)
+        if len(tracer.runs) > 1:
+            history = pd.DataFrame({"run": [r["run"] for r in tracer.runs],
+                                    "ms": [r["total_s"] * 1000 for r in tracer.runs]}).set_index("run")
+            st.line_chart(history)
@@ -0,0 +1,319 @@
+"""Columnar, typed record stores for placements and bids.
+
+The apps used to keep placements and bids in ``st.session_state`` as lists
+of dicts and build a DataFrame from them on every rerun. A ``RecordStore``
+keeps one NumPy array per column instead, grown by doubling, with
+identifiers (Vendor Name, Placement ID) interned to int32 codes. ``frame()``
+wraps the filled part of the arrays without copying them, and is cached
+until the next write. ``update`` writes the edited cells in place, so an
+edit costs the same however many rows there are; a frame handed out earlier
+sees the new values (``copy()`` it to keep a snapshot). ``delete`` and
+``replace`` swap in new column arrays.
+
+Every row gets a stable integer key, used as the frame's index, so edits
+made against a page of the table can be applied back by key. Keys count up
+from 0 unless the caller passes its own, e.g. the ids a database assigned,
+which must keep increasing.
+
+Stores keep the list-of-dicts surface the forms relied on: ``append``,
+``len``, truth value and ``store[i]`` for a single record.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Column kinds: "id" (interned), "float", "date" (datetime64[ns]), "text"
+PLACEMENT_SCHEMA = {
+    "Placement ID": "id",
+    "Name": "text",
+    "Start Date": "date",
+    "End Date": "date",
+    "Base CPM": "float",
+}
+BID_SCHEMA = {
+    "Vendor Name": "id",
+    "Placement ID": "id",
+    "Bid CPM": "float",
+    "Start Date": "date",
+    "End Date": "date",
+    "Notes": "text",
+}
+
+_DTYPES = {"id": np.int32, "float": np.float64, "date": "datetime64[ns]", "text": object}
+_MISSING = {"id": -1, "float": np.nan, "date": np.datetime64("NaT", "ns"), "text": None}
+
+
+def _missing(value):
+    return value is None or (not isinstance(value, str) and pd.isna(value))
+
+
+class RecordStore:
+    """Append-friendly columnar table with a fixed schema."""
+
+    def __init__(self, schema, records=(), capacity=1024):
+        self.schema = dict(schema)
+        self._n = 0
+        self._columns = {col: np.empty(capacity, dtype=_DTYPES[kind]) for col, kind in self.schema.items()}
+        self._keys = np.empty(capacity, dtype=np.int64)
+        self._next_key = 0
+        self._categories = {col: [] for col, kind in self.schema.items() if kind == "id"}
+        self._codes = {col: {} for col in self._categories}
+        self._frame = None
+        self.version = 0
+        if len(records):
+            self.extend(records)
+
+    def __len__(self):
+        return self._n
+
+    def __bool__(self):
+        return self._n > 0
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("record index out of range")
+        return {col: self._value(col, i) for col in self.schema}
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self[i]
+
+    # ---- writes ----
+    def append(self, record, key=None):
+        """Add one row from a dict and return its key; missing or extra keys are ignored."""
+        self._reserve(self._n + 1)
+        i = self._n
+        for col in self.schema:
+            self._columns[col][i] = self._convert(col, record.get(col))
+        self._keys[i] = self._take_keys(1, None if key is None else [key])[0]
+        self._n += 1
+        self._changed()
+        return int(self._keys[i])
+
+    def extend(self, records, keys=None):
+        """Add many rows at once from a DataFrame or list of dicts."""
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records))
+        n = len(df)
+        if not n:
+            return
+        self._reserve(self._n + n)
+        rows = slice(self._n, self._n + n)
+        for col, kind in self.schema.items():
+            if col not in df.columns:
+                self._columns[col][rows] = _MISSING[kind]
+                continue
+            values = df[col]
+            if kind == "id":
+                self._columns[col][rows] = self._intern_many(col, values)
+            elif kind == "date":
+                self._columns[col][rows] = pd.to_datetime(values, errors="coerce").to_numpy(dtype="datetime64[ns]")
+            elif kind == "float":
+                self._columns[col][rows] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+            else:
+                self._columns[col][rows] = values.astype(object).where(values.notna(), None).to_numpy()
+        self._keys[rows] = self._take_keys(n, keys)
+        self._n += n
+        self._changed()
+
+    def replace(self, records, keys=None):
+        """Replace every row, e.g. with the table returned by ``st.data_editor``."""
+        self._n = 0
+        # Fresh arrays, so frames handed out before the replace keep their rows
+        self._columns = {col: np.empty_like(arr) for col, arr in self._columns.items()}
+        self._keys = np.empty_like(self._keys)
+        self.extend(records, keys)
+        self._changed()
+
+    def update(self, changes):
+        """Apply ``{key: {column: value}}`` edits; returns the number of rows changed."""
+        positions = self.positions(list(changes))
+        touched = False
+        for pos, values in zip(positions.tolist(), changes.values()):
+            for col, value in values.items():
+                if col in self.schema:
+                    self._columns[col][pos] = self._convert(col, value)
+                    touched = True
+        if touched:
+            self._changed()
+        return len(positions) if touched else 0
+
+    def delete(self, keys):
+        """Drop the rows with these keys; returns the number removed."""
+        keep = np.ones(self._n, dtype=bool)
+        keep[self.positions(keys)] = False
+        removed = self._n - int(keep.sum())
+        if removed:
+            capacity = len(self._keys)
+            for col, arr in self._columns.items():
+                compact = np.empty(capacity, dtype=arr.dtype)
+                compact[:self._n - removed] = arr[:self._n][keep]
+                self._columns[col] = compact
+            compact = np.empty(capacity, dtype=np.int64)
+            compact[:self._n - removed] = self._keys[:self._n][keep]
+            self._keys = compact
+            self._n -= removed
+            self._changed()
+        return removed
+
+    def apply_changes(self, changes, keys=None):
+        """Apply ``{"updated": {key: {...}}, "deleted": [keys], "added": [records]}``,
+        as produced by ``table_view.editor_changes``. ``keys`` are the added
+        rows' keys if the caller assigns them.
+
+        Returns what changed in the same shape, with the keys of added rows,
+        plus ``"placements"``: every Placement ID the changed rows had before
+        or have after, so callers can re-clear just those placements.
+        """
+        updated = changes.get("updated", {})
+        deleted = list(changes.get("deleted", []))
+        added = changes.get("added", [])
+        placements = set()
+        if "Placement ID" in self.schema:
+            for pos in self.positions(list(updated) + deleted).tolist():
+                placements.add(self._value("Placement ID", pos))
+            placements.update(values.get("Placement ID") for values in updated.values())
+            placements.update(record.get("Placement ID") for record in added)
+        self.update(updated)
+        self.delete(deleted)
+        keys = [self.append(record, key) for record, key in zip(added, keys or [None] * len(added))]
+        return {"updated": list(updated), "deleted": deleted, "added": keys,
+                "placements": {pid for pid in placements if not _missing(pid)}}
+
+    def clear(self):
+        self.replace([])
+
+    # ---- reads ----
+    def column(self, col):
+        """Read-only view of a column's filled part (codes for id columns)."""
+        view = self._columns[col][:self._n]
+        view.flags.writeable = False
+        return view
+
+    def keys(self):
+        """Row keys in row order (read-only)."""
+        view = self._keys[:self._n]
+        view.flags.writeable = False
+        return view
+
+    def positions(self, keys):
+        """Row positions of ``keys``; keys are kept in ascending order, so this is a binary search."""
+        keys = np.asarray(keys, dtype=np.int64)
+        pos = np.searchsorted(self._keys[:self._n], keys)
+        found = (pos < self._n) & (self._keys[np.minimum(pos, max(self._n - 1, 0))] == keys)
+        if not found.all():
+            raise KeyError(f"unknown row keys: {keys[~found].tolist()}")
+        return pos
+
+    def __contains__(self, key):
+        pos = np.searchsorted(self._keys[:self._n], key)
+        return bool(pos < self._n and self._keys[pos] == key)
+
+    def categories(self, col):
+        """Distinct values seen in an id column, in first-seen order."""
+        return list(self._categories[col])
+
+    def frame(self, categorical=True):
+        """The rows as a DataFrame over the column arrays.
+
+        Id columns come back categorical (zero-copy over the codes); pass
+        ``categorical=False`` for plain object columns, e.g. for
+        ``st.data_editor`` where new values must be typeable. The columns
+        are read-only views of the store; ``copy()`` the frame to modify it.
+        """
+        if categorical and self._frame is not None:
+            return self._frame
+        data = {}
+        for col, kind in self.schema.items():
+            values = self.column(col)
+            if kind == "id":
+                categories = pd.Index(self._categories[col], dtype=object)
+                cat = pd.Categorical.from_codes(values, categories=categories)
+                data[col] = cat if categorical else np.asarray(cat, dtype=object)
+            else:
+                data[col] = values
+        frame = pd.DataFrame(data, columns=list(self.schema), index=pd.Index(self.keys(), name="Row"), copy=False)
+        if categorical:
+            self._frame = frame
+        return frame
+
+    def to_records(self):
+        return list(self)
+
+    # ---- internals ----
+    def _convert(self, col, value):
+        kind = self.schema[col]
+        if _missing(value):
+            return _MISSING[kind]
+        if kind == "id":
+            return self._intern(col, value)
+        if kind == "date":
+            return pd.Timestamp(value).to_datetime64()
+        if kind == "float":
+            return float(value)
+        return value
+
+    def _value(self, col, i):
+        kind = self.schema[col]
+        value = self._columns[col][i]
+        if kind == "id":
+            return None if value < 0 else self._categories[col][value]
+        if kind == "date":
+            return pd.Timestamp(value) if not np.isnat(value) else pd.NaT
+        if kind == "float":
+            return float(value)
+        return value
+
+    def _intern(self, col, value):
+        codes = self._codes[col]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._categories[col])
+            self._categories[col].append(value)
+        return code
+
+    def _intern_many(self, col, values):
+        codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=True)
+        mapping = np.array([self._intern(col, v) for v in uniques], dtype=np.int32)
+        return np.where(codes < 0, -1, mapping[codes] if len(mapping) else -1).astype(np.int32)
+
+    def _take_keys(self, n, keys=None):
+        """``n`` new keys: ``keys`` if given (they must exceed every key in use), else the next ones."""
+        if keys is None:
+            keys = np.arange(self._next_key, self._next_key + n, dtype=np.int64)
+        else:
+            keys = np.asarray(keys, dtype=np.int64)
+            floor = self._keys[self._n - 1] if self._n else -1
+            if len(keys) != n or (n and (keys[0] <= floor or (np.diff(keys) <= 0).any())):
+                raise ValueError("row keys must be increasing and above the keys in use")
+        if n:
+            self._next_key = max(self._next_key, int(keys[-1]) + 1)
+        return keys
+
+    def _reserve(self, size):
+        capacity = len(self._keys)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for col, arr in self._columns.items():
+            grown = np.empty(capacity, dtype=arr.dtype)
+            grown[:self._n] = arr[:self._n]
+            self._columns[col] = grown
+        grown = np.empty(capacity, dtype=np.int64)
+        grown[:self._n] = self._keys[:self._n]
+        self._keys = grown
+
+    def _changed(self):
+        self._frame = None
+        self.version += 1
+
+
+def placement_store(records=()):
+    return RecordStore(PLACEMENT_SCHEMA, records)
+
+
+def bid_store(records=(), keys=None):
+    store = RecordStore(BID_SCHEMA)
+    store.extend(records, keys)
+    return store
@@ -0,0 +1,116 @@
+"""On-demand vendor chart and PDF rendering with a bounded cache.
+
+Charts are drawn on a standalone ``matplotlib.figure.Figure`` (never
+registered with pyplot, so nothing accumulates between reruns) and
+returned as PNG bytes; PDFs are returned as bytes too. ``RenderCache`` keeps
+the most recently used outputs, keyed by vendor, date range and auction
+version, under both an entry and a byte budget.
+"""
+
+import os
+import tempfile
+from collections import OrderedDict
+from io import BytesIO
+
+from auction_core.perf import traced
+
+
+@traced("render.chart")
+def render_spend_chart(chart_df, vendor, color):
+    """PNG of spend over time by placement for one vendor."""
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
+    chart_df.plot(kind="line", ax=ax, marker="o", color=[color] * len(chart_df.columns))
+    ax.set_title(f"Spend Over Time by Placement - {vendor}")
+    ax.set_ylabel("Spend ($)")
+    ax.set_xlabel("Date")
+    ax.grid(True)
+    buf = BytesIO()
+    fig.savefig(buf, format="png")
+    fig.clear()
+    return buf.getvalue()
+
+
+@traced("render.chart")
+def render_bar_chart(series, title, color=None):
+    """PNG bar chart of ``series`` (e.g. spend by placement)."""
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
+    series.plot(kind="bar", ax=ax, color=color)
+    ax.set_title(title)
+    buf = BytesIO()
+    fig.savefig(buf, format="png")
+    fig.clear()
+    return buf.getvalue()
+
+
+@traced("render.pdf")
+def render_vendor_pdf(vendor, start_date, end_date, summary, chart_png=None):
+    """Vendor report PDF; ``summary`` needs Total_Spend, Total_Impressions and Days_Booked."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt=f"Ad Auction Report for {vendor}", ln=True, align="C")
+    pdf.ln(10)
+    pdf.cell(200, 10, txt=f"Date Range: {start_date} to {end_date}", ln=True)
+    pdf.ln(5)
+    pdf.cell(200, 10, txt=f"Total Spend: ${summary.Total_Spend:.2f}", ln=True)
+    pdf.cell(200, 10, txt=f"Total Impressions: {int(summary.Total_Impressions)}", ln=True)
+    pdf.cell(200, 10, txt=f"Days Booked: {int(summary.Days_Booked)}", ln=True)
+    if chart_png is not None:
+        # PyFPDF only reads images from files
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "chart.png")
+            with open(path, "wb") as f:
+                f.write(chart_png)
+            pdf.ln(5)
+            pdf.image(path, w=180)
+
+    data = pdf.output(dest="S")
+    # PyFPDF returns a latin-1 str, fpdf2 a bytearray
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+
+class RenderCache:
+    """LRU cache of rendered bytes bounded by entry count and total size."""
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if key in self._items:
+            self.nbytes -= len(self._items.pop(key))
+        self._items[key] = value
+        self.nbytes += len(value)
+        while self._items and (len(self._items) > self.max_entries or self.nbytes > self.max_bytes):
+            _, evicted = self._items.popitem(last=False)
+            self.nbytes -= len(evicted)
+        return value
+
+    def get_or_render(self, key, render):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, render())
+        return value
+
+    def clear(self):
+        self._items.clear()
+        self.nbytes = 0
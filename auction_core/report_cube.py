@@ -0,0 +1,117 @@
+"""Pre-aggregated vendor report cube over the daily delivery plan.
+
+Built once per auction, the cube holds spend, impressions and row counts
+for each (Vendor, Placement ID) pair and day that has delivery, sorted by
+pair then day, together with running (prefix) sums over that order. Only
+days with delivery are stored, so a sparse history costs memory in
+proportion to its rows, not to pairs x days. A pair's days are contiguous
+and sorted, so a date range becomes a ``searchsorted`` per pair, totals
+become differences of prefix sums, and a vendor's per-day chart series is
+gathered from its pairs' entries in range; the Vendor Reports tab no
+longer re-filters the whole delivery frame for every vendor on every rerun.
+"""
+
+import numpy as np
+import pandas as pd
+
+from auction_core.perf import traced
+
+
+def _day_number(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64)
+
+
+def _group_sums(keys, *weights):
+    """Sorted unique ``keys``, each key's row count and its sum of each weight."""
+    unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    return unique, counts, [np.bincount(inverse, weights=w, minlength=len(unique)) for w in weights]
+
+
+def _prefix(values):
+    out = np.zeros(len(values) + 1, dtype=values.dtype)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+class ReportCube:
+    @traced("reports.cube")
+    def __init__(self, delivery):
+        self.source = delivery
+        days = pd.to_datetime(delivery["Date"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+        vendors = np.asarray(delivery["Vendor"], dtype=object)
+        placements = np.asarray(delivery["Placement ID"], dtype=object)
+
+        pairs = pd.MultiIndex.from_arrays([vendors, placements]).unique().sort_values()
+        self.pairs = pairs
+        self.vendors = pairs.get_level_values(0).unique()
+        self._pair_vendor = self.vendors.get_indexer(pairs.get_level_values(0))
+        self._vendor_pairs = {v: np.flatnonzero(self._pair_vendor == i) for i, v in enumerate(self.vendors)}
+
+        # Entries are keyed group * span + (day - first day), so sorting the keys
+        # sorts by group, then day
+        self._first_day = int(days.min()) if len(days) else 0
+        self._span = int(days.max()) - self._first_day + 1 if len(days) else 1
+        offset = days - self._first_day
+        pair = pairs.get_indexer(pd.MultiIndex.from_arrays([vendors, placements]))
+
+        keys, rows, (spend, impressions) = _group_sums(
+            pair * self._span + offset,
+            np.asarray(delivery["Spend"], dtype=float), np.asarray(delivery["Impressions"], dtype=float))
+        self._pair_keys = keys
+        self._pair_day = keys % self._span
+        self._cum_spend = _prefix(spend)
+        self._cum_impressions = _prefix(impressions)
+        self._cum_rows = _prefix(rows)
+
+        # Distinct (vendor, day) entries; a range's count is the vendor's Days_Booked
+        self._vendor_keys = np.unique(self._pair_vendor[pair] * self._span + offset) if len(pair) else keys
+
+    def _offsets(self, start, end):
+        """``start``..``end`` as day offsets clipped to the cube's span; empty if ``lo > hi``."""
+        lo = min(max(_day_number(start) - self._first_day, 0), self._span)
+        hi = min(max(_day_number(end) - self._first_day, -1), self._span - 1)
+        return lo, hi
+
+    def _ranges(self, keys, groups, start, end):
+        """Entry ranges ``[lo, hi)`` of each group's days in ``start``..``end``."""
+        lo_day, hi_day = self._offsets(start, end)
+        lo = np.searchsorted(keys, groups * self._span + lo_day, side="left")
+        hi = np.searchsorted(keys, groups * self._span + hi_day, side="right")
+        return lo, np.maximum(lo, hi)
+
+    def vendor_totals(self, start, end):
+        """Total_Impressions, Total_Spend and Days_Booked per vendor in the range."""
+        n_vendors = len(self.vendors)
+        lo, hi = self._ranges(self._pair_keys, np.arange(len(self.pairs)), start, end)
+        spend = np.bincount(self._pair_vendor, self._cum_spend[hi] - self._cum_spend[lo], n_vendors)
+        imps = np.bincount(self._pair_vendor, self._cum_impressions[hi] - self._cum_impressions[lo], n_vendors)
+        v_lo, v_hi = self._ranges(self._vendor_keys, np.arange(n_vendors), start, end)
+        return pd.DataFrame({
+            "Total_Impressions": imps.astype(np.int64),
+            "Total_Spend": spend,
+            "Days_Booked": v_hi - v_lo,
+        }, index=pd.Index(self.vendors, name="Vendor"))
+
+    def daily_spend(self, vendor, start, end):
+        """Spend per day (rows) and placement (columns) for one vendor.
+
+        Same frame as ``groupby(["Date", "Placement ID"]).sum().unstack().fillna(0)``
+        over the vendor's rows in the range.
+        """
+        pairs = self._vendor_pairs.get(vendor, np.array([], dtype=np.int64))
+        lo, hi = self._ranges(self._pair_keys, pairs, start, end)
+        keep = hi > lo
+        pairs, lo, hi = pairs[keep], lo[keep], hi[keep]
+
+        counts = hi - lo
+        entries = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        column = np.repeat(np.arange(len(pairs)), counts)
+        days, row = np.unique(self._pair_day[entries], return_inverse=True)
+        grid = np.zeros((len(days), len(pairs)))
+        grid[row, column] = self._cum_spend[entries + 1] - self._cum_spend[entries]
+        return pd.DataFrame(
+            grid,
+            index=pd.DatetimeIndex((days + self._first_day).astype("datetime64[D]").astype("datetime64[ns]"),
+                                   name="Date"),
+            columns=pd.Index(self.pairs.get_level_values(1)[pairs], name="Placement ID"),
+        )
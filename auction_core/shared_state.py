@@ -0,0 +1,337 @@
+"""Process-wide placements and bids shared by every Streamlit session.
+
+Each session used to load its own copy of a worksheet and save the whole
+edited table back, so the last session to save silently dropped everyone
+else's edits. A ``SharedTable`` holds one in-memory copy of a worksheet per
+process instead. Every row has a key and a version, and the table keeps a
+change feed of the keys touched by each version.
+
+A session works on a ``TableSnapshot``. ``refresh`` brings a snapshot up to
+date by applying only the rows in the change feed since its version.
+``save`` writes a session's edits with optimistic locking: if any edited or
+deleted row changed since the session saw it, nothing is written and
+``ConflictError`` lists those rows.
+
+Changes made outside this process show up once the ``SheetsStore`` TTL
+lapses; they are diffed by sheet position into the same change feed.
+
+With a ``writer`` (``write_queue.WriteBehindQueue``) commits are applied in
+memory at once and written to the sheet in the background.
+"""
+
+import threading
+from collections import deque
+
+import pandas as pd
+
+from auction_core.perf import traced
+from auction_core.sheets import cell_value, diff_rows, numericise
+
+FEED_SIZE = 10_000
+
+_tables = {}
+_lock = threading.Lock()
+
+
+class ConflictError(RuntimeError):
+    """Rows changed by another session since the saving session loaded them."""
+
+    def __init__(self, keys):
+        super().__init__(f"{len(keys)} row(s) were changed by someone else: {sorted(keys)}")
+        self.keys = keys
+
+
+class TableSnapshot:
+    """One session's view of a ``SharedTable``: a frame indexed by row key."""
+
+    def __init__(self, frame, versions, version):
+        self.frame = frame
+        self.versions = versions
+        self.version = version
+
+
+def shared_table(store, title, writer=None):
+    """The process-wide ``SharedTable`` for a worksheet of ``store``."""
+    with _lock:
+        if (store, title) not in _tables:
+            _tables[store, title] = SharedTable(store, title, writer=writer)
+        return _tables[store, title]
+
+
+def session_snapshot(table, state, key, hold=False):
+    """The snapshot of ``table`` kept in ``state[key]`` (e.g. ``st.session_state``).
+
+    It is refreshed from the change feed on every call unless ``hold`` is
+    set: on the rerun that saves an editor's changes, the snapshot must stay
+    the one the editor was drawn from, or ``save`` could not tell that
+    another session changed the same rows in between.
+    """
+    snap = state.get(key)
+    if snap is None or not hold:
+        snap = state[key] = table.refresh(snap)
+    return snap
+
+
+def _normalise(value):
+    """A cell as it reads back from the sheet."""
+    value = cell_value(value)
+    return numericise(str(value)) if isinstance(value, (str, bool)) else value
+
+
+def _sheet_frame(order, rows, columns, new=()):
+    """Rows in sheet order, labelled by key, as ``SheetsStore.save_frame`` diffs them."""
+    # New rows get negative labels, so they never match a snapshot row
+    return pd.DataFrame([rows[key] for key in order] + list(new), columns=columns,
+                        index=list(order) + list(range(-len(new), 0)))
+
+
+class SharedTable:
+    """Versioned rows of one worksheet, with a change feed."""
+
+    def __init__(self, store, title, feed_size=FEED_SIZE, writer=None):
+        self.store = store
+        self.title = title
+        self.writer = writer
+        self.columns = []
+        self.version = 0
+        self._rows = {}
+        self._row_versions = {}
+        self._order = []
+        self._next_key = 0
+        self._feed = deque(maxlen=feed_size)
+        self._source = None
+        # Order and rows as last written to the sheet, while writes are pending
+        self._written = None
+        self._lock = threading.RLock()
+
+    @property
+    def pending(self):
+        """Whether there are changes not yet written to the sheet."""
+        return self._written is not None
+
+    # ---- reads ----
+    def sync(self):
+        """Pick up the worksheet as the store currently has it (refetched once its TTL lapses)."""
+        with self._lock:
+            if self._written is not None:
+                # The sheet is behind memory until the pending writes land
+                return
+            records = self.store.records(self.title)
+            if records is self._source:
+                return
+            first = self._source is None
+            self._source = records
+            # Columns come from the header row, which a sheet has even without data rows
+            self.columns = list(self.store.header(self.title)) or self.columns
+            for pos, record in enumerate(records):
+                if pos < len(self._order):
+                    key = self._order[pos]
+                    if self._rows[key] != record:
+                        self._set(key, record)
+                else:
+                    self._insert(record)
+            for key in self._order[len(records):]:
+                self._remove(key)
+            del self._order[len(records):]
+            if first and self.writer is not None:
+                self._replay(self.writer.recovered(self.title))
+
+    def snapshot(self):
+        """A fresh ``TableSnapshot`` of every row."""
+        with self._lock:
+            self.sync()
+            frame = pd.DataFrame([self._rows[key] for key in self._order],
+                                 index=pd.Index(self._order, name="Row", dtype="int64"), columns=self.columns)
+            return TableSnapshot(frame, dict(self._row_versions), self.version)
+
+    def changes_since(self, version):
+        """Keys changed after ``version``, or None if the feed no longer reaches back that far."""
+        with self._lock:
+            if version == self.version:
+                return set()
+            if not self._feed or self._feed[0][0] > version + 1:
+                return None
+            return {key for v, key in self._feed if v > version}
+
+    @traced("shared.refresh")
+    def refresh(self, snap=None):
+        """Bring ``snap`` up to date in place, touching only changed rows; returns it.
+
+        Returns a new snapshot when ``snap`` is None or too old for the feed.
+        """
+        with self._lock:
+            self.sync()
+            keys = None if snap is None else self.changes_since(snap.version)
+            if keys is None:
+                return self.snapshot()
+            if not keys:
+                return snap
+            gone = [key for key in keys if key not in self._rows and key in snap.frame.index]
+            frame = snap.frame.drop(index=gone)
+            for key in sorted(keys & self._rows.keys()):
+                frame.loc[key] = [self._rows[key].get(col, "") for col in self.columns]
+                snap.versions[key] = self._row_versions[key]
+            for key in gone:
+                snap.versions.pop(key, None)
+            snap.frame = frame
+            snap.version = self.version
+            return snap
+
+    # ---- writes ----
+    def save(self, snap, edited):
+        """Write the rows of ``edited`` that differ from ``snap.frame``.
+
+        Rows are matched by row key (the index, as ``st.data_editor`` keeps
+        it) and written through ``apply_changes``.
+        """
+        updated, deleted, inserted = diff_rows(snap.frame, edited)
+        keys = snap.frame.index
+        return self.apply_changes(snap, {
+            "updated": {int(keys[pos]): dict(zip(edited.columns, row)) for pos, row in updated.items()},
+            "deleted": [int(keys[pos]) for pos in deleted],
+            "added": [dict(zip(edited.columns, row)) for row in inserted],
+        })
+
+    @traced("shared.save")
+    def apply_changes(self, snap, edits):
+        """Write keyed edits ``{"updated": {key: {col: value}}, "deleted": [keys],
+        "added": [rows]}``, as ``table_view.editor_changes`` returns them for a
+        page of ``snap.frame``.
+
+        Raises ``ConflictError`` without writing anything if an edited or
+        deleted row has a newer version than ``snap`` saw. On success the
+        snapshot is refreshed and ``(updated, deleted, inserted)`` counts
+        are returned.
+        """
+        changes = edits.get("updated", {})
+        removed = list(edits.get("deleted", []))
+        added = list(edits.get("added", []))
+        with self._lock:
+            self.sync()
+            conflicts = [key for key in list(changes) + removed
+                         if self._row_versions.get(key) != snap.versions.get(key)]
+            if conflicts:
+                raise ConflictError(conflicts)
+            self.commit(changes, removed, added)
+            self.refresh(snap)
+        return len(changes), len(removed), len(added)
+
+    def append(self, row):
+        """Append one row given as a list in column order; returns its key."""
+        with self._lock:
+            self.sync()
+            self._require_columns()
+            if self.writer is not None:
+                return self.commit({}, (), [dict(zip(self.columns, row))])[0]
+            self.store.append_row(self.title, row)
+            key = self._insert(dict(zip(self.columns, row)))
+            self._primed()
+            return key
+
+    def commit(self, changes, removed=(), added=()):
+        """Apply updates ``{key: {col: value}}``, deletions and appended rows;
+        returns the new rows' keys.
+
+        Without a writer they are written in one batch first; with one they
+        are applied at once and handed to the writer.
+        """
+        with self._lock:
+            if added:
+                self._require_columns()
+            columns = self.columns
+            removed = set(removed)
+            kept = [key for key in self._order if key not in removed]
+            rows = {key: {col: _normalise(value) for col, value in {**self._rows[key], **values}.items()}
+                    for key, values in changes.items()}
+            new = [{col: _normalise(row.get(col, "")) for col in columns} for row in added]
+            if self.writer is None:
+                self.store.save_frame(self.title, _sheet_frame(kept, {**self._rows, **rows}, columns, new),
+                                      _sheet_frame(self._order, self._rows, columns))
+            elif self._written is None:
+                self._written = (list(self._order), dict(self._rows))
+            # Journal entries identify rows by content, since keys don't survive a restart
+            ops = ([{"op": "update", "before": self._rows[key], "after": row} for key, row in rows.items()]
+                   + [{"op": "delete", "row": self._rows[key]} for key in removed]
+                   + [{"op": "append", "row": row} for row in new])
+            for key, row in rows.items():
+                self._set(key, row)
+            for key in removed:
+                self._remove(key)
+            self._order = kept
+            keys = [self._insert(row) for row in new]
+            if self.writer is None:
+                self._primed()
+            else:
+                self.writer.submit(self, ops)
+            return keys
+
+    def flush(self):
+        """Write everything committed since the last flush as one batch.
+
+        Called by the writer. Returns the writer sequence number the write
+        covers, or None if nothing was pending.
+        """
+        with self._lock:
+            if self._written is None:
+                return None
+            order, rows = self._written
+            state = (list(self._order), dict(self._rows))
+            version, upto = self.version, self.writer.seq
+        self.store.save_frame(self.title, _sheet_frame(*state, self.columns), _sheet_frame(order, rows, self.columns))
+        with self._lock:
+            if self.version == version:
+                self._written = None
+                self._primed()
+            else:
+                self._written = state
+            return upto
+
+    # ---- internals ----
+    def _set(self, key, record):
+        self.version += 1
+        self._rows[key] = {col: _normalise(value) for col, value in record.items()}
+        self._row_versions[key] = self.version
+        self._feed.append((self.version, key))
+
+    def _insert(self, record):
+        key = self._next_key
+        self._next_key += 1
+        self._order.append(key)
+        self._set(key, record)
+        return key
+
+    def _remove(self, key):
+        """Drop a row's data; the caller takes it out of ``_order``."""
+        self.version += 1
+        del self._rows[key]
+        del self._row_versions[key]
+        self._feed.append((self.version, key))
+
+    def _replay(self, ops):
+        """Re-apply journalled writes that hadn't reached the sheet before a restart."""
+        if not ops:
+            return
+        self._written = (list(self._order), dict(self._rows))
+        for op in ops:
+            if op["op"] == "append":
+                self._insert(op["row"])
+                continue
+            match = op["before"] if op["op"] == "update" else op["row"]
+            key = next((key for key in self._order if self._rows[key] == match), None)
+            if key is None:
+                continue
+            if op["op"] == "update":
+                self._set(key, op["after"])
+            else:
+                self._remove(key)
+                self._order.remove(key)
+        self.writer.submit(self, ())
+
+    def _require_columns(self):
+        if not self.columns:
+            raise ValueError(f"worksheet {self.title!r} has no header row; add the column names first")
+
+    def _primed(self):
+        """Hand the known sheet contents to the store so the write isn't read back."""
+        self._source = [dict(self._rows[key]) for key in self._order]
+        self.store.prime(self.title, self._source, self.columns)
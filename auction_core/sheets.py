@@ -0,0 +1,270 @@
+"""Cached, batched access to the "Ad Auction Database" spreadsheet.
+
+Streamlit re-executes the app script on every widget interaction, but
+imported modules live for the whole process. The authorized client,
+spreadsheet and worksheet handles are therefore cached here once per
+process, and worksheet contents are cached with a TTL and dropped whenever
+this process writes to that worksheet. Stale worksheets are fetched together
+in one ``values_batch_get`` call instead of one ``get_all_records`` each.
+
+Works against any object with gspread's Spreadsheet/Worksheet interface;
+``tests/fake_sheets.py`` provides an in-memory one for tests.
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+from auction_core.perf import span, traced
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+SPREADSHEET_NAME = "Ad Auction Database"
+DEFAULT_TTL = 60.0
+
+_stores = {}
+_lock = threading.Lock()
+
+
+def authorize(service_account_info):
+    """Authorized gspread client for a service account."""
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    credentials = ServiceAccountCredentials.from_json_keyfile_dict(dict(service_account_info), SCOPE)
+    return gspread.authorize(credentials)
+
+
+def get_store(service_account_info, name=SPREADSHEET_NAME, ttl=DEFAULT_TTL):
+    """Process-wide ``SheetsStore`` for a spreadsheet, authorizing on first use."""
+    key = (service_account_info.get("client_email"), name)
+    with _lock:
+        if key not in _stores:
+            _stores[key] = SheetsStore(authorize(service_account_info).open(name), ttl=ttl)
+        return _stores[key]
+
+
+def a1_sheet(title):
+    """A1 range covering a whole worksheet."""
+    return "'{}'".format(title.replace("'", "''"))
+
+
+def numericise(value):
+    """Convert a cell string to int or float where possible, like get_all_records."""
+    if not isinstance(value, str) or value == "":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def values_to_records(values):
+    """Turn a header row plus data rows into ``get_all_records``-style dicts."""
+    if not values:
+        return []
+    header = values[0]
+    records = []
+    for row in values[1:]:
+        row = list(row) + [""] * (len(header) - len(row))
+        records.append({col: numericise(cell) for col, cell in zip(header, row)})
+    return records
+
+
+class SheetsStore:
+    """Worksheet handles and TTL-cached contents for one spreadsheet."""
+
+    def __init__(self, spreadsheet, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.spreadsheet = spreadsheet
+        self.ttl = ttl
+        self._clock = clock
+        self._worksheets = {}
+        self._cache = {}
+        self._snapshots = {}
+        self._lock = threading.RLock()
+
+    def worksheet(self, title):
+        with self._lock:
+            if title not in self._worksheets:
+                self._worksheets[title] = self.spreadsheet.worksheet(title)
+            return self._worksheets[title]
+
+    def _fresh(self, title):
+        entry = self._cache.get(title)
+        return entry is not None and self._clock() - entry[0] < self.ttl
+
+    def prefetch(self, *titles):
+        """Fetch every stale worksheet among ``titles`` in a single batch read."""
+        with self._lock:
+            stale = [title for title in titles if not self._fresh(title)]
+            if not stale:
+                return
+            with span("sheets.read"):
+                response = self.spreadsheet.values_batch_get([a1_sheet(title) for title in stale])
+            now = self._clock()
+            for title, value_range in zip(stale, response.get("valueRanges", [])):
+                values = value_range.get("values", [])
+                header = list(values[0]) if values else []
+                self._cache[title] = (now, values_to_records(values), header)
+
+    def records(self, title):
+        """Worksheet rows as dicts, served from cache while fresh."""
+        with self._lock:
+            self.prefetch(title)
+            return self._cache[title][1]
+
+    def header(self, title):
+        """The worksheet's header row, served from cache like ``records``;
+        known even when the sheet has no data rows."""
+        with self._lock:
+            self.prefetch(title)
+            return self._cache[title][2]
+
+    def frame(self, title):
+        """Worksheet as a DataFrame; also kept as the snapshot ``save_frame`` diffs against."""
+        df = pd.DataFrame(self.records(title))
+        self._snapshots[title] = df
+        return df
+
+    def prime(self, title, records, header):
+        """Cache ``records`` and ``header`` as the worksheet's current contents,
+        e.g. after a write whose result is already known, instead of reading
+        it back."""
+        with self._lock:
+            self._cache[title] = (self._clock(), records, list(header))
+
+    def invalidate(self, *titles):
+        with self._lock:
+            for title in titles or list(self._cache):
+                self._cache.pop(title, None)
+
+    # ---- writes ----
+    @traced("sheets.append")
+    def append_row(self, title, row):
+        self.worksheet(title).append_row(row)
+        self.invalidate(title)
+
+    def replace(self, title, df):
+        """Overwrite a worksheet with a DataFrame, header included.
+
+        Written as one request that also blanks any leftover rows, so readers
+        never see the sheet empty.
+        """
+        old = self.records(title)
+        width = max(len(df.columns), len(old[0]) if old else 0)
+        rows = [list(df.columns)] + df.values.tolist()
+        rows += [[]] * (len(old) + 1 - len(rows))
+        self._batch(title, [_update_cells(self.worksheet(title).id, 0, rows, width)])
+
+    def save_frame(self, title, edited, snapshot=None):
+        """Persist only the rows of ``edited`` that differ from ``snapshot``.
+
+        ``snapshot`` defaults to the last ``frame(title)``; rows are matched by
+        index label, as ``st.data_editor`` keeps them. Updates, deletions and
+        appends go out in a single ``batch_update``, which Sheets applies
+        atomically. Returns ``(updated, deleted, inserted)`` row counts.
+        """
+        if snapshot is None:
+            snapshot = self._snapshots.get(title)
+        if snapshot is None or list(snapshot.columns) != list(edited.columns):
+            self.replace(title, edited)
+            return len(edited), 0, len(edited)
+
+        updated, deleted, inserted = diff_rows(snapshot, edited)
+        sheet_id = self.worksheet(title).id
+        width = len(edited.columns)
+        requests = []
+        # Grid row 0 is the header, so snapshot position p lives at row p + 1
+        for start, rows in _runs(updated):
+            requests.append(_update_cells(sheet_id, start + 1, rows, width))
+        for start, rows in reversed(_runs({pos: None for pos in deleted})):
+            requests.append({"deleteDimension": {"range": {
+                "sheetId": sheet_id, "dimension": "ROWS",
+                "startIndex": start + 1, "endIndex": start + 1 + len(rows)}}})
+        if inserted:
+            requests.append({"appendCells": {
+                "sheetId": sheet_id, "fields": "userEnteredValue",
+                "rows": [_row_data(row, width) for row in inserted]}})
+        if requests:
+            self._batch(title, requests)
+        return len(updated), len(deleted), len(inserted)
+
+    @traced("sheets.write")
+    def _batch(self, title, requests):
+        self.spreadsheet.batch_update({"requests": requests})
+        self.invalidate(title)
+        self._snapshots.pop(title, None)
+
+
+def cell_value(value):
+    """Normalize a cell for comparison and upload."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def diff_rows(snapshot, edited):
+    """Row-level changes between two frames with the same columns.
+
+    Returns ``updated`` as ``{snapshot position: new row}``, ``deleted`` as
+    a sorted list of snapshot positions and ``inserted`` as a list of rows.
+    """
+    positions = {label: pos for pos, label in enumerate(snapshot.index)}
+    old_rows = [[cell_value(v) for v in row] for row in snapshot.itertuples(index=False)]
+    updated = {}
+    inserted = []
+    seen = set()
+    for label, row in zip(edited.index, edited.itertuples(index=False)):
+        row = [cell_value(v) for v in row]
+        pos = positions.get(label)
+        if pos is None:
+            inserted.append(row)
+            continue
+        seen.add(pos)
+        if row != old_rows[pos]:
+            updated[pos] = row
+    deleted = sorted(set(range(len(old_rows))) - seen)
+    return updated, deleted, inserted
+
+
+def _runs(by_position):
+    """Group ``{position: row}`` into contiguous ``(start, [rows])`` runs."""
+    runs = []
+    for pos in sorted(by_position):
+        if runs and runs[-1][0] + len(runs[-1][1]) == pos:
+            runs[-1][1].append(by_position[pos])
+        else:
+            runs.append((pos, [by_position[pos]]))
+    return runs
+
+
+def _row_data(row, width):
+    cells = []
+    for value in list(row) + [""] * (width - len(row)):
+        value = cell_value(value)
+        if isinstance(value, bool):
+            cells.append({"userEnteredValue": {"boolValue": value}})
+        elif isinstance(value, (int, float)):
+            cells.append({"userEnteredValue": {"numberValue": value}})
+        elif value == "":
+            cells.append({})
+        else:
+            cells.append({"userEnteredValue": {"stringValue": str(value)}})
+    return {"values": cells}
+
+
+def _update_cells(sheet_id, row_index, rows, width):
+    return {"updateCells": {
+        "start": {"sheetId": sheet_id, "rowIndex": row_index, "columnIndex": 0},
+        "rows": [_row_data(row, width) for row in rows],
+        "fields": "userEnteredValue"}}
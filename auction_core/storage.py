@@ -0,0 +1,524 @@
+"""Pluggable persistence for placements, bids and daily delivery.
+
+``Storage`` is the interface the apps talk to; ``SQLiteStorage`` keeps
+everything in a local SQLite file (WAL mode, stdlib only, works offline)
+with indexed tables. Auctions select each placement's top two bids with a
+window query over the bids index and reports aggregate delivery in SQL, so
+nothing is rebuilt from lists of dicts on a rerun. Bid tables are read a
+page at a time (``bids_page``, ``count_bids``), filtered in SQL, so a rerun
+never loads every bid.
+
+The other builds pick their backend with ``AD_AUCTION_BACKEND`` (see
+``backend``). ``SQLiteSheetStore`` stands in for ``sheets.SheetsStore`` so
+the Sheets builds can keep their worksheets in the same local file.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from auction_core.delivery import DELIVERY_COLUMNS, build_delivery
+from auction_core.engine import settle
+from auction_core.ids import DEFAULT_PATH
+from auction_core.perf import traced
+from auction_core.sheets import cell_value, diff_rows, numericise
+
+BACKEND = os.environ.get("AD_AUCTION_BACKEND")
+
+
+# Display column -> SQL column
+PLACEMENT_FIELDS = {
+    "Placement ID": "placement_id",
+    "Name": "name",
+    "URL": "url",
+    "Tags": "tags",
+    "Start Date": "start_date",
+    "End Date": "end_date",
+    "Base CPM": "base_cpm",
+}
+BID_FIELDS = {
+    "Vendor Name": "vendor_name",
+    "Placement ID": "placement_id",
+    "Bid CPM": "bid_cpm",
+    "Start Date": "start_date",
+    "End Date": "end_date",
+    "Notes": "notes",
+}
+DELIVERY_FIELDS = {
+    "Date": "date",
+    "Placement ID": "placement_id",
+    "Vendor": "vendor",
+    "CPM": "cpm",
+    "Impressions": "impressions",
+    "Spend": "spend",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS placements (
+    placement_id TEXT PRIMARY KEY,
+    name TEXT,
+    url TEXT,
+    tags TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    base_cpm REAL
+);
+CREATE TABLE IF NOT EXISTS bids (
+    bid_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vendor_name TEXT,
+    placement_id TEXT,
+    bid_cpm REAL,
+    start_date TEXT,
+    end_date TEXT,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS bids_by_placement ON bids (placement_id, bid_cpm DESC, bid_id);
+CREATE INDEX IF NOT EXISTS bids_by_placement_row ON bids (placement_id, bid_id);
+CREATE INDEX IF NOT EXISTS bids_by_vendor ON bids (vendor_name);
+CREATE TABLE IF NOT EXISTS daily_delivery (
+    date TEXT NOT NULL,
+    placement_id TEXT NOT NULL,
+    vendor TEXT NOT NULL,
+    cpm REAL,
+    impressions INTEGER,
+    spend REAL
+);
+CREATE INDEX IF NOT EXISTS delivery_by_date ON daily_delivery (date);
+CREATE INDEX IF NOT EXISTS delivery_by_vendor ON daily_delivery (vendor, date);
+CREATE INDEX IF NOT EXISTS delivery_by_placement ON daily_delivery (placement_id);
+"""
+
+TOP_TWO_SQL = """
+WITH ranked AS (
+    SELECT placement_id, vendor_name, bid_cpm, start_date, end_date,
+           ROW_NUMBER() OVER (PARTITION BY placement_id ORDER BY bid_cpm DESC, bid_id) AS rank
+    FROM bids
+)
+SELECT w.placement_id, w.vendor_name, w.bid_cpm, s.bid_cpm AS second_cpm, w.start_date, w.end_date
+FROM ranked w LEFT JOIN ranked s ON s.placement_id = w.placement_id AND s.rank = 2
+WHERE w.rank = 1
+"""
+
+SHEET_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheet_headers (title TEXT PRIMARY KEY, header TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS sheet_rows (
+    row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    cells TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sheet_rows_by_title ON sheet_rows (title, row_id);
+"""
+# Header rows for worksheets the Sheets builds expect, used when the file has none yet
+SHEET_HEADERS = {
+    "Placements": ["Placement ID", "Name", "URL", "Tags"],
+    "Vendor Bids": ["Vendor", "Placement", "CPM", "Spend"],
+}
+
+
+def backend(default):
+    """The backend named by ``AD_AUCTION_BACKEND`` ("sqlite", "sheets" or
+    "session"), else the build's ``default``."""
+    return BACKEND or default
+
+
+class Storage(ABC):
+    """Interface for the apps' persisted data: placements and bids in, the
+    cleared auction and its delivery reports out."""
+
+    @abstractmethod
+    def placements(self):
+        """Every placement, in the order added."""
+
+    @abstractmethod
+    def bids(self, vendor=None):
+        """Every bid, or one vendor's, in submission order, indexed by a
+        stable row key."""
+
+    @abstractmethod
+    def bids_page(self, offset, limit, placement_id=None, vendor=None):
+        """``limit`` bids from ``offset`` on, in submission order, optionally
+        only one placement's or one vendor's; indexed like ``bids``."""
+
+    @abstractmethod
+    def count_bids(self, placement_id=None, vendor=None):
+        """Number of bids ``bids_page`` pages through with the same filters."""
+
+    @abstractmethod
+    def vendors(self):
+        """Distinct vendor names that have bids, sorted."""
+
+    @abstractmethod
+    def add_placement(self, placement):
+        """Insert a placement, replacing one with the same Placement ID."""
+
+    @abstractmethod
+    def add_bid(self, bid):
+        """Append one bid; returns its row key."""
+
+    @abstractmethod
+    def apply_bid_changes(self, changes):
+        """Apply ``{"updated": {key: {column: value}}, "deleted": [keys], "added":
+        [bids]}``, as ``table_view.editor_changes`` returns them; returns the
+        added bids' row keys."""
+
+    @abstractmethod
+    def replace_placements(self, placements):
+        """Replace every placement, e.g. with an imported table."""
+
+    @abstractmethod
+    def replace_bids(self, bids):
+        """Replace every bid; returns the new row keys in order."""
+
+    @abstractmethod
+    def run_auction(self):
+        """Clear every placement, persist the delivery plan and return the cleared rows."""
+
+    @abstractmethod
+    def daily_delivery(self, start=None, end=None, vendor=None):
+        """Rows of the last delivery plan, optionally filtered by date range and vendor."""
+
+    @abstractmethod
+    def vendor_summary(self, start=None, end=None):
+        """Impressions, spend and days booked per vendor over a date range."""
+
+    @abstractmethod
+    def spend_by_placement(self, vendor, start=None, end=None):
+        """A vendor's spend per placement over a date range."""
+
+
+def _to_sql_value(value):
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()[:10]
+    return value
+
+
+def _rows(records, fields):
+    return [tuple(_to_sql_value(record.get(col)) for col in fields) for record in records]
+
+
+def _connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _as_dates(series):
+    return pd.to_datetime(series).dt.date
+
+
+class SQLiteStorage(Storage):
+    """SQLite-backed storage; one connection per thread, WAL journal."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    @traced("sqlite.query")
+    def _query(self, sql, params=(), fields=None):
+        df = pd.read_sql_query(sql, self._conn(), params=params)
+        if fields:
+            df = df.rename(columns={v: k for k, v in fields.items()})
+        return df
+
+    # ---- placements and bids ----
+    def placements(self):
+        df = self._query("SELECT * FROM placements ORDER BY rowid", fields=PLACEMENT_FIELDS)
+        for col in ("Start Date", "End Date"):
+            df[col] = _as_dates(df[col])
+        return df
+
+    def bids(self, vendor=None):
+        return self._bids(*self._bid_filter(None, vendor))
+
+    def bids_page(self, offset, limit, placement_id=None, vendor=None):
+        where, params = self._bid_filter(placement_id, vendor)
+        return self._bids(where, params, " LIMIT ? OFFSET ?", [int(limit), int(offset)])
+
+    def count_bids(self, placement_id=None, vendor=None):
+        where, params = self._bid_filter(placement_id, vendor)
+        return self._conn().execute(f"SELECT COUNT(*) FROM bids{where}", params).fetchone()[0]
+
+    def vendors(self):
+        rows = self._conn().execute(
+            "SELECT DISTINCT vendor_name FROM bids WHERE vendor_name IS NOT NULL ORDER BY vendor_name")
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _bid_filter(placement_id, vendor):
+        clauses, params = [], []
+        if placement_id is not None:
+            clauses.append("placement_id = ?")
+            params.append(placement_id)
+        if vendor is not None:
+            clauses.append("vendor_name = ?")
+            params.append(vendor)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _bids(self, where, params, limit="", limit_params=()):
+        cols = ", ".join(BID_FIELDS.values())
+        df = self._query(f"SELECT bid_id, {cols} FROM bids{where} ORDER BY bid_id{limit}",
+                         [*params, *limit_params], fields=BID_FIELDS)
+        for col in ("Start Date", "End Date"):
+            df[col] = _as_dates(df[col])
+        # bid_id is the row key keyed edits refer to
+        return df.set_index("bid_id").rename_axis("Row")
+
+    def add_placement(self, placement):
+        cols = ", ".join(PLACEMENT_FIELDS.values())
+        marks = ", ".join("?" * len(PLACEMENT_FIELDS))
+        with self._conn() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO placements ({cols}) VALUES ({marks})",
+                         _rows([placement], PLACEMENT_FIELDS)[0])
+
+    def add_bid(self, bid):
+        with self._conn() as conn:
+            return self._insert_bids(conn, [bid])[0]
+
+    def apply_bid_changes(self, changes):
+        """Update, delete and insert only the edited bids, in one transaction
+        (columns outside the schema are ignored)."""
+        with self._conn() as conn:
+            for key, values in changes.get("updated", {}).items():
+                values = {BID_FIELDS[col]: _to_sql_value(value) for col, value in values.items() if col in BID_FIELDS}
+                if values:
+                    assignments = ", ".join(f"{col} = ?" for col in values)
+                    conn.execute(f"UPDATE bids SET {assignments} WHERE bid_id = ?", [*values.values(), int(key)])
+            conn.executemany("DELETE FROM bids WHERE bid_id = ?", [(int(key),) for key in changes.get("deleted", [])])
+            return self._insert_bids(conn, changes.get("added", []))
+
+    def replace_placements(self, placements):
+        cols = ", ".join(PLACEMENT_FIELDS.values())
+        marks = ", ".join("?" * len(PLACEMENT_FIELDS))
+        records = placements.to_dict("records") if isinstance(placements, pd.DataFrame) else list(placements)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM placements")
+            conn.executemany(f"INSERT OR REPLACE INTO placements ({cols}) VALUES ({marks})",
+                             _rows(records, PLACEMENT_FIELDS))
+
+    def replace_bids(self, bids):
+        records = bids.to_dict("records") if isinstance(bids, pd.DataFrame) else list(bids)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM bids")
+            return self._insert_bids(conn, records)
+
+    @staticmethod
+    def _insert_bids(conn, bids):
+        """Insert ``bids`` and return their bid ids (one statement each, for ``lastrowid``)."""
+        cols = ", ".join(BID_FIELDS.values())
+        marks = ", ".join("?" * len(BID_FIELDS))
+        sql = f"INSERT INTO bids ({cols}) VALUES ({marks})"
+        return [conn.execute(sql, row).lastrowid for row in _rows(bids, BID_FIELDS)]
+
+    # ---- delivery and reports ----
+    def save_delivery(self, delivery):
+        """Replace the stored delivery plan; ``run_auction`` calls this."""
+        # float32 money widened and re-rounded so REAL columns hold exact cents
+        records = delivery.astype({"CPM": float, "Spend": float}).round({"CPM": 2, "Spend": 2}).to_dict("records")
+        cols = ", ".join(DELIVERY_FIELDS.values())
+        marks = ", ".join("?" * len(DELIVERY_FIELDS))
+        with self._conn() as conn:
+            conn.execute("DELETE FROM daily_delivery")
+            conn.executemany(f"INSERT INTO daily_delivery ({cols}) VALUES ({marks})",
+                             _rows(records, DELIVERY_FIELDS))
+
+    def _delivery_filter(self, start, end, vendor):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(_to_sql_value(start))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(_to_sql_value(end))
+        if vendor is not None:
+            clauses.append("vendor = ?")
+            params.append(vendor)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def daily_delivery(self, start=None, end=None, vendor=None):
+        where, params = self._delivery_filter(start, end, vendor)
+        df = self._query(f"SELECT * FROM daily_delivery{where} ORDER BY rowid", params, DELIVERY_FIELDS)
+        df = df[DELIVERY_COLUMNS]
+        return df.astype({
+            "Date": "datetime64[ns]", "Placement ID": "category", "Vendor": "category",
+            "CPM": "float32", "Impressions": "int32", "Spend": "float32",
+        })
+
+    def vendor_summary(self, start=None, end=None):
+        where, params = self._delivery_filter(start, end, None)
+        return self._query(
+            "SELECT vendor AS Vendor, SUM(impressions) AS Total_Impressions, "
+            "SUM(spend) AS Total_Spend, COUNT(DISTINCT date) AS Days_Booked "
+            f"FROM daily_delivery{where} GROUP BY vendor ORDER BY vendor", params)
+
+    def spend_by_placement(self, vendor, start=None, end=None):
+        where, params = self._delivery_filter(start, end, vendor)
+        return self._query(
+            "SELECT placement_id AS \"Placement ID\", SUM(spend) AS Spend "
+            f"FROM daily_delivery{where} GROUP BY placement_id ORDER BY placement_id", params)
+
+    def top_two(self):
+        """Each placement's winning bid and runner-up price, selected in SQL."""
+        top = self._query(TOP_TWO_SQL).rename(columns={
+            "placement_id": "Placement ID", "vendor_name": "Vendor Name", "bid_cpm": "Bid CPM",
+            "second_cpm": "Second CPM", "start_date": "Start Date", "end_date": "End Date",
+        })
+        return top.set_index("Placement ID")
+
+    @traced("sqlite.run_auction")
+    def run_auction(self):
+        cleared = settle(self.placements(), self.top_two())
+        self.save_delivery(build_delivery(cleared))
+        return cleared
+
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def get_storage(path=DEFAULT_PATH):
+    """Process-wide ``SQLiteStorage`` for ``path``."""
+    with _storages_lock:
+        if path not in _storages:
+            _storages[path] = SQLiteStorage(path)
+        return _storages[path]
+
+
+class SQLiteSheetStore:
+    """``sheets.SheetsStore``'s interface over worksheets kept in a local
+    SQLite file, so ``SharedTable`` works offline and without rate limits.
+
+    Each worksheet is a header plus rows of cells in ``sheet_rows``, in
+    insertion order. ``save_frame`` writes only the rows that differ from
+    the snapshot, like the Sheets version, in one transaction.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, headers=SHEET_HEADERS):
+        self.path = path
+        self._local = threading.local()
+        self._cache = {}
+        self._snapshots = {}
+        self._lock = threading.RLock()
+        with self._conn() as conn:
+            conn.executescript(SHEET_SCHEMA)
+            conn.executemany("INSERT OR IGNORE INTO sheet_headers (title, header) VALUES (?, ?)",
+                             [(title, json.dumps(header)) for title, header in headers.items()])
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def prefetch(self, *titles):
+        """Load every worksheet among ``titles`` that is not cached."""
+        with self._lock:
+            for title in titles:
+                if title in self._cache:
+                    continue
+                conn = self._conn()
+                row = conn.execute("SELECT header FROM sheet_headers WHERE title = ?", (title,)).fetchone()
+                header = json.loads(row[0]) if row else []
+                records = []
+                for (cells,) in conn.execute("SELECT cells FROM sheet_rows WHERE title = ? ORDER BY row_id",
+                                             (title,)):
+                    cells = json.loads(cells) + [""] * len(header)
+                    records.append({col: numericise(cell) for col, cell in zip(header, cells)})
+                self._cache[title] = (records, header)
+
+    def records(self, title):
+        with self._lock:
+            self.prefetch(title)
+            return self._cache[title][0]
+
+    def header(self, title):
+        with self._lock:
+            self.prefetch(title)
+            return self._cache[title][1]
+
+    def frame(self, title):
+        df = pd.DataFrame(self.records(title))
+        self._snapshots[title] = df
+        return df
+
+    def prime(self, title, records, header):
+        with self._lock:
+            self._cache[title] = (records, list(header))
+
+    def invalidate(self, *titles):
+        with self._lock:
+            for title in titles or list(self._cache):
+                self._cache.pop(title, None)
+
+    # ---- writes ----
+    def append_row(self, title, row):
+        with self._conn() as conn:
+            conn.execute("INSERT INTO sheet_rows (title, cells) VALUES (?, ?)", (title, _cells(row)))
+        self.invalidate(title)
+
+    def replace(self, title, df):
+        """Overwrite a worksheet with a DataFrame, header included."""
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO sheet_headers (title, header) VALUES (?, ?)",
+                         (title, json.dumps([str(col) for col in df.columns])))
+            conn.execute("DELETE FROM sheet_rows WHERE title = ?", (title,))
+            conn.executemany("INSERT INTO sheet_rows (title, cells) VALUES (?, ?)",
+                             [(title, _cells(row)) for row in df.itertuples(index=False)])
+        self._written(title)
+
+    def save_frame(self, title, edited, snapshot=None):
+        """Persist only the rows of ``edited`` that differ from ``snapshot``;
+        returns ``(updated, deleted, inserted)`` row counts."""
+        if snapshot is None:
+            snapshot = self._snapshots.get(title)
+        if snapshot is None or list(snapshot.columns) != list(edited.columns):
+            self.replace(title, edited)
+            return len(edited), 0, len(edited)
+
+        updated, deleted, inserted = diff_rows(snapshot, edited)
+        if updated or deleted or inserted:
+            with self._conn() as conn:
+                # Row ids in sheet order, so snapshot positions map to rows
+                row_ids = [row_id for (row_id,) in conn.execute(
+                    "SELECT row_id FROM sheet_rows WHERE title = ? ORDER BY row_id", (title,))]
+                conn.executemany("UPDATE sheet_rows SET cells = ? WHERE row_id = ?",
+                                 [(_cells(row), row_ids[pos]) for pos, row in updated.items()])
+                conn.executemany("DELETE FROM sheet_rows WHERE row_id = ?", [(row_ids[pos],) for pos in deleted])
+                conn.executemany("INSERT INTO sheet_rows (title, cells) VALUES (?, ?)",
+                                 [(title, _cells(row)) for row in inserted])
+            self._written(title)
+        return len(updated), len(deleted), len(inserted)
+
+    def _written(self, title):
+        self.invalidate(title)
+        self._snapshots.pop(title, None)
+
+
+def _cells(row):
+    return json.dumps([cell_value(value) for value in row])
+
+
+_sheet_stores = {}
+
+
+def get_sheet_store(path=DEFAULT_PATH):
+    """Process-wide ``SQLiteSheetStore`` for ``path``."""
+    with _storages_lock:
+        if path not in _sheet_stores:
+            _sheet_stores[path] = SQLiteSheetStore(path)
+        return _sheet_stores[path]
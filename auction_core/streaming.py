@@ -0,0 +1,99 @@
+"""Out-of-core auction clearing over bid files larger than memory.
+
+Bids are read in chunks and folded into a running top-two per Placement ID:
+the current winning bid plus the best price beneath it. Memory grows with
+the number of placements, not bids, and the result feeds ``engine.settle``
+exactly like the in-memory ``top_two`` does, so winners and clearing prices
+match "Run Auction".
+"""
+
+import numpy as np
+import pandas as pd
+
+from auction_core.engine import settle, top_two
+from auction_core.table_io import format_of
+
+BID_COLUMNS = ["Vendor Name", "Placement ID", "Bid CPM", "Start Date", "End Date"]
+TOP_COLUMNS = ["Vendor Name", "Bid CPM", "Second CPM", "Start Date", "End Date"]
+DEFAULT_CHUNKSIZE = 500_000
+
+
+def iter_bid_chunks(path, chunksize=DEFAULT_CHUNKSIZE, columns=BID_COLUMNS):
+    """Yield bid DataFrames of at most ``chunksize`` rows from a CSV, Parquet or Arrow IPC file."""
+    fmt = format_of(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "arrow":
+        import pyarrow as pa
+
+        # Memory-mapped, so only the slice being converted is paged in
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(columns)
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize).to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, dtype={"Placement ID": str, "Vendor Name": str},
+                               chunksize=chunksize)
+
+
+class RunningTopTwo:
+    """Per-placement winning bid and runner-up price, updated chunk by chunk.
+
+    Chunks must arrive in file order: on equal prices the bid seen first
+    keeps the win, as with the stable sort in the in-memory auction.
+    """
+
+    def __init__(self):
+        self.top = pd.DataFrame(columns=TOP_COLUMNS)
+        self.bids_seen = 0
+
+    def update(self, bids):
+        self.bids_seen += len(bids)
+        chunk = top_two(bids)[TOP_COLUMNS]
+        if self.top.empty:
+            self.top = chunk
+            return
+
+        both = chunk.index.intersection(self.top.index)
+        if len(both):
+            old = self.top.loc[both]
+            new = chunk.loc[both]
+            old_best = old["Bid CPM"].to_numpy(dtype=float)
+            new_best = new["Bid CPM"].to_numpy(dtype=float)
+            chunk_wins = new_best > old_best
+            # Runner-up is the best price left once the winner is taken out
+            second = np.where(
+                chunk_wins,
+                np.fmax(old_best, new["Second CPM"].to_numpy(dtype=float)),
+                np.fmax(old["Second CPM"].to_numpy(dtype=float), new_best),
+            )
+            winners = both[chunk_wins]
+            if len(winners):
+                self.top.loc[winners, TOP_COLUMNS] = chunk.loc[winners, TOP_COLUMNS].to_numpy()
+            self.top.loc[both, "Second CPM"] = second
+
+        fresh = chunk.index.difference(self.top.index)
+        if len(fresh):
+            self.top = pd.concat([self.top, chunk.loc[fresh]])
+
+    def result(self):
+        top = self.top.copy()
+        for col in ("Bid CPM", "Second CPM"):
+            top[col] = top[col].astype(float)
+        return top
+
+
+def stream_top_two(chunks):
+    running = RunningTopTwo()
+    for chunk in chunks:
+        running.update(chunk)
+    return running.result()
+
+
+def stream_auction(placements, bids_path, chunksize=DEFAULT_CHUNKSIZE):
+    """Clear an auction reading bids from ``bids_path`` in chunks."""
+    return settle(placements, stream_top_two(iter_bid_chunks(bids_path, chunksize)))
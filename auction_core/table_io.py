@@ -0,0 +1,158 @@
+"""CSV, Parquet and Arrow IPC import/export for placements, bids, delivery and summaries.
+
+Parquet and Arrow IPC files are zstd-compressed and keep the pandas dtypes
+(categorical Vendor and Placement ID, float32 money, datetime64 dates), so a
+warehouse or ``read_table`` loads them without a CSV parse. pyarrow is only
+imported when one of those formats is used.
+
+``download_table`` serialises a table for a Streamlit download only after
+the user asks for it, instead of building the file on every rerun.
+"""
+
+import io
+import os
+
+import pandas as pd
+
+COMPRESSION = "zstd"
+ID_COLUMNS = {"Placement ID": str, "Vendor Name": str, "Vendor": str}
+
+# Format -> (file extension, MIME type)
+FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+FORMAT_LABELS = {"csv": "CSV", "parquet": "Parquet", "arrow": "Arrow IPC"}
+_EXTENSIONS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet",
+               ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+
+
+def format_of(name):
+    """Format name for a file path or upload name, by extension; CSV if unknown."""
+    return _EXTENSIONS.get(os.path.splitext(str(name))[1].lower(), "csv")
+
+
+def file_name(stem, fmt):
+    return stem + FORMATS[fmt][0]
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][1]
+
+
+def _arrow_table(df):
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _ipc_options(compression):
+    import pyarrow as pa
+
+    return pa.ipc.IpcWriteOptions(compression=compression)
+
+
+def write_table(df, target, fmt=None, compression=COMPRESSION):
+    """Write ``df`` to a path or binary file object."""
+    fmt = fmt or format_of(target)
+    if fmt == "csv":
+        if isinstance(target, (str, os.PathLike)):
+            df.to_csv(target, index=False)
+        else:
+            target.write(df.to_csv(index=False).encode("utf-8"))
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(_arrow_table(df), target, compression=compression)
+    elif fmt == "arrow":
+        import pyarrow as pa
+
+        table = _arrow_table(df)
+        with pa.ipc.new_file(target, table.schema, options=_ipc_options(compression)) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"unknown table format: {fmt!r}")
+
+
+def to_bytes(df, fmt="parquet", compression=COMPRESSION):
+    """``df`` serialised in ``fmt``, for a download button."""
+    buf = io.BytesIO()
+    write_table(df, buf, fmt, compression)
+    return buf.getvalue()
+
+
+def read_table(source, fmt=None, columns=None):
+    """Read a table from a path, bytes or file object (e.g. ``st.file_uploader``).
+
+    The format follows the path or upload name; CSV identifiers are kept as
+    strings.
+    """
+    if fmt is None:
+        fmt = format_of(getattr(source, "name", source) if not isinstance(source, bytes) else "")
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if fmt == "parquet":
+        return pd.read_parquet(source, columns=columns)
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        if isinstance(source, (str, os.PathLike)):
+            source = pa.memory_map(str(source))
+        table = pa.ipc.open_file(source).read_all()
+        return (table.select(columns) if columns else table).to_pandas()
+    return pd.read_csv(source, usecols=columns, dtype=ID_COLUMNS)
+
+
+class TableWriter:
+    """Append DataFrame chunks to a CSV, Parquet or Arrow IPC file."""
+
+    def __init__(self, path, compression=COMPRESSION):
+        self.path = str(path)
+        self.fmt = format_of(self.path)
+        self.compression = compression
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._header = True
+
+    def write(self, df):
+        df = df.astype({col: str for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+        if self.fmt == "csv":
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = _arrow_table(df)
+            if self._writer is None:
+                # Kept here: Arrow IPC writers don't expose the schema they were opened with
+                self._schema = table.schema
+                if self.fmt == "parquet":
+                    self._writer = pq.ParquetWriter(self.path, self._schema, compression=self.compression)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, self._schema,
+                                                   options=_ipc_options(self.compression))
+            self._writer.write_table(table.cast(self._schema))
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def download_table(df, stem, label, fmt, cache, version=None):
+    """Lazy download button for ``df``: a "Prepare" button serialises it once
+    per ``version`` and format into ``cache`` (a ``RenderCache``), after which
+    the download button is shown.
+    """
+    import streamlit as st
+
+    key = ("table", stem, fmt, version)
+    data = cache.get(key)
+    if data is None and st.button(f"Prepare {label} {FORMAT_LABELS[fmt]}", key=f"prepare_{stem}_{fmt}"):
+        data = cache.put(key, to_bytes(df, fmt))
+    if data is not None:
+        st.download_button(f"Download {label} {FORMAT_LABELS[fmt]}", data=data,
+                           file_name=file_name(stem, fmt), mime=mime_type(fmt), key=f"download_{stem}_{fmt}")
@@ -0,0 +1,197 @@
+"""Paginated, filterable and sortable table views for large grids.
+
+``st.dataframe`` and ``st.data_editor`` ship the whole table to the browser
+on every rerun, which freezes the page at a few hundred thousand rows.
+``TableView`` keeps the full frame on the server, caches the sort order and
+filter masks it has computed for that frame, and hands out only the
+requested page. ``paged_table`` draws the controls and that page.
+
+Tables that live in a database go through ``paged_query`` instead: it
+asks the caller for a row count and one page of rows, so filtering and
+paging happen in the query and the rest of the table is never read.
+
+Editable views are meant for ``RecordStore`` frames, whose index holds the
+stable row keys: ``editor_changes`` turns the editor's edits on the page
+into ``{"updated", "deleted", "added"}`` keyed by row key, for
+``RecordStore.apply_changes``.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = (25, 50, 100, 500)
+_COMPARISON = re.compile(r"^\s*(>=|<=|!=|>|<|=)?\s*(.+?)\s*$")
+_OPERATORS = {
+    ">=": np.greater_equal, "<=": np.less_equal, ">": np.greater,
+    "<": np.less, "=": np.equal, "!=": np.not_equal,
+}
+
+
+class TableView:
+    """Sorted and filtered positions over one frame, computed once per query."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self._orders = {}
+        self._masks = {}
+
+    def order(self, col, ascending=True):
+        """Row positions sorted by ``col`` (stable, missing values last).
+
+        Categorical columns sort by category value, not by code.
+        """
+        key = (col, ascending)
+        if key not in self._orders:
+            values = self.frame[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                categories = values.cat.categories
+                rank = np.empty(len(categories), dtype=float)
+                rank[np.argsort(categories.astype(str), kind="stable")] = np.arange(len(categories))
+                codes = values.cat.codes.to_numpy()
+                values = np.where(codes >= 0, rank[codes] if len(rank) else np.nan, np.nan)
+            keyed = pd.Series(np.asarray(values))
+            self._orders[key] = keyed.sort_values(ascending=ascending, kind="stable",
+                                                  na_position="last").index.to_numpy()
+        return self._orders[key]
+
+    def mask(self, col, query):
+        """Boolean mask of rows whose ``col`` matches ``query``.
+
+        Text and id columns match a case-insensitive substring; number and
+        date columns take a comparison such as ``>= 5`` or ``< 2024-07-01``
+        (a bare value means equality).
+        """
+        key = (col, query)
+        if key not in self._masks:
+            self._masks[key] = self._match(self.frame[col], query)
+        return self._masks[key]
+
+    def select(self, filters=(), sort=None, ascending=True):
+        """Positions of the rows passing every ``(col, query)`` filter, in sort order."""
+        positions = self.order(sort, ascending) if sort else np.arange(len(self.frame))
+        if filters:
+            keep = np.ones(len(self.frame), dtype=bool)
+            for col, query in filters:
+                keep &= self.mask(col, query)
+            positions = positions[keep[positions]]
+        return positions
+
+    def page(self, positions, page, page_size):
+        """The ``page``-th (0-based) window of ``positions`` as a frame."""
+        start = page * page_size
+        return self.frame.iloc[positions[start:start + page_size]]
+
+    @staticmethod
+    def _match(values, query):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = values.cat.categories.astype(str)
+            hits = categories.str.contains(query, case=False, regex=False)
+            return np.isin(values.cat.codes.to_numpy(), np.flatnonzero(hits))
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            op, operand = _COMPARISON.match(query).groups()
+            try:
+                operand = (pd.Timestamp(operand).to_datetime64()
+                           if pd.api.types.is_datetime64_any_dtype(values) else float(operand))
+            except ValueError:
+                return np.zeros(len(values), dtype=bool)
+            return _OPERATORS[op or "="](values.to_numpy(), operand)
+        return values.astype(str).str.contains(query, case=False, regex=False).to_numpy() & values.notna().to_numpy()
+
+
+def editor_changes(window, state):
+    """Edits from ``st.data_editor`` over ``window``, keyed by row key.
+
+    ``state`` is the editor's session-state entry, whose ``edited_rows`` and
+    ``deleted_rows`` refer to positions within the window.
+    """
+    keys = window.index
+    state = state or {}
+    return {
+        "updated": {int(keys[pos]): values for pos, values in state.get("edited_rows", {}).items()},
+        "deleted": [int(keys[pos]) for pos in state.get("deleted_rows", [])],
+        "added": [row for row in state.get("added_rows", []) if row],
+    }
+
+
+def paged_table(frame, key, editable=False, version=None, page_sizes=PAGE_SIZES):
+    """Draw one page of ``frame`` with filter, sort and page controls.
+
+    The ``TableView`` is kept in session state and reused while ``frame`` is
+    the same object. With ``editable=True`` the page is shown in a
+    ``st.data_editor`` and its edits are returned as ``editor_changes``;
+    pass the store's ``version`` so the editor resets after a save.
+    Otherwise returns None.
+    """
+    import streamlit as st
+
+    view = st.session_state.get(f"{key}_view")
+    if view is None or view.frame is not frame:
+        view = st.session_state[f"{key}_view"] = TableView(frame)
+
+    columns = list(frame.columns)
+    filter_col, query_col, sort_col, order_col, size_col = st.columns([2, 3, 2, 1, 1])
+    filter_by = filter_col.selectbox("Filter column", columns, key=f"{key}_filter_by")
+    query = query_col.text_input("Filter", key=f"{key}_query",
+                                 placeholder="text, or e.g. >= 5 / < 2024-07-01").strip()
+    sort = sort_col.selectbox("Sort by", [None] + columns, key=f"{key}_sort",
+                              format_func=lambda col: "—" if col is None else col)
+    ascending = order_col.radio("Order", ["Asc", "Desc"], key=f"{key}_order") == "Asc"
+    page_size = size_col.selectbox("Rows", page_sizes, key=f"{key}_page_size")
+
+    positions = view.select([(filter_by, query)] if query else (), sort, ascending)
+    page = _page_number(st, key, len(positions), page_size)
+    window = view.page(positions, page, page_size)
+    shown = _rows_shown(page, page_size, len(window), len(positions))
+    st.caption(shown if len(positions) == len(frame) else f"{shown} (filtered from {len(frame):,})")
+
+    if not editable:
+        st.dataframe(window, use_container_width=True)
+        return None
+    # Plain text ids on the page only, so new values can be typed into the editor
+    window = window.astype({col: object for col in columns
+                            if isinstance(window[col].dtype, pd.CategoricalDtype)})
+    return _edit_window(st, window, f"{key}_editor_{version}_{filter_by}_{query}_{sort}_{ascending}_{page_size}_{page}")
+
+
+def paged_query(count, fetch, key, editable=False, version=None, page_sizes=PAGE_SIZES):
+    """Draw one page of a table that stays in the database.
+
+    ``count()`` returns the number of rows and ``fetch(offset, limit)`` one
+    page of them, indexed by row key; only that page is read. Filters go
+    into ``count`` and ``fetch`` and should be part of ``key``, so a new
+    filter starts on page 1. Editing works as in ``paged_table``.
+    """
+    import streamlit as st
+
+    total = count()
+    page_size = st.selectbox("Rows", page_sizes, key=f"{key}_page_size")
+    page = _page_number(st, key, total, page_size)
+    window = fetch(page * page_size, page_size)
+    st.caption(_rows_shown(page, page_size, len(window), total))
+
+    if not editable:
+        st.dataframe(window, use_container_width=True)
+        return None
+    return _edit_window(st, window, f"{key}_editor_{version}_{page_size}_{page}")
+
+
+def _page_number(st, key, total, page_size):
+    """The 0-based page picked in the page control, clamped to the last page."""
+    pages = max(1, -(-total // page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1,
+                           key=f"{key}_page") - 1
+    # A page kept from before rows were deleted or filtered out may be past the end
+    return min(page, pages - 1)
+
+
+def _rows_shown(page, page_size, rows, total):
+    first = page * page_size + 1 if rows else 0
+    return f"Rows {first:,}–{first + rows - 1 if rows else 0:,} of {total:,}"
+
+
+def _edit_window(st, window, editor_key):
+    st.data_editor(window, num_rows="dynamic", use_container_width=True, key=editor_key)
+    st.caption("Save before changing page, sort or filter; unsaved edits on this page are dropped.")
+    return editor_changes(window, st.session_state.get(editor_key))
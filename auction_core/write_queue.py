@@ -0,0 +1,199 @@
+"""Write-behind queue for Sheets writes.
+
+Adding a placement or saving bids used to block the rerun on a Sheets
+request, for seconds under latency or quota throttling. With a
+``WriteBehindQueue`` attached, a ``SharedTable`` applies the change in
+memory at once and the queue writes it from a background thread. Changes
+to the same worksheet that arrive within ``delay`` seconds of each other
+go out together, as one ``batch_update`` from the last written state to
+the current one.
+
+Rate-limit errors (HTTP 429, or 5xx while the API is overloaded) are
+retried with exponential backoff; other errors are retried too, at the
+same pace, and reported in ``status()``. Pending changes are journalled
+to a local JSON-lines file and replayed when the table is next loaded, so
+they survive a restart (delivery is at least once).
+
+``FakeSpreadsheet.throttle`` in ``tests/fake_sheets.py`` simulates rate
+limiting for tests.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+from auction_core.perf import traced
+
+PENDING_PATH = os.environ.get("AD_AUCTION_PENDING", ".pending_sheet_writes.jsonl")
+DEFAULT_DELAY = 0.5
+MAX_BACKOFF = 60.0
+RETRY_CODES = {429, 500, 502, 503, 504}
+
+_queues = {}
+_lock = threading.Lock()
+
+
+def write_queue(store, path=PENDING_PATH):
+    """The process-wide ``WriteBehindQueue`` for ``store``."""
+    with _lock:
+        if store not in _queues:
+            _queues[store] = WriteBehindQueue(path)
+        return _queues[store]
+
+
+def is_rate_limit(error):
+    """Whether ``error`` looks like a Sheets quota or overload error worth backing off for."""
+    code = getattr(error, "code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return code in RETRY_CODES or "RATE_LIMIT" in str(error) or "Quota exceeded" in str(error)
+
+
+class WriteBehindQueue:
+    """Background writer for one spreadsheet's ``SharedTable``s.
+
+    With ``background=False`` no thread is started and changes are written
+    only by calling ``flush``.
+    """
+
+    def __init__(self, path=PENDING_PATH, delay=DEFAULT_DELAY, max_backoff=MAX_BACKOFF, clock=time.monotonic,
+                 background=True):
+        self.path = path
+        self.background = background
+        self.delay = delay
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._dirty = {}
+        self._thread = None
+        self.state = "idle"
+        self.failures = 0
+        self.last_error = None
+        self.last_write = None
+        self.retry_at = None
+        # Journal: (seq, title, op) for every change not yet written
+        self._ops = self._load()
+        self.seq = self._ops[-1][0] if self._ops else 0
+
+    # ---- producers ----
+    def submit(self, table, ops):
+        """Journal ``ops`` for ``table`` and schedule it for writing."""
+        with self._cond:
+            entries = []
+            for op in ops:
+                self.seq += 1
+                entries.append((self.seq, table.title, op))
+            self._ops.extend(entries)
+            if entries and self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(_line(entry) for entry in entries)
+            self._dirty[table.title] = table
+            if self.background:
+                self._start()
+            self._cond.notify()
+
+    def recovered(self, title):
+        """Journalled ops for ``title`` left over from before a restart."""
+        with self._cond:
+            return [op for _, t, op in self._ops if t == title]
+
+    # ---- writing ----
+    @traced("sheets.write_behind")
+    def flush(self):
+        """Write every pending table now, on the calling thread. Errors propagate."""
+        with self._cond:
+            tables = list(self._dirty.values())
+        for table in tables:
+            upto = table.flush()
+            with self._cond:
+                if not table.pending and self._dirty.get(table.title) is table:
+                    del self._dirty[table.title]
+                if upto is not None:
+                    self._ops = [entry for entry in self._ops if entry[1] != table.title or entry[0] > upto]
+                    self._rewrite()
+        with self._cond:
+            self.last_write = time.time()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    self.state = "idle"
+                    self._cond.wait()
+                self.state = "waiting"
+            # Let changes that arrive in quick succession go out together
+            time.sleep(self.delay)
+            self.state = "writing"
+            try:
+                self.flush()
+            except Exception as err:  # retried below; the journal still holds the changes
+                self.failures += 1
+                self.last_error = f"{type(err).__name__}: {err}"
+                self.state = "rate limited" if is_rate_limit(err) else "error"
+                backoff = min(self.max_backoff, 2 ** (self.failures - 1)) * random.uniform(0.5, 1.0)
+                self.retry_at = self._clock() + backoff
+                time.sleep(backoff)
+                self.retry_at = None
+            else:
+                self.failures = 0
+                self.last_error = None
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="sheets-write-behind", daemon=True)
+            self._thread.start()
+
+    # ---- status ----
+    @property
+    def pending(self):
+        """Number of journalled changes not yet written."""
+        return len(self._ops)
+
+    def status(self):
+        """Snapshot of the writer's state for display."""
+        retry_in = None if self.retry_at is None else max(0.0, self.retry_at - self._clock())
+        return {"state": self.state, "pending": self.pending, "failures": self.failures,
+                "last_error": self.last_error, "retry_in": retry_in, "last_write": self.last_write}
+
+    # ---- journal ----
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:  # a line cut short by a crash
+                    continue
+                entries.append((entry["seq"], entry["title"], entry["op"]))
+        return entries
+
+    def _rewrite(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(_line(entry) for entry in self._ops)
+        os.replace(tmp, self.path)
+
+
+def _line(entry):
+    seq, title, op = entry
+    return json.dumps({"seq": seq, "title": title, "op": op}, default=str) + "\n"
+
+
+def write_status(queue):
+    """Status line for background Sheets writes, e.g. inside ``with st.sidebar:``."""
+    import streamlit as st
+
+    status = queue.status()
+    if status["state"] in ("rate limited", "error"):
+        retry = f"; retrying in {status['retry_in']:.0f}s" if status["retry_in"] is not None else ""
+        message = ("⏸️ Sheets rate limit hit" if status["state"] == "rate limited"
+                   else f"⚠️ Write failed ({status['last_error']})")
+        st.warning(f"{message}{retry}. {status['pending']} change(s) waiting.")
+    elif status["pending"]:
+        st.info(f"⏳ Saving {status['pending']} change(s) to Google Sheets…")
+    else:
+        st.caption("✅ All changes saved to Google Sheets")
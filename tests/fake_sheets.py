@@ -0,0 +1,188 @@
+"""In-memory stand-in for the parts of gspread the apps use.
+
+Lets the Sheets-backed code run offline and without credentials::
+
+    book = FakeSpreadsheet({"Placements": [["Placement ID", "Name"]]})
+    store = SheetsStore(book)
+
+Cells are kept as strings, as the Sheets API returns formatted values. Each
+instance counts the API calls it receives in ``calls`` so callers can check
+how many round trips an operation costs, and ``throttle(n)`` makes the next
+``n`` batch updates fail with a rate-limit error.
+"""
+
+import re
+from collections import Counter
+
+from auction_core.sheets import values_to_records
+
+_CELL = re.compile(r"([A-Z]+)(\d+)")
+
+
+class FakeAPIError(Exception):
+    """Stands in for ``gspread.exceptions.APIError``."""
+
+    def __init__(self, code, message):
+        super().__init__(f"APIError: [{code}]: {message}")
+        self.code = code
+
+
+def _cell_index(a1):
+    """1-based (row, col) of an A1 cell such as ``B7``."""
+    letters, row = _CELL.fullmatch(a1).groups()
+    col = 0
+    for ch in letters:
+        col = col * 26 + ord(ch) - 64
+    return int(row), col
+
+
+def _range_start(range_name):
+    if not range_name:
+        return 1, 1
+    range_name = range_name.split("!")[-1]
+    return _cell_index(range_name.split(":")[0])
+
+
+def _as_cell(value):
+    return "" if value is None else str(value)
+
+
+def _from_cell_data(cell):
+    value = cell.get("userEnteredValue", {})
+    if "boolValue" in value:
+        return "TRUE" if value["boolValue"] else "FALSE"
+    if "numberValue" in value:
+        number = value["numberValue"]
+        return str(int(number)) if float(number).is_integer() else str(number)
+    return value.get("stringValue", "")
+
+
+def _trimmed(rows):
+    """Rows as the API returns them: trailing blanks cut off."""
+    rows = [list(row) for row in rows]
+    for row in rows:
+        while row and row[-1] == "":
+            row.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+class FakeWorksheet:
+    def __init__(self, title, rows=(), calls=None, id=0):
+        self.title = title
+        self.id = id
+        self.rows = [[_as_cell(v) for v in row] for row in rows]
+        self.calls = calls if calls is not None else Counter()
+
+    def get_all_values(self):
+        self.calls["get_all_values"] += 1
+        return _trimmed(self.rows)
+
+    def get_all_records(self):
+        self.calls["get_all_records"] += 1
+        return values_to_records(_trimmed(self.rows))
+
+    def append_row(self, values, **kwargs):
+        self.calls["append_row"] += 1
+        self.rows = _trimmed(self.rows)
+        self.rows.append([_as_cell(v) for v in values])
+
+    def append_rows(self, values, **kwargs):
+        self.calls["append_rows"] += 1
+        self.rows = _trimmed(self.rows)
+        self.rows.extend([_as_cell(v) for v in row] for row in values)
+
+    def clear(self):
+        self.calls["clear"] += 1
+        self.rows = []
+
+    def update(self, values, range_name=None, **kwargs):
+        self.calls["update"] += 1
+        self._write(range_name, values)
+
+    def batch_update(self, data, **kwargs):
+        self.calls["batch_update"] += 1
+        for item in data:
+            self._write(item["range"], item["values"])
+
+    def delete_rows(self, start_index, end_index=None):
+        self.calls["delete_rows"] += 1
+        del self.rows[start_index - 1:(end_index or start_index)]
+
+    def _write(self, range_name, values):
+        row0, col0 = _range_start(range_name)
+        self._write_at(row0 - 1, col0 - 1, values)
+
+    def _write_at(self, row_index, col_index, values):
+        for r, row in enumerate(values, start=row_index):
+            while len(self.rows) <= r:
+                self.rows.append([])
+            target = self.rows[r]
+            for c, value in enumerate(row, start=col_index):
+                while len(target) <= c:
+                    target.append("")
+                target[c] = _as_cell(value)
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets=None):
+        self.calls = Counter()
+        self.throttled = 0
+        self._worksheets = {
+            title: FakeWorksheet(title, rows, self.calls, id=i)
+            for i, (title, rows) in enumerate((worksheets or {}).items())
+        }
+
+    def worksheet(self, title):
+        self.calls["worksheet"] += 1
+        return self._worksheets[title]
+
+    def add_worksheet(self, title, rows=0, cols=0):
+        self._worksheets[title] = FakeWorksheet(title, calls=self.calls, id=len(self._worksheets))
+        return self._worksheets[title]
+
+    def throttle(self, n=1):
+        """Fail the next ``n`` batch updates as if over the write quota."""
+        self.throttled = n
+
+    def batch_update(self, body):
+        """Apply updateCells, deleteDimension and appendCells requests in order."""
+        self.calls["batch_update"] += 1
+        if self.throttled:
+            self.throttled -= 1
+            raise FakeAPIError(429, "Quota exceeded for quota metric 'Write requests'")
+        by_id = {ws.id: ws for ws in self._worksheets.values()}
+        for request in body["requests"]:
+            if "updateCells" in request:
+                req = request["updateCells"]
+                ws = by_id[req["start"]["sheetId"]]
+                values = [[_from_cell_data(c) for c in row.get("values", [])] for row in req["rows"]]
+                ws._write_at(req["start"]["rowIndex"], req["start"]["columnIndex"], values)
+            elif "deleteDimension" in request:
+                rng = request["deleteDimension"]["range"]
+                del by_id[rng["sheetId"]].rows[rng["startIndex"]:rng["endIndex"]]
+            elif "appendCells" in request:
+                req = request["appendCells"]
+                ws = by_id[req["sheetId"]]
+                ws.rows = _trimmed(ws.rows)
+                ws.rows.extend([_from_cell_data(c) for c in row.get("values", [])] for row in req["rows"])
+            else:
+                raise NotImplementedError(next(iter(request)))
+        return {"replies": [{} for _ in body["requests"]]}
+
+    def values_batch_get(self, ranges, params=None):
+        self.calls["values_batch_get"] += 1
+        value_ranges = []
+        for range_name in ranges:
+            title = range_name.split("!")[0].strip("'").replace("''", "'")
+            value_ranges.append({"range": range_name, "values": _trimmed(self._worksheets[title].rows)})
+        return {"valueRanges": value_ranges}
+
+
+class FakeClient:
+    def __init__(self, spreadsheets=None):
+        self.spreadsheets = spreadsheets or {}
+
+    def open(self, name):
+        return self.spreadsheets[name]
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auction_core.allocation import allocate, compare_to_baseline
+from auction_core.bench import make_bids, make_placements
+
+
+@pytest.fixture
+def inputs():
+    placements = make_placements(30, seed=4)
+    return placements, make_bids(placements, 200, vendors=5, seed=4)
+
+
+@pytest.mark.parametrize("cap", [0.0, 50.0, 400.0, 3000.0])
+def test_allocated_spend_never_exceeds_a_budget(inputs, cap):
+    placements, bids = inputs
+    vendors = sorted(bids["Vendor Name"].unique())
+    budgets = {vendor: cap * (i + 1) for i, vendor in enumerate(vendors[:-1])}
+    delivery = allocate(placements, bids, budgets)
+    spend = delivery.groupby("Vendor", observed=True)["Spend"].sum().astype(float)
+    for vendor, budget in budgets.items():
+        assert spend.get(vendor, 0.0) <= budget + 0.01
+    # The uncapped vendor is unaffected by the caps
+    assert spend.get(vendors[-1], 0.0) > 0
+
+
+def test_each_placement_day_sold_once_within_bid_windows(inputs):
+    placements, bids = inputs
+    delivery = allocate(placements, bids, {"Vendor 000": 100.0})
+    assert not delivery.duplicated(["Placement ID", "Date"]).any()
+    windows = bids.merge(delivery.astype({"Placement ID": object, "Vendor": object}),
+                         left_on=["Placement ID", "Vendor Name"], right_on=["Placement ID", "Vendor"])
+    inside = (windows["Date"] >= windows["Start Date"]) & (windows["Date"] <= windows["End Date"])
+    assert inside.groupby([windows["Placement ID"], windows["Date"]]).any().all()
+
+
+def test_comparison_reports_no_overspend_for_allocation(inputs):
+    placements, bids = inputs
+    budgets = {vendor: 200.0 for vendor in bids["Vendor Name"].unique()}
+    _, comparison = compare_to_baseline(placements, bids, budgets)
+    assert comparison.loc["Budget allocation", "Over Budget"] == 0.0
+    assert comparison.loc["Second-price baseline", "Over Budget"] > 0.0
+    assert np.isclose(comparison["Fill Rate"], comparison["Fill Rate"].clip(0, 1)).all()
+
+
+def test_no_bids():
+    placements = make_placements(3)
+    assert allocate(placements, pd.DataFrame(columns=["Vendor Name", "Placement ID", "Bid CPM"])).empty
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import pytest
+
+from auction_core.bench import EPOCH, make_delivery
+from auction_core.bulk_export import ExportJob
+from auction_core.report_cube import ReportCube
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("fpdf")
+
+
+@pytest.fixture
+def cube():
+    return ReportCube(make_delivery(300, vendors=3))
+
+
+def run(job):
+    job.start()._thread.join(timeout=120)
+    return job
+
+
+def test_export_job_writes_zip_to_disk_until_discarded(tmp_path, monkeypatch, cube):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    job = run(ExportJob(cube, EPOCH, EPOCH + np.timedelta64(89, "D"), workers=1))
+    assert job.error is None and job.finished
+    assert not hasattr(job, "data")
+    with zipfile.ZipFile(job.path) as zf:
+        assert sorted(zf.namelist()) == [f"{v}_ad_report.pdf" for v in sorted(cube.vendors)]
+    assert job.done == job.total == 3
+    job.discard()
+    assert not job.finished
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_export_removes_its_file(tmp_path, monkeypatch, cube):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    job = run(ExportJob(cube, "not a date", EPOCH, workers=1))
+    assert job.error is not None and not job.finished
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_dropped_job_removes_its_file(tmp_path, monkeypatch, cube):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    job = run(ExportJob(cube, EPOCH, EPOCH + np.timedelta64(89, "D"), workers=1))
+    path = job.path
+    del job
+    assert not os.path.exists(path)
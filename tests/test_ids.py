@@ -0,0 +1,67 @@
+from auction_core.ids import IdAllocator
+
+
+def make(tmp_path, **kwargs):
+    return IdAllocator(path=str(tmp_path / "ids.db"), **kwargs)
+
+
+def test_next_id_continues_after_seeded_ids(tmp_path):
+    ids = make(tmp_path)
+    ids.seed(["P001", "P007", "X", None])
+    assert ids.next_id() == "P008"
+
+
+def test_reserve_skips_registered_ids(tmp_path):
+    ids = make(tmp_path)
+    assert ids.next_id() == "P001"
+    ids.register("P004")
+    assert ids.reserve(3) == ["P005", "P006", "P007"]
+    assert ids.next_id() == "P008"
+
+
+def test_registered_ids_are_skipped_by_other_processes(tmp_path):
+    first, second = make(tmp_path), make(tmp_path)
+    first.register("P010")
+    assert second.next_id() == "P011"
+    assert second.reserve(2) == ["P012", "P013"]
+    assert first.next_id() == "P014"
+
+
+def test_register_ignores_other_forms(tmp_path):
+    ids = make(tmp_path)
+    ids.register("custom-id")
+    assert ids.next_id() == "P001"
+
+
+def test_exists_covers_seeded_registered_and_issued_ids(tmp_path):
+    ids = make(tmp_path)
+    ids.seed(["P002"])
+    ids.register("custom-id")
+    issued = ids.next_id()
+    assert [ids.exists(pid) for pid in ["P002", "custom-id", issued, "P999"]] == [True, True, True, False]
+    assert make(tmp_path).exists(issued)
+
+
+def test_next_id_and_reserve_skip_recorded_ids_below_the_counter(tmp_path):
+    ids = make(tmp_path)
+    ids.register("P005")
+    # An ID recorded without moving the counter, e.g. by an older client
+    with ids._transaction() as conn:
+        ids._record(conn, ["P007", "P009"])
+    assert ids.reserve(2) == ["P010", "P011"]
+    assert ids.next_id() == "P012"
+
+
+def test_reserve_skips_a_block_holding_a_recorded_id(tmp_path):
+    ids = make(tmp_path)
+    with ids._transaction() as conn:
+        ids._record(conn, ["P002"])
+    assert ids.reserve(3) == ["P003", "P004", "P005"]
+    assert ids.next_id() == "P006"
+
+
+def test_next_id_skips_a_recorded_id_at_the_counter(tmp_path):
+    ids = make(tmp_path)
+    with ids._transaction() as conn:
+        ids._record(conn, ["P001", "P002"])
+    assert ids.next_id() == "P003"
@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from auction_core import incremental
+from auction_core.bench import make_bids, make_placements
+from auction_core.delivery import build_delivery
+from auction_core.engine import clear_auction
+from auction_core.incremental import IncrementalAuction
+from auction_core.records import bid_store, placement_store
+
+
+def plain(frame, *columns):
+    return frame.reset_index(drop=True).astype({col: object for col in columns})
+
+
+def assert_matches_full_run(auction, placements, bids):
+    cleared = clear_auction(placements, bids)
+    pd.testing.assert_frame_equal(plain(auction.cleared, "Placement ID", "Winning Vendor"),
+                                  plain(cleared, "Placement ID", "Winning Vendor"))
+    pd.testing.assert_frame_equal(plain(auction.daily_delivery, "Placement ID", "Vendor"),
+                                  plain(build_delivery(cleared), "Placement ID", "Vendor"))
+
+
+def make_auction(n=200, seed=3):
+    placements = placement_store(make_placements(n, seed))
+    bids = bid_store(make_bids(placements.frame(categorical=False), 4 * n, vendors=7, seed=seed))
+    return placements, bids, IncrementalAuction(placements, bids)
+
+
+def test_build_matches_full_run():
+    placements, bids, auction = make_auction()
+    assert_matches_full_run(auction, placements, bids)
+
+
+def test_keyed_edits_only_reclear_their_placements():
+    placements, bids, auction = make_auction()
+    rng = np.random.default_rng(0)
+    pids = placements.categories("Placement ID")
+    for _ in range(20):
+        keys = bids.keys()
+        edit, drop = (int(k) for k in rng.choice(keys, 2, replace=False))
+        new_bid = dict(bids[int(rng.integers(len(bids)))], **{"Placement ID": pids[int(rng.integers(len(pids)))]})
+        changed = bids.apply_changes({
+            "updated": {edit: {"Bid CPM": float(rng.uniform(0.5, 12)), "Placement ID": pids[int(rng.integers(len(pids)))]}},
+            "deleted": [drop],
+            "added": [new_bid],
+        })
+        assert auction.sync_changes(bids, changed) <= changed["placements"]
+        assert_matches_full_run(auction, placements, bids)
+
+
+def test_add_and_remove_bid_and_placement():
+    placements, bids, auction = make_auction(n=20)
+    bid = dict(bids[0], **{"Bid CPM": 99.0})
+    auction.add_bid(bid)
+    bids.append(bid)
+    assert_matches_full_run(auction, placements, bids)
+
+    placement = dict(placements[0], **{"Placement ID": "P9999999"})
+    placements.append(placement)
+    auction.add_placement(placement)
+    new_bid = dict(bid, **{"Placement ID": "P9999999"})
+    auction.add_bid(new_bid)
+    bids.append(new_bid)
+    assert_matches_full_run(auction, placements, bids)
+
+    assert auction.remove_bid(bid)
+    bids.delete([int(bids.keys()[-2])])
+    assert_matches_full_run(auction, placements, bids)
+
+
+def test_full_sync_without_changed_placements():
+    placements, bids, auction = make_auction(n=30)
+    bids.update({int(bids.keys()[3]): {"Bid CPM": 50.0}})
+    assert auction.sync_bids(bids) == {bids[3]["Placement ID"]}
+    assert_matches_full_run(auction, placements, bids)
+
+
+def test_empty_auction_fills_in():
+    auction = IncrementalAuction()
+    placements = placement_store(make_placements(5))
+    bids = bid_store(make_bids(placements.frame(categorical=False), 10))
+    for placement in placements:
+        auction.add_placement(placement)
+    for bid in bids:
+        auction.add_bid(bid)
+    assert_matches_full_run(auction, placements, bids)
+
+
+def test_matches_full_run_across_segments(monkeypatch):
+    monkeypatch.setattr(incremental, "SEGMENT", 16)
+    placements, bids, auction = make_auction(n=100, seed=5)
+    assert len(auction._segments) > 1
+    rng = np.random.default_rng(1)
+    for _ in range(10):
+        key = int(rng.choice(bids.keys()))
+        changed = bids.apply_changes({"updated": {key: {"Bid CPM": float(rng.uniform(0.5, 12))}},
+                                      "deleted": [int(rng.choice(bids.keys()))]})
+        auction.sync_changes(bids, changed)
+        assert_matches_full_run(auction, placements, bids)
+
+
+def edit_seconds(n, edits=30):
+    """Best time to save one keyed bid edit and re-clear its placement."""
+    placements, bids, auction = make_auction(n=n, seed=7)
+    auction.daily_delivery
+    rng = np.random.default_rng(0)
+    best = float("inf")
+    for _ in range(edits):
+        key = int(rng.choice(bids.keys()))
+        started = time.perf_counter()
+        changed = bids.apply_changes({"updated": {key: {"Bid CPM": float(rng.uniform(0.5, 12))}}})
+        auction.sync_changes(bids, changed)
+        auction.refresh()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_edit_latency_does_not_grow_with_row_count():
+    small, large = edit_seconds(500), edit_seconds(20_000)
+    # 40x the rows; allow for timer noise but not for a pass over the table
+    assert large < 3 * small + 0.002, (small, large)
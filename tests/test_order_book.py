@@ -0,0 +1,96 @@
+import random
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from auction_core.engine import clear_auction, settle
+from auction_core.order_book import BidOrderBook, _PlacementBook
+
+PIDS = ["P001", "P002", "P003", "P004"]
+# Few distinct prices so most placements hold several tied top bids
+PRICES = [1.0, 2.0, 2.5, 3.0]
+
+
+def make_placements():
+    return pd.DataFrame({
+        "Placement ID": PIDS,
+        "Base CPM": [1.5, 2.0, 0.5, 4.0],
+        "Start Date": pd.to_datetime(["2024-01-01"] * 4),
+        "End Date": pd.to_datetime(["2024-01-31"] * 4),
+    })
+
+
+def random_bid(rng, n):
+    start = pd.Timestamp("2023-12-25") + pd.Timedelta(days=rng.randrange(20))
+    return {
+        "Vendor Name": f"Vendor {n}",
+        "Placement ID": rng.choice(PIDS),
+        "Bid CPM": rng.choice(PRICES),
+        "Start Date": start,
+        "End Date": start + pd.Timedelta(days=rng.randrange(1, 20)),
+    }
+
+
+def step(rng, book, live, n):
+    """One random add, remove or update applied to the book and to ``live``."""
+    action = rng.random()
+    if live and action < 0.3:
+        bid_id = rng.choice(sorted(live))
+        book.remove(bid_id)
+        del live[bid_id]
+    elif live and action < 0.6:
+        bid_id = rng.choice(sorted(live))
+        bid = random_bid(rng, n)
+        book.update(bid_id, bid)
+        live[bid_id] = bid
+    else:
+        bid = random_bid(rng, n)
+        live[book.add(bid)] = bid
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_random_edits_match_clear_auction(seed):
+    rng = random.Random(seed)
+    placements = make_placements()
+    book = BidOrderBook()
+    live = {}
+    for n in range(120):
+        step(rng, book, live, n)
+        # Bid ids follow submission order, and update keeps a bid's id
+        bids = [live[bid_id] for bid_id in sorted(live)]
+        expected = clear_auction(placements, bids).reset_index(drop=True)
+        actual = settle(placements, book.top_two()).reset_index(drop=True)
+        assert_frame_equal(actual, expected, check_dtype=False)
+        for pid in PIDS:
+            assert book.bids(pid) == [bid for bid in bids if bid["Placement ID"] == pid]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_placement_book_top_two_after_random_edits(seed):
+    rng = random.Random(seed)
+    book = _PlacementBook()
+    entries = {}
+    next_id = 0
+    for _ in range(500):
+        if entries and rng.random() < 0.4:
+            bid_id = rng.choice(sorted(entries))
+            book.remove(bid_id)
+            del entries[bid_id]
+        else:
+            entries[next_id] = (-rng.choice(PRICES), next_id)
+            book.push(entries[next_id])
+            next_id += 1
+        ranked = sorted(entries.values())
+        assert book.top_two() == ((ranked[0] if ranked else None), (ranked[1] if len(ranked) > 1 else None))
+        assert all(book.heap[book.pos[bid_id]][1] == bid_id for bid_id in entries)
+
+
+def test_from_bids_matches_incremental_adds():
+    rng = random.Random(11)
+    bids = [random_bid(rng, n) for n in range(200)]
+    bulk = BidOrderBook.from_bids(bids)
+    added = BidOrderBook()
+    for bid in bids:
+        added.add(bid)
+    assert_frame_equal(bulk.top_two(PIDS), added.top_two(PIDS))
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from auction_core.bench import make_bids, make_placements
+from auction_core.engine import clear_auction
+from auction_core.parallel import parallel_auction, split
+
+
+def inputs(n=60):
+    placements = make_placements(n, seed=5)
+    bids = make_bids(placements, 6 * n, vendors=5, seed=5)
+    stray = bids.iloc[:3].assign(**{"Placement ID": "P-unknown"})
+    return placements, pd.concat([bids, stray], ignore_index=True)
+
+
+def test_split_keeps_placement_ranges_and_bid_order():
+    placements, bids = inputs()
+    parts = split(placements, bids, 7)
+    assert pd.concat([p for p, _ in parts]).equals(placements)
+    for shard_placements, shard_bids in parts:
+        assert shard_bids["Placement ID"].isin(shard_placements["Placement ID"]).all()
+        assert shard_bids.index.is_monotonic_increasing
+    assert sum(len(b) for _, b in parts) == len(bids) - 3
+
+
+def test_parallel_matches_single_process():
+    placements, bids = inputs()
+    expected = clear_auction(placements, bids)
+    pd.testing.assert_frame_equal(parallel_auction(placements, bids, workers=2, shards=5), expected)
+    pd.testing.assert_frame_equal(parallel_auction(placements, bids, workers=1), expected)
+
+
+def test_more_shards_than_placements():
+    placements, bids = inputs(n=3)
+    pd.testing.assert_frame_equal(parallel_auction(placements, bids, workers=2, shards=8),
+                                  clear_auction(placements, bids))
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auction_core.bench import EPOCH, make_delivery
+from auction_core.report_cube import ReportCube
+
+
+def in_range(delivery, start, end):
+    return delivery[(delivery["Date"] >= pd.Timestamp(start)) & (delivery["Date"] <= pd.Timestamp(end))]
+
+
+@pytest.fixture
+def delivery():
+    delivery = make_delivery(3000, vendors=6, seed=1)
+    # Gaps in the calendar, as in a sparse history
+    return delivery[delivery["Date"].dt.day % 4 != 0].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("days", [(0, 89), (10, 20), (-30, 5), (85, 200), (30, 29)])
+def test_vendor_totals_match_groupby(delivery, days):
+    start, end = (EPOCH + np.timedelta64(d, "D") for d in days)
+    rows = in_range(delivery, start, end)
+    expected = rows.groupby("Vendor", observed=True).agg(
+        Total_Impressions=("Impressions", "sum"), Total_Spend=("Spend", "sum"), Days_Booked=("Date", "nunique"))
+    totals = ReportCube(delivery).vendor_totals(start, end)
+    expected = expected.reindex(totals.index, fill_value=0)
+    assert totals["Total_Impressions"].tolist() == expected["Total_Impressions"].tolist()
+    assert totals["Days_Booked"].tolist() == expected["Days_Booked"].tolist()
+    np.testing.assert_allclose(totals["Total_Spend"], expected["Total_Spend"].astype(float), rtol=1e-6)
+
+
+def test_daily_spend_matches_unstack(delivery):
+    cube = ReportCube(delivery)
+    start, end = EPOCH + np.timedelta64(5, "D"), EPOCH + np.timedelta64(40, "D")
+    for vendor in cube.vendors:
+        rows = in_range(delivery, start, end)
+        rows = rows[rows["Vendor"] == vendor]
+        expected = (rows.assign(Spend=rows["Spend"].astype(float), **{"Placement ID": rows["Placement ID"].astype(object)})
+                    .groupby(["Date", "Placement ID"])["Spend"].sum().unstack().fillna(0))
+        pd.testing.assert_frame_equal(cube.daily_spend(vendor, start, end), expected,
+                                      check_names=False, check_column_type=False, check_freq=False)
+
+
+def test_sparse_history_stays_small():
+    n = 20_000
+    days = pd.to_datetime("2020-01-01") + pd.to_timedelta(np.arange(n) * 3 % 3650, "D")
+    delivery = pd.DataFrame({"Date": days, "Placement ID": [f"P{i}" for i in range(n)], "Vendor": "V",
+                             "CPM": 1.0, "Impressions": 10000, "Spend": 10.0})
+    cube = ReportCube(delivery)
+    stored = sum(a.nbytes for a in vars(cube).values() if isinstance(a, np.ndarray))
+    assert stored < 50 * n * 8
+    assert cube.vendor_totals("2020-01-01", "2029-12-31").loc["V", "Days_Booked"] == len(set(days))
+
+
+def test_empty_delivery():
+    cube = ReportCube(make_delivery(0))
+    assert cube.vendor_totals(EPOCH, EPOCH).empty
+    assert cube.daily_spend("Vendor 000", EPOCH, EPOCH).empty
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auction_core.sheets import SheetsStore
+from auction_core.shared_state import ConflictError, SharedTable, session_snapshot
+from fake_sheets import FakeSpreadsheet
+
+HEADER = ["Vendor", "Placement", "CPM", "Spend"]
+
+
+def make_table(rows=(("A", "P001", 2.5, 10), ("B", "P001", 3, 12), ("C", "P002", 1, 4)), header=HEADER):
+    book = FakeSpreadsheet({"Vendor Bids": ([header] if header else []) + [list(row) for row in rows]})
+    return book, SharedTable(SheetsStore(book), "Vendor Bids")
+
+
+def sheet_rows(book):
+    return book._worksheets["Vendor Bids"].rows
+
+
+def test_stale_save_from_held_snapshot_conflicts():
+    book, bids = make_table()
+    session_a, session_b = {}, {}
+    snap_a = session_snapshot(bids, session_a, "bids")
+    snap_b = session_snapshot(bids, session_b, "bids")
+
+    edited_b = snap_b.frame.copy()
+    edited_b.loc[1, "CPM"] = 50
+    bids.save(snap_b, edited_b)
+
+    # Session A's Save rerun holds the snapshot its editor was drawn from
+    snap_a = session_snapshot(bids, session_a, "bids", hold=True)
+    edited_a = snap_a.frame.copy()
+    edited_a.loc[1, "CPM"] = 7
+    with pytest.raises(ConflictError) as err:
+        bids.save(snap_a, edited_a)
+    assert err.value.keys == [1]
+    assert sheet_rows(book)[2] == ["B", "P001", "50", "12"]
+
+    # The next (non-Save) rerun picks up B's change
+    snap_a = session_snapshot(bids, session_a, "bids")
+    assert snap_a.frame.loc[1, "CPM"] == 50
+
+
+def test_edits_to_different_rows_both_save():
+    book, bids = make_table()
+    snap_a, snap_b = bids.snapshot(), bids.snapshot()
+    edited_b = snap_b.frame.copy()
+    edited_b.loc[1, "CPM"] = 50
+    bids.save(snap_b, edited_b)
+    edited_a = snap_a.frame.copy()
+    edited_a.loc[0, "CPM"] = 9
+    assert bids.save(snap_a, edited_a) == (1, 0, 0)
+    assert [row[2] for row in sheet_rows(book)[1:]] == ["9", "50", "1"]
+
+
+def test_deleting_a_row_changed_elsewhere_conflicts():
+    book, bids = make_table()
+    snap_a, snap_b = bids.snapshot(), bids.snapshot()
+    edited_b = snap_b.frame.copy()
+    edited_b.loc[2, "Spend"] = 99
+    bids.save(snap_b, edited_b)
+    with pytest.raises(ConflictError):
+        bids.save(snap_a, snap_a.frame.drop(index=2))
+    assert len(sheet_rows(book)) == 4
+
+
+def test_refresh_applies_only_changed_rows():
+    book, bids = make_table()
+    snap = bids.snapshot()
+    other = bids.snapshot()
+    frame = snap.frame
+    assert bids.refresh(snap) is snap and snap.frame is frame
+
+    edited = other.frame.copy()
+    edited.loc[0, "CPM"] = 9
+    edited = pd.concat([edited, pd.DataFrame([["D", "P003", 4, 1]], columns=HEADER, index=[np.nan])])
+    bids.save(other, edited)
+    bids.refresh(snap)
+    assert snap.version == bids.version
+    assert list(snap.frame["Vendor"]) == ["A", "B", "C", "D"]
+    assert snap.frame.loc[0, "CPM"] == 9
+    assert snap.versions == other.versions
+
+
+def test_writes_are_not_read_back():
+    book, bids = make_table()
+    snap = bids.snapshot()
+    edited = snap.frame.copy()
+    edited.loc[0, "CPM"] = 9
+    bids.save(snap, edited)
+    bids.append(["D", "P003", 4, 1])
+    bids.snapshot()
+    assert book.calls["values_batch_get"] == 1
+
+
+def test_append_to_header_only_sheet_keeps_fields():
+    book, bids = make_table(rows=())
+    assert bids.snapshot().frame.columns.tolist() == HEADER
+    bids.append(["A", "P001", 2.5, 10])
+    assert sheet_rows(book) == [HEADER, ["A", "P001", "2.5", "10"]]
+    assert bids.snapshot().frame.iloc[0].tolist() == ["A", "P001", 2.5, 10]
+
+
+def test_save_after_deleting_every_row():
+    book, bids = make_table()
+    snap = bids.snapshot()
+    bids.save(snap, snap.frame.iloc[0:0])
+    assert sheet_rows(book) == [HEADER]
+    new = pd.DataFrame([["E", "P004", 5, 2]], columns=HEADER, index=[np.nan])
+    assert bids.save(snap, pd.concat([snap.frame, new])) == (0, 0, 1)
+    assert sheet_rows(book) == [HEADER, ["E", "P004", "5", "2"]]
+
+
+def test_append_without_header_raises():
+    book, bids = make_table(rows=(), header=None)
+    with pytest.raises(ValueError, match="no header row"):
+        bids.append(["A", "P001", 2.5, 10])
+    assert sheet_rows(book) == []
+
+
+def test_feed_overflow_falls_back_to_full_snapshot():
+    book = FakeSpreadsheet({"Vendor Bids": [HEADER, ["A", "P001", "1", "1"]]})
+    bids = SharedTable(SheetsStore(book), "Vendor Bids", feed_size=2)
+    snap = bids.snapshot()
+    for _ in range(3):
+        bids.append(["B", "P002", 2, 2])
+    fresh = bids.refresh(snap)
+    assert fresh is not snap
+    assert len(fresh.frame) == 4
+
+
+def test_keyed_page_edits_save_only_those_rows():
+    book, bids = make_table()
+    snap = bids.snapshot()
+    counts = bids.apply_changes(snap, {"updated": {2: {"CPM": 7}}, "deleted": [0],
+                                       "added": [{"Vendor": "D", "Placement": "P003"}]})
+    assert counts == (1, 1, 1)
+    assert sheet_rows(book)[1:] == [["B", "P001", "3", "12"], ["C", "P002", "7", "4"], ["D", "P003", "", ""]]
+    assert list(snap.frame["Vendor"]) == ["B", "C", "D"]
+
+
+def test_keyed_edit_of_row_changed_elsewhere_conflicts():
+    book, bids = make_table()
+    snap_a, snap_b = bids.snapshot(), bids.snapshot()
+    bids.apply_changes(snap_b, {"updated": {1: {"CPM": 50}}})
+    with pytest.raises(ConflictError) as err:
+        bids.apply_changes(snap_a, {"updated": {1: {"CPM": 7}}, "deleted": [2]})
+    assert err.value.keys == [1]
+    assert sheet_rows(book)[2:] == [["B", "P001", "50", "12"], ["C", "P002", "1", "4"]]
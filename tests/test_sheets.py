@@ -0,0 +1,108 @@
+import pandas as pd
+
+from auction_core.sheets import SheetsStore, diff_rows
+from fake_sheets import FakeSpreadsheet
+
+HEADER = ["Vendor", "Placement", "CPM", "Spend"]
+ROWS = [["A", "P001", "2.5", "10"], ["B", "P001", "3", "12"], ["C", "P002", "1", "4"]]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(ttl=60.0):
+    book = FakeSpreadsheet({"Vendor Bids": [HEADER] + ROWS, "Placements": [["Placement ID", "Name"], ["P001", "Home"]]})
+    clock = Clock()
+    return book, SheetsStore(book, ttl=ttl, clock=clock), clock
+
+
+def sheet_rows(book, title="Vendor Bids"):
+    return book._worksheets[title].rows
+
+
+def test_records_are_cached_until_ttl_expires():
+    book, store, clock = make_store(ttl=60.0)
+    first = store.records("Vendor Bids")
+    clock.now = 59.0
+    assert store.records("Vendor Bids") is first
+    assert book.calls["values_batch_get"] == 1
+    clock.now = 61.0
+    store.records("Vendor Bids")
+    assert book.calls["values_batch_get"] == 2
+
+
+def test_write_invalidates_cache():
+    book, store, clock = make_store()
+    store.records("Vendor Bids")
+    store.append_row("Vendor Bids", ["D", "P003", 4, 1])
+    assert store.records("Vendor Bids")[-1]["Vendor"] == "D"
+    assert book.calls["values_batch_get"] == 2
+
+
+def test_prefetch_reads_stale_sheets_in_one_batch():
+    book, store, clock = make_store()
+    store.prefetch("Placements", "Vendor Bids")
+    assert book.calls["values_batch_get"] == 1
+    assert store.records("Placements") == [{"Placement ID": "P001", "Name": "Home"}]
+    assert len(store.records("Vendor Bids")) == 3
+    assert book.calls["values_batch_get"] == 1
+    # Only the stale sheet is refetched
+    store.invalidate("Placements")
+    store.prefetch("Placements", "Vendor Bids")
+    assert book.calls["values_batch_get"] == 2
+
+
+def test_diff_rows_by_label():
+    snapshot = pd.DataFrame([["A", 1], ["B", 2], ["C", 3]], columns=["x", "y"])
+    edited = pd.DataFrame([["A", 1], ["C", 30], ["D", 4]], columns=["x", "y"], index=[0, 2, 9])
+    updated, deleted, inserted = diff_rows(snapshot, edited)
+    assert updated == {2: ["C", 30]}
+    assert deleted == [1]
+    assert inserted == [["D", 4]]
+
+
+def test_save_frame_update_append_delete_in_one_batch():
+    book, store, clock = make_store()
+    df = store.frame("Vendor Bids")
+    edited = df.drop(index=1)
+    edited.loc[0, "CPM"] = 9
+    edited = pd.concat([edited, pd.DataFrame([["D", "P003", 4, 1]], columns=HEADER, index=[10])])
+    assert store.save_frame("Vendor Bids", edited) == (1, 1, 1)
+    assert book.calls["batch_update"] == 1
+    assert sheet_rows(book) == [HEADER, ["A", "P001", "9", "10"], ["C", "P002", "1", "4"], ["D", "P003", "4", "1"]]
+
+
+def test_save_frame_without_changes_sends_nothing():
+    book, store, clock = make_store()
+    df = store.frame("Vendor Bids")
+    assert store.save_frame("Vendor Bids", df.copy()) == (0, 0, 0)
+    assert book.calls["batch_update"] == 0
+
+
+def test_save_frame_deletes_every_row():
+    book, store, clock = make_store()
+    df = store.frame("Vendor Bids")
+    assert store.save_frame("Vendor Bids", df.iloc[0:0]) == (0, 3, 0)
+    assert sheet_rows(book) == [HEADER]
+    assert store.records("Vendor Bids") == []
+
+
+def test_save_frame_deletes_separate_runs():
+    book, store, clock = make_store()
+    df = store.frame("Vendor Bids")
+    store.save_frame("Vendor Bids", df.drop(index=[0, 2]))
+    assert sheet_rows(book) == [HEADER, ["B", "P001", "3", "12"]]
+
+
+def test_save_frame_with_new_columns_replaces_sheet():
+    book, store, clock = make_store()
+    df = store.frame("Vendor Bids")
+    edited = df.assign(Notes="x")
+    store.save_frame("Vendor Bids", edited)
+    assert sheet_rows(book)[0] == HEADER + ["Notes"]
+    assert len(store.records("Vendor Bids")) == 3
@@ -0,0 +1,40 @@
+import pytest
+from pandas.testing import assert_frame_equal
+
+from auction_core import simulator
+from auction_core.bench import make_bids, make_placements
+from auction_core.engine import clear_auction
+from auction_core.simulator import simulate_delivery
+
+
+@pytest.fixture(scope="module")
+def cleared():
+    placements = make_placements(20, seed=2)
+    return clear_auction(placements, make_bids(placements, 120, seed=2))
+
+
+def test_same_seed_gives_same_plan(cleared):
+    options = dict(scenarios=200, seasonality=[1, 1, 1, 1, 1.2, 0.8, 0.7],
+                   budgets={"Vendor 018": 500.0}, seed=7)
+    assert_frame_equal(simulate_delivery(cleared, **options), simulate_delivery(cleared, **options))
+
+
+def test_different_seed_gives_different_plan(cleared):
+    first = simulate_delivery(cleared, scenarios=200, seed=7)
+    second = simulate_delivery(cleared, scenarios=200, seed=8)
+    assert_frame_equal(first[["Date", "Placement ID", "Vendor", "CPM"]],
+                       second[["Date", "Placement ID", "Vendor", "CPM"]])
+    assert not first["Impressions"].equals(second["Impressions"])
+
+
+def test_block_size_does_not_change_draws(cleared, monkeypatch):
+    whole = simulate_delivery(cleared, scenarios=50, seed=3)
+    monkeypatch.setattr(simulator, "MAX_CELLS", 50 * 7)
+    assert_frame_equal(simulate_delivery(cleared, scenarios=50, seed=3), whole)
+
+
+def test_budget_caps_expected_spend(cleared):
+    plan = simulate_delivery(cleared, scenarios=200, budgets={"Vendor 018": 100.0}, seed=1)
+    spend = plan.groupby("Vendor", observed=True)["Spend"].sum()
+    # Paced evenly, the mean can only fall below the budget (plus per-row rounding)
+    assert spend["Vendor 018"] <= 100.0 + 0.01 * len(plan)
@@ -0,0 +1,120 @@
+import datetime
+
+import pytest
+
+from auction_core.records import bid_store
+from auction_core.shared_state import ConflictError, SharedTable, session_snapshot
+from auction_core.storage import SQLiteSheetStore, SQLiteStorage, Storage
+
+
+def day(n):
+    return datetime.date(2025, 1, n)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "auction.db"))
+    for pid, base in (("P001", 1.0), ("P002", 4.0)):
+        storage.add_placement({"Placement ID": pid, "Name": pid, "Start Date": day(1), "End Date": day(5),
+                               "Base CPM": base})
+    for vendor, pid, cpm, start, end in (("A", "P001", 3.0, day(2), day(9)), ("B", "P001", 2.5, day(1), day(3)),
+                                         ("C", "P002", 2.0, day(4), day(4))):
+        storage.add_bid({"Vendor Name": vendor, "Placement ID": pid, "Bid CPM": cpm,
+                         "Start Date": start, "End Date": end})
+    return storage
+
+
+def test_storage_is_abstract():
+    with pytest.raises(TypeError):
+        Storage()
+
+
+def test_run_auction_feeds_reports(storage):
+    cleared = storage.run_auction()
+    assert cleared[["Placement ID", "Winning Vendor", "Winning CPM"]].values.tolist() == [
+        ["P001", "A", 2.51], ["P002", "C", 4.0]]
+    assert len(storage.daily_delivery()) == 5
+    assert storage.daily_delivery(start=day(3), end=day(4), vendor="A")["Date"].dt.day.tolist() == [3, 4]
+
+    summary = storage.vendor_summary(day(1), day(31)).set_index("Vendor")
+    assert summary.loc["A", "Days_Booked"] == 4
+    assert summary.loc["C", "Total_Spend"] == pytest.approx(40.0)
+    spend = storage.spend_by_placement("A", day(1), day(2))
+    assert spend.values.tolist() == [["P001", 25.1]]
+
+
+def test_keyed_bid_changes(storage):
+    keys = storage.bids().index.tolist()
+    storage.apply_bid_changes({"updated": {keys[1]: {"Bid CPM": 9.0, "End Date": "2025-01-05"}},
+                               "deleted": [keys[0]],
+                               "added": [{"Vendor Name": "D", "Placement ID": "P002", "Bid CPM": 1.0}]})
+    bids = storage.bids()
+    assert bids["Vendor Name"].tolist() == ["B", "C", "D"]
+    assert bids.loc[keys[1], "Bid CPM"] == 9.0
+    assert bids.loc[keys[1], "End Date"] == day(5)
+    assert bids.index[-1] > keys[-1]
+
+
+def test_rerun_replaces_the_delivery_plan(storage):
+    storage.run_auction()
+    bids = storage.bids()
+    storage.apply_bid_changes({"deleted": bids.index[bids["Vendor Name"] != "C"].tolist()})
+    storage.run_auction()
+    assert storage.daily_delivery()["Vendor"].unique().tolist() == ["C"]
+
+
+def test_bids_are_paged_and_filtered_in_sql(storage):
+    for n in range(4):
+        storage.add_bid({"Vendor Name": "D", "Placement ID": "P002", "Bid CPM": float(n)})
+    keys = storage.bids().index.tolist()
+    assert storage.count_bids() == 7
+    assert storage.bids_page(2, 3).index.tolist() == keys[2:5]
+    assert storage.bids_page(6, 3).index.tolist() == keys[6:]
+    assert storage.count_bids(placement_id="P002") == 5
+    page = storage.bids_page(1, 2, placement_id="P002")
+    assert page["Vendor Name"].tolist() == ["D", "D"] and page["Bid CPM"].tolist() == [0.0, 1.0]
+    assert storage.count_bids(placement_id="P002", vendor="C") == 1
+    assert storage.bids_page(0, 10, vendor="A").equals(storage.bids("A"))
+    assert storage.vendors() == ["A", "B", "C", "D"]
+
+
+def test_session_store_keyed_by_bid_id_writes_through(storage):
+    bids = storage.bids()
+    store = bid_store(bids, bids.index)
+    changes = {"updated": {int(bids.index[0]): {"Bid CPM": 8.0}}, "deleted": [int(bids.index[1])],
+               "added": [{"Vendor Name": "D", "Placement ID": "P002", "Bid CPM": 1.0}]}
+    added = storage.apply_bid_changes(changes)
+    store.apply_changes(changes, added)
+    store.append({"Vendor Name": "E", "Placement ID": "P001", "Bid CPM": 2.0},
+                 storage.add_bid({"Vendor Name": "E", "Placement ID": "P001", "Bid CPM": 2.0}))
+    saved = storage.bids()
+    assert store.keys().tolist() == saved.index.tolist()
+    assert store.frame()["Bid CPM"].tolist() == saved["Bid CPM"].tolist() == [8.0, 2.0, 1.0, 2.0]
+    with pytest.raises(ValueError):
+        store.append({"Vendor Name": "F"}, int(saved.index[0]))
+
+
+def test_replace_placements_and_bids(storage):
+    storage.replace_placements([{"Placement ID": "P009", "Base CPM": 1.0, "Start Date": day(1), "End Date": day(2)}])
+    keys = storage.replace_bids([{"Vendor Name": "Z", "Placement ID": "P009", "Bid CPM": 3.0}])
+    assert storage.placements()["Placement ID"].tolist() == ["P009"]
+    assert storage.bids().index.tolist() == keys
+
+
+def test_sheet_store_backs_a_shared_table(tmp_path):
+    path = str(tmp_path / "auction.db")
+    bids = SharedTable(SQLiteSheetStore(path), "Vendor Bids")
+    for row in (["A", "P001", 2.5, 10], ["B", "P001", 3, 12], ["C", "P002", 1, 4]):
+        bids.append(row)
+    session_a, session_b = {}, {}
+    snap_a = session_snapshot(bids, session_a, "bids")
+    snap_b = session_snapshot(bids, session_b, "bids")
+    bids.apply_changes(snap_a, {"updated": {1: {"CPM": 50}}, "deleted": [0], "added": [{"Vendor": "D"}]})
+    with pytest.raises(ConflictError):
+        bids.apply_changes(snap_b, {"updated": {1: {"CPM": 7}}})
+
+    # A new process reads the same rows back from the file
+    reopened = SQLiteSheetStore(path)
+    assert reopened.header("Vendor Bids") == ["Vendor", "Placement", "CPM", "Spend"]
+    assert [list(r.values()) for r in reopened.records("Vendor Bids")] == [
+        ["B", "P001", 50, 12], ["C", "P002", 1, 4], ["D", "", "", ""]]
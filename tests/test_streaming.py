@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auction_core.bench import make_bids, make_placements
+from auction_core.engine import clear_auction, settle
+from auction_core.streaming import stream_auction, stream_top_two
+
+
+@pytest.fixture
+def inputs():
+    placements = make_placements(40, seed=2)
+    bids = make_bids(placements, 400, vendors=6, seed=2)
+    # Few distinct prices, so ties across chunk boundaries are common
+    bids["Bid CPM"] = np.round(bids["Bid CPM"] / 3) + 1.0
+    return placements, bids
+
+
+def chunks(bids, size):
+    return (bids.iloc[start:start + size] for start in range(0, len(bids), size))
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 399, 10_000])
+def test_chunked_clearing_matches_in_memory(inputs, size):
+    placements, bids = inputs
+    expected = clear_auction(placements, bids)
+    top = stream_top_two(chunks(bids, size))
+    pd.testing.assert_frame_equal(settle(placements, top), expected)
+
+
+def test_chunk_boundary_inside_a_placement():
+    placements = make_placements(1, seed=0)
+    pid = placements["Placement ID"].iloc[0]
+    bids = pd.DataFrame({
+        "Vendor Name": ["A", "B", "C", "D", "E"],
+        "Placement ID": pid,
+        "Bid CPM": [3.0, 5.0, 5.0, 4.0, 5.0],
+        "Start Date": placements["Start Date"].iloc[0],
+        "End Date": placements["End Date"].iloc[0],
+    })
+    for size in (1, 2, 3):
+        top = stream_top_two(chunks(bids, size))
+        # First 5.0 bid in file order wins; the runner-up is the tied 5.0
+        assert top.loc[pid, "Vendor Name"] == "B"
+        assert top.loc[pid, "Second CPM"] == 5.0
+
+
+def test_stream_auction_reads_csv_in_chunks(inputs, tmp_path):
+    placements, bids = inputs
+    path = tmp_path / "bids.csv"
+    bids.to_csv(path, index=False)
+    cleared = stream_auction(placements, path, chunksize=33)
+    expected = clear_auction(placements, bids)
+    assert cleared[["Placement ID", "Winning Vendor", "Winning CPM"]].values.tolist() == \
+        expected[["Placement ID", "Winning Vendor", "Winning CPM"]].values.tolist()
+    assert (cleared["Delivery Start"] == expected["Delivery Start"]).all()
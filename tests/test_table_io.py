@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auction_core.table_io import TableWriter, read_table
+
+
+def chunk(vendors, day, cpm_dtype=np.float32):
+    return pd.DataFrame({
+        "Date": pd.to_datetime([day] * len(vendors)),
+        "Placement ID": pd.Categorical([f"P{i:03d}" for i in range(len(vendors))]),
+        "Vendor": pd.Categorical(vendors),
+        "CPM": np.arange(len(vendors), dtype=cpm_dtype) + 1.5,
+        "Impressions": np.full(len(vendors), 10000, dtype=np.int32),
+    })
+
+
+def write_chunks(path):
+    # The second chunk has other categories and a wider CPM dtype, so it is
+    # cast to the schema the file was opened with
+    chunks = [chunk(["A", "B"], "2025-01-01"), chunk(["C", "A", "D"], "2025-01-02", np.float64)]
+    writer = TableWriter(path)
+    for df in chunks:
+        writer.write(df)
+    writer.close()
+    assert writer.rows == 5
+    return pd.concat(chunks, ignore_index=True)
+
+
+def assert_round_trip(path):
+    expected = write_chunks(path)
+    back = read_table(path)
+    assert list(back.columns) == list(expected.columns)
+    assert back["Vendor"].astype(str).tolist() == ["A", "B", "C", "A", "D"]
+    assert back["Placement ID"].astype(str).tolist() == expected["Placement ID"].astype(str).tolist()
+    np.testing.assert_array_equal(back["CPM"].to_numpy(dtype=float), expected["CPM"].to_numpy(dtype=float))
+    assert (pd.to_datetime(back["Date"]) == expected["Date"]).all()
+    return back
+
+
+def test_csv_round_trip(tmp_path):
+    assert_round_trip(tmp_path / "delivery.csv")
+
+
+@pytest.mark.parametrize("name", ["delivery.arrow", "delivery.parquet"])
+def test_arrow_and_parquet_round_trip(tmp_path, name):
+    pytest.importorskip("pyarrow")
+    back = assert_round_trip(tmp_path / name)
+    assert back["CPM"].dtype == np.float32
@@ -0,0 +1,46 @@
+import numpy as np
+
+from auction_core.records import bid_store
+from auction_core.table_view import TableView, editor_changes
+
+
+def store():
+    return bid_store([{"Vendor Name": f"V{i % 3}", "Placement ID": f"P{i:03d}", "Bid CPM": float(i)}
+                      for i in range(10)])
+
+
+def test_editor_changes_are_keyed_by_row():
+    bids = store()
+    bids.delete([int(bids.keys()[0])])
+    view = TableView(bids.frame())
+    window = view.page(view.select(sort="Bid CPM", ascending=False), 1, 3)
+    assert window.index.tolist() == [6, 5, 4]
+    state = {
+        "edited_rows": {0: {"Bid CPM": 60.0}, 2: {"Vendor Name": "W"}},
+        "deleted_rows": [1],
+        "added_rows": [{"Vendor Name": "N", "Placement ID": "P100"}, {}],
+    }
+    changes = editor_changes(window, state)
+    assert changes == {
+        "updated": {6: {"Bid CPM": 60.0}, 4: {"Vendor Name": "W"}},
+        "deleted": [5],
+        "added": [{"Vendor Name": "N", "Placement ID": "P100"}],
+    }
+    bids.apply_changes(changes)
+    frame = bids.frame()
+    assert frame.loc[6, "Bid CPM"] == 60.0 and frame.loc[4, "Vendor Name"] == "W"
+    assert 5 not in frame.index and frame["Vendor Name"].iloc[-1] == "N"
+
+
+def test_editor_changes_without_state():
+    window = store().frame().iloc[:2]
+    assert editor_changes(window, None) == {"updated": {}, "deleted": [], "added": []}
+
+
+def test_filter_and_sort():
+    view = TableView(store().frame())
+    positions = view.select([("Vendor Name", "v1"), ("Bid CPM", ">= 4")], sort="Bid CPM", ascending=False)
+    assert view.frame.iloc[positions]["Bid CPM"].tolist() == [7.0, 4.0]
+    assert np.array_equal(view.select(), np.arange(10))
+    assert view.page(view.select(), 3, 3).index.tolist() == [9]
+    assert view.page(view.select(), 4, 3).empty
@@ -0,0 +1,161 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from auction_core.sheets import SheetsStore
+from auction_core.shared_state import SharedTable
+from auction_core.write_queue import WriteBehindQueue, is_rate_limit
+from fake_sheets import FakeAPIError, FakeSpreadsheet
+
+PLACEMENTS = ["Placement ID", "Name", "URL", "Tags"]
+BIDS = ["Vendor", "Placement", "CPM", "Spend"]
+
+
+def make_book(placements=(("P001", "Home", "", ""),)):
+    return FakeSpreadsheet({
+        "Placements": [PLACEMENTS] + [list(row) for row in placements],
+        "Vendor Bids": [BIDS, ["A", "P001", "2.5", "10"], ["B", "P001", "3", "12"], ["C", "P002", "1", "4"]],
+    })
+
+
+def tables(book, queue):
+    store = SheetsStore(book)
+    return SharedTable(store, "Placements", writer=queue), SharedTable(store, "Vendor Bids", writer=queue)
+
+
+def rows(book, title):
+    return book._worksheets[title].rows
+
+
+def journal(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def edit_bids(bids):
+    snap = bids.snapshot()
+    edited = snap.frame.copy()
+    edited.loc[0, "CPM"] = 9
+    edited = edited.drop(index=2)
+    return bids.save(snap, edited)
+
+
+def test_changes_apply_in_memory_and_are_journalled(tmp_path):
+    path = tmp_path / "pending.jsonl"
+    book = make_book()
+    placements, bids = tables(book, WriteBehindQueue(str(path), background=False))
+    placements.append(["P002", "News", "", ""])
+    edit_bids(bids)
+    assert book.calls["batch_update"] == 0
+    assert list(placements.snapshot().frame["Placement ID"]) == ["P001", "P002"]
+    assert [entry["op"]["op"] for entry in journal(path)] == ["append", "update", "delete"]
+
+
+def test_flush_coalesces_each_sheet_into_one_batch(tmp_path):
+    path = tmp_path / "pending.jsonl"
+    book = make_book()
+    queue = WriteBehindQueue(str(path), background=False)
+    placements, bids = tables(book, queue)
+    for i in range(5):
+        placements.append([f"P00{i + 2}", f"N{i}", "", ""])
+    edit_bids(bids)
+    queue.flush()
+    assert book.calls["batch_update"] == 2
+    assert [row[0] for row in rows(book, "Placements")[1:]] == ["P001", "P002", "P003", "P004", "P005", "P006"]
+    assert rows(book, "Vendor Bids")[1:] == [["A", "P001", "9", "10"], ["B", "P001", "3", "12"]]
+    assert queue.pending == 0 and not placements.pending
+    assert journal(path) == []
+
+
+def test_first_placement_on_header_only_sheet_is_written(tmp_path):
+    book = make_book(placements=())
+    queue = WriteBehindQueue(str(tmp_path / "pending.jsonl"), background=False)
+    placements, _ = tables(book, queue)
+    placements.append(["P001", "Home", "https://example.com", "news"])
+    queue.flush()
+    assert rows(book, "Placements") == [PLACEMENTS, ["P001", "Home", "https://example.com", "news"]]
+    assert queue.pending == 0
+
+
+def test_throttled_flush_keeps_changes_pending(tmp_path):
+    path = tmp_path / "pending.jsonl"
+    book = make_book()
+    queue = WriteBehindQueue(str(path), background=False)
+    placements, _ = tables(book, queue)
+    placements.append(["P002", "News", "", ""])
+    book.throttle(1)
+    with pytest.raises(FakeAPIError) as err:
+        queue.flush()
+    assert is_rate_limit(err.value)
+    assert queue.pending == 1 and placements.pending
+    assert len(journal(path)) == 1
+    queue.flush()
+    assert rows(book, "Placements")[-1] == ["P002", "News", "", ""]
+    assert queue.pending == 0
+
+
+def test_background_writer_backs_off_and_retries(tmp_path):
+    book = make_book()
+    queue = WriteBehindQueue(str(tmp_path / "pending.jsonl"), delay=0.01, max_backoff=0.05)
+    placements, _ = tables(book, queue)
+    book.throttle(2)
+    placements.append(["P002", "News", "", ""])
+    deadline = time.monotonic() + 5
+    while queue.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert queue.pending == 0
+    assert book.calls["batch_update"] == 3
+    assert rows(book, "Placements")[-1] == ["P002", "News", "", ""]
+
+
+def test_pending_writes_are_replayed_after_restart(tmp_path):
+    path = tmp_path / "pending.jsonl"
+    book = make_book()
+    placements, bids = tables(book, WriteBehindQueue(str(path), background=False))
+    placements.append(["P002", "News", "", ""])
+    edit_bids(bids)
+    # The process dies before flushing; only the journal is left
+    assert book.calls["batch_update"] == 0
+
+    queue = WriteBehindQueue(str(path), background=False)
+    assert queue.pending == 3
+    placements, bids = tables(book, queue)
+    assert list(placements.snapshot().frame["Placement ID"]) == ["P001", "P002"]
+    assert list(bids.snapshot().frame["Vendor"]) == ["A", "B"]
+    queue.flush()
+    assert [row[0] for row in rows(book, "Placements")[1:]] == ["P001", "P002"]
+    assert rows(book, "Vendor Bids")[1:] == [["A", "P001", "9", "10"], ["B", "P001", "3", "12"]]
+    assert journal(path) == []
+
+
+def test_changes_made_during_a_flush_stay_pending(tmp_path):
+    book = make_book()
+    queue = WriteBehindQueue(str(tmp_path / "pending.jsonl"), background=False)
+    placements, _ = tables(book, queue)
+    placements.append(["P002", "News", "", ""])
+    batch_update = book.batch_update
+
+    def append_during_write(body):
+        book.batch_update = batch_update
+        placements.append(["P003", "Sport", "", ""])
+        return batch_update(body)
+
+    book.batch_update = append_during_write
+    queue.flush()
+    assert queue.pending == 1 and placements.pending
+    queue.flush()
+    assert [row[0] for row in rows(book, "Placements")[1:]] == ["P001", "P002", "P003"]
+    assert queue.pending == 0
+
+
+def test_new_bid_rows_get_every_field(tmp_path):
+    book = make_book()
+    queue = WriteBehindQueue(str(tmp_path / "pending.jsonl"), background=False)
+    _, bids = tables(book, queue)
+    snap = bids.snapshot()
+    new = pd.DataFrame([["D", "P003", 4, 1]], columns=BIDS, index=[np.nan])
+    bids.save(snap, pd.concat([snap.frame, new]))
+    queue.flush()
+    assert rows(book, "Vendor Bids")[-1] == ["D", "P003", "4", "1"]